@@ -5,8 +5,13 @@ a = Analysis(
     ['src\\main.py'],
     pathex=[],
     binaries=[],
-    datas=[('assets', 'assets'), ('src/templates', 'src/templates'), ('poppler', 'poppler')],
-    hiddenimports=[],
+    datas=[('assets', 'assets'), ('src/templates', 'src/templates')],
+    hiddenimports=[
+        'templates.invoice_template',
+        'templates.letter_template',
+        'templates.salary_template',
+        'templates.sales_tax_template'
+    ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -0,0 +1,64 @@
+"""
+Micro-benchmark: formatting.py against the old locale + num2words path.
+
+    python benchmarks/bench_formatting.py [--count 20000]
+
+num2words is no longer a dependency; install it to run the comparison.
+"""
+import argparse
+import locale
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from formatting import format_amount, amount_in_words  # noqa: E402
+
+
+def _old_currency(amount):
+    try:
+        return locale.currency(amount, grouping=True, symbol=False)
+    except ValueError:
+        return f"{amount:,.2f}"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=20000, help="Amounts per run.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    random.seed(42)
+    # Invoice totals repeat a lot in practice (same rate card), so draw from a small pool.
+    pool = [round(random.uniform(1_000, 5_000_000), 2) for _ in range(500)]
+    amounts = [random.choice(pool) for _ in range(args.count)]
+
+    try:
+        locale.setlocale(locale.LC_ALL, "en_US.UTF-8")
+    except locale.Error:
+        locale.setlocale(locale.LC_ALL, "")
+
+    def best(fn):
+        return min(timeit.repeat(fn, number=1, repeat=args.repeat))
+
+    results = [
+        ("format_amount", best(lambda: [format_amount(a) for a in amounts])),
+        ("locale.currency", best(lambda: [_old_currency(a) for a in amounts])),
+        ("amount_in_words", best(lambda: [amount_in_words(a) for a in amounts])),
+    ]
+    try:
+        from num2words import num2words
+        results.append(("num2words en_IN", best(lambda: [num2words(int(round(a)), lang="en_IN") for a in amounts])))
+    except ImportError:
+        print("num2words not installed; skipping the words comparison.", file=sys.stderr)
+
+    print(f"{args.count} amounts, best of {args.repeat}:")
+    for name, seconds in results:
+        print(f"  {name:<18} {seconds * 1000:9.1f} ms   {seconds / args.count * 1e6:7.2f} us/amount")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+Latency of the form's live preview: render into memory plus rasterize one page.
+
+    python benchmarks/bench_preview.py [--items 1 5 20] [--edits 20] [--width 340]
+
+Drives PreviewWorker the way the form does, one edit at a time, and waits
+for each preview. The first preview pays for importing fpdf2 and PyMuPDF
+and is reported separately. Nothing is written and no number is allocated.
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from document_manager import DocumentManager  # noqa: E402
+from preview import PreviewWorker  # noqa: E402
+
+from bench_threads import SAMPLE  # noqa: E402
+
+
+def _wait(worker, generation):
+    while True:
+        result = worker.take_result()
+        if result is not None and result.generation == generation:
+            return result
+        time.sleep(0.001)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--edits", type=int, default=20)
+    parser.add_argument("--width", type=int, default=340)
+    args = parser.parse_args(argv)
+
+    worker = PreviewWorker(DocumentManager())
+    started = time.perf_counter()
+    _wait(worker, worker.submit("GoFar Media", "Invoice", dict(SAMPLE), 0, args.width))
+    print(f"first preview {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    print(f"{'items':>6} {'pages':>6} {'median ms':>10} {'max ms':>7}")
+    for count in args.items:
+        items = [dict(SAMPLE["line_items"][i % len(SAMPLE["line_items"])]) for i in range(count)]
+        times = []
+        for edit in range(args.edits):
+            # Each edit changes the form, as typing in the Campaign field would.
+            data = dict(SAMPLE, Campaign=f"Benchmark Campaign {edit}", line_items=items)
+            started = time.perf_counter()
+            result = _wait(worker, worker.submit("GoFar Media", "Invoice", data, 0, args.width))
+            times.append((time.perf_counter() - started) * 1000)
+            if result.error:
+                print(f"error: {result.error}")
+                return 1
+        print(f"{count:>6} {result.page_count:>6} {statistics.median(times):>10.1f} {max(times):>7.1f}")
+    worker.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
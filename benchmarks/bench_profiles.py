@@ -0,0 +1,64 @@
+"""
+PDF size and render time of a sample invoice under each output profile.
+
+    python benchmarks/bench_profiles.py [--profiles original print email] [--repeat 5]
+
+Renders into a temporary directory with the render cache turned off, once
+per company and profile, with the shipped signature and stamp. The first
+render of a profile builds its asset variants (unless they are already in
+the cache folder); the time reported is the best of the repeats after that.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from document_manager import DocumentManager  # noqa: E402
+from utils import resource_path  # noqa: E402
+
+from bench_threads import SAMPLE  # noqa: E402
+
+ASSETS = {
+    "GoFar Media": ("assets/signatures/ghufran.png", "assets/stamps/GOFAR MEDIA STAMP.png"),
+    "Glory Enterprises": ("assets/signatures/ghufran_glory.png", "assets/stamps/Glory Interprises.png"),
+}
+
+
+def _render(doc_manager, company, path):
+    started = time.perf_counter()
+    doc_manager.render_document(company, "Invoice", dict(SAMPLE), str(path))
+    return time.perf_counter() - started
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profiles", nargs="+", default=["original", "print", "email"])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    doc_manager = DocumentManager()
+    doc_manager.render_cache = None
+
+    print(f"{'company':<18} {'profile':<9} {'size KB':>8} {'first ms':>9} {'best ms':>8}")
+    with tempfile.TemporaryDirectory() as out_dir:
+        for company, (signature, stamp) in ASSETS.items():
+            doc_manager.signature_path = resource_path(signature)
+            doc_manager.stamp_path = resource_path(stamp)
+            for profile in args.profiles:
+                doc_manager.config["companies"][company]["output_profile"] = profile
+                path = Path(out_dir) / f"{company}_{profile}.pdf"
+                first = _render(doc_manager, company, path)
+                best = min(_render(doc_manager, company, path) for _ in range(args.repeat))
+                print(
+                    f"{company:<18} {profile:<9} {os.path.getsize(path) / 1024:>8.1f} "
+                    f"{first * 1000:>9.0f} {best * 1000:>8.0f}"
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
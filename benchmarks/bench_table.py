@@ -0,0 +1,57 @@
+"""
+Layout time of the line-item table against the number of rows.
+
+    python benchmarks/bench_table.py [--rows 10 100 1000] [--doc-type Invoice]
+
+Renders a media plan of each size into a temporary directory with the render
+cache turned off, and reports pages, total time and time per row. Per-row
+time should stay flat as the plan grows.
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from document_manager import DocumentManager  # noqa: E402
+from pdf_generator import PDFGenerator  # noqa: E402
+
+from bench_threads import SAMPLE  # noqa: E402
+
+
+def _media_plan(rows):
+    data = dict(SAMPLE, **{"PO Number": "PO-1", "NTN": "1234567-8", "STRN": "12-34-5678-901-23"})
+    data["line_items"] = [
+        dict(SAMPLE["line_items"][0], Description=f"Placement {i} " + "billboard " * (i % 7 * 4))
+        for i in range(rows)
+    ]
+    return data
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--doc-type", default="Invoice", choices=("Invoice", "Sales Tax Invoice"))
+    args = parser.parse_args(argv)
+
+    doc_manager = DocumentManager()
+    doc_manager.render_cache = None
+
+    print(f"{'rows':>6} {'pages':>6} {'seconds':>8} {'ms/row':>7}")
+    with tempfile.TemporaryDirectory() as out_dir:
+        path = str(Path(out_dir) / "plan.pdf")
+        doc_manager.render_document("GoFar Media", args.doc_type, _media_plan(1), path)  # warm imports and assets
+        for rows in args.rows:
+            pdf_gen = PDFGenerator()
+            started = time.perf_counter()
+            doc_manager._add_document(pdf_gen, "GoFar Media", args.doc_type, _media_plan(rows))
+            pdf_gen.output(path)
+            elapsed = time.perf_counter() - started
+            print(f"{rows:>6} {pdf_gen.pdf.page:>6} {elapsed:>8.2f} {elapsed * 1000 / rows:>7.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Throughput of DocumentManager's batch rendering against worker count.
+
+    python benchmarks/bench_threads.py [--documents 48] [--workers 1 2 4 8]
+
+Renders copies of a sample invoice into a temporary directory with the
+thread pool and the process pool. No invoice numbers are allocated and
+nothing is written to the output folder.
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from document_manager import DocumentManager  # noqa: E402
+
+SAMPLE = {
+    "Custom Title (Optional)": "",
+    "M/s": "Benchmark Client",
+    "Campaign": "Benchmark Campaign",
+    "Date": "01-01-2025",
+    "Invoice No": "BENCH-1",
+    "Invoice Month": "January",
+    "line_items": [
+        {
+            "Description": f"Placement {i}",
+            "Campaign Start Date": "01-01-2025",
+            "Campaign End Date": "31-01-2025",
+            "Size": "1/4 page",
+            "Duration": "30 days",
+            "Amount": "125,000",
+        }
+        for i in range(5)
+    ],
+}
+
+
+def _run(doc_manager, documents, workers, executor, out_dir):
+    jobs = {
+        i: {
+            "company": "GoFar Media",
+            "doc_type": "Invoice",
+            "data": dict(SAMPLE),
+            "path": Path(out_dir) / f"{executor}_{workers}_{i}.pdf",
+        }
+        for i in range(documents)
+    }
+    started = time.perf_counter()
+    failures = doc_manager._run_batch_jobs(jobs, workers, executor)
+    elapsed = time.perf_counter() - started
+    if failures:
+        raise RuntimeError(f"{len(failures)} documents failed: {next(iter(failures.values()))}")
+    return elapsed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, default=48)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--executors", nargs="+", default=["thread", "process"], choices=("thread", "process"))
+    args = parser.parse_args(argv)
+
+    doc_manager = DocumentManager()
+    with tempfile.TemporaryDirectory() as out_dir:
+        _run(doc_manager, 2, 1, "thread", out_dir)  # warm imports and the asset cache
+
+        print(f"{args.documents} invoices per run")
+        print(f"{'executor':<9} {'workers':>7} {'seconds':>8} {'docs/s':>8} {'speedup':>8}")
+        for executor in args.executors:
+            baseline = None
+            for workers in args.workers:
+                elapsed = _run(doc_manager, args.documents, workers, executor, out_dir)
+                rate = args.documents / elapsed
+                baseline = baseline or rate
+                print(f"{executor:<9} {workers:>7} {elapsed:>8.2f} {rate:>8.1f} {rate / baseline:>7.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Micro-benchmark: grand totals of a batch of invoices, paisa columns against Decimal.
+
+    python benchmarks/bench_totals.py [--documents 5000] [--items 12]
+
+Half the documents are sales tax invoices at 17.5% GST. The Decimal path is
+how totals were worked out before line_items.py: each Amount parsed to
+Decimal and the GST quantized per document, every time a total was needed.
+The paisa path parses each document into LineItems once ("parse"), after
+which subtotals and GST for the whole batch are integer work ("totals").
+Both must agree to the paisa.
+"""
+import argparse
+import random
+import sys
+import timeit
+from decimal import Decimal, ROUND_HALF_UP
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from formatting import to_decimal  # noqa: E402
+from line_items import LineItems, document_totals, grand_totals  # noqa: E402
+
+
+def _decimal_totals(documents):
+    totals = []
+    for doc_type, form_data in documents:
+        total = sum((to_decimal(item.get("Amount") or 0) for item in form_data["line_items"]), Decimal(0))
+        if doc_type == "Sales Tax Invoice":
+            gst_rate = to_decimal(form_data.get("GST Percentage") or 15)
+            total += (total * gst_rate / 100).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        totals.append(total)
+    return totals
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, default=5000)
+    parser.add_argument("--items", type=int, default=12, help="Line items per document.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    random.seed(42)
+    documents = [
+        (
+            "Sales Tax Invoice" if i % 2 else "Invoice",
+            {
+                "GST Percentage": "17.5",
+                "line_items": [
+                    {"Amount": f"{random.randint(100, 5_000_000) / 100:,.2f}"} for _ in range(args.items)
+                ],
+            },
+        )
+        for i in range(args.documents)
+    ]
+
+    paisa = document_totals(documents)
+    decimal = _decimal_totals(documents)
+    mismatches = sum(1 for p, d in zip(paisa, decimal) if Decimal(p).scaleb(-2) != d)
+
+    parsed = [(doc_type, LineItems.from_form_data(form_data)) for doc_type, form_data in documents]
+    rates = [Decimal("17.5") if doc_type == "Sales Tax Invoice" else 0 for doc_type, _ in documents]
+
+    def parse():
+        return [LineItems.from_form_data(form_data) for _, form_data in documents]
+
+    def totals():
+        return grand_totals([items.total for _, items in parsed], rates)
+
+    print(f"{args.documents} documents x {args.items} items, {mismatches} mismatches")
+    for name, func in (
+        ("Decimal", lambda: _decimal_totals(documents)),
+        ("paisa", lambda: document_totals(documents)),
+        ("  parse", parse),
+        ("  totals", totals),
+    ):
+        best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        print(f"{name:<8} {best * 1000:>8.1f} ms  {best * 1e6 / args.documents:>6.1f} us/document")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
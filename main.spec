@@ -8,11 +8,15 @@ a = Analysis(
     datas=[
         ('src/templates', 'src/templates'),
         ('assets', 'assets'),
-        ('poppler', 'poppler'),
         ('config.json', '.'),
         ('invoice_counter.json', '.')
     ],
-    hiddenimports=[],
+    hiddenimports=[
+        'templates.invoice_template',
+        'templates.letter_template',
+        'templates.salary_template',
+        'templates.sales_tax_template'
+    ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -0,0 +1,127 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Tuple
+
+from fpdf import FPDF
+from fpdf.image_datastructures import RasterImageInfo
+from fpdf.image_parsing import get_img_info
+
+# Enough for every letterhead, stamp and signature we ship, several times over.
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class AssetCache:
+    """
+    Process-wide cache of parsed and compressed raster images.
+    Entries are keyed by path + mtime + size, so editing an asset on disk
+    invalidates it automatically. Least recently used entries are evicted
+    once the total size of the cached streams exceeds max_bytes.
+    """
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, Tuple[RasterImageInfo, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _make_key(path: str, image_filter: str) -> Tuple:
+        resolved = os.path.abspath(path)
+        st = os.stat(resolved)
+        return (resolved, st.st_mtime_ns, st.st_size, image_filter)
+
+    @staticmethod
+    def _entry_size(info: RasterImageInfo) -> int:
+        size = 0
+        for field in ("data", "smask", "pal", "iccp"):
+            value = info.get(field)
+            if isinstance(value, (bytes, bytearray)):
+                size += len(value)
+        return size
+
+    def get(self, path: str, image_filter: str = "AUTO") -> RasterImageInfo:
+        """Returns the parsed image info for path, decoding it only on a miss."""
+        key = self._make_key(path, image_filter)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Decode outside the lock: zlib and PIL release the GIL, so other
+        # threads can keep serving hits while a large letterhead is parsed.
+        info = get_img_info(key[0], None, image_filter)
+        size = self._entry_size(info)
+
+        with self._lock:
+            # Drop stale versions of the same file (older mtime/size).
+            for stale in [k for k in self._entries if k[0] == key[0] and k != key]:
+                self._size -= self._entries.pop(stale)[1]
+            if key not in self._entries:
+                self._entries[key] = (info, size)
+                self._size += size
+            self._evict()
+            return self._entries[key][0] if key in self._entries else info
+
+    def _evict(self) -> None:
+        """Evicts least recently used entries until the size cap is met. Caller holds the lock."""
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._size -= size
+            self.evictions += 1
+
+    def embed(self, pdf: FPDF, path: str) -> str:
+        """
+        Registers the cached image with a PDF and returns the name to pass to
+        pdf.image(). fpdf2 then finds it in its own image cache and skips
+        re-reading, re-decoding and re-compressing the file.
+        """
+        name = os.path.abspath(path)
+        image_cache = pdf.image_cache
+        if name in image_cache.images:
+            return name
+
+        info = RasterImageInfo(self.get(name, image_cache.image_filter))
+        info["i"] = len(image_cache.images) + 1
+        info["usages"] = 0
+        info["iccp_i"] = None
+        iccp = info.get("iccp")
+        if iccp is not None:
+            if iccp not in image_cache.icc_profiles:
+                image_cache.icc_profiles[iccp] = len(image_cache.icc_profiles)
+            info["iccp_i"] = image_cache.icc_profiles[iccp]
+            info["iccp"] = None
+        image_cache.images[name] = info
+        return name
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters and current memory usage."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+    def clear(self) -> None:
+        """Drops all entries and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.misses = self.evictions = 0
+
+
+_shared_cache = AssetCache()
+
+
+def get_asset_cache() -> AssetCache:
+    """Returns the asset cache shared by every PDFGenerator in this process."""
+    return _shared_cache
@@ -0,0 +1,186 @@
+import hashlib
+import io
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Any, NamedTuple, Optional, Tuple, Union
+
+from PIL import Image
+
+from render_cache import file_digest
+from utils import get_cache_dir
+
+# Bump when a change here alters the derived images, so old variants aren't reused.
+PIPELINE_VERSION = "1"
+
+# Output profiles a company can pick with "output_profile" in config.json;
+# "output_profiles" there can add more or override these. dpi is the
+# resolution at the size an image is placed on the page (0 keeps the source
+# pixels); opaque images are re-encoded as "jpeg" at jpeg_quality or "flate",
+# and "trim": false keeps the transparent margins of stamps and signatures.
+OUTPUT_PROFILES: Dict[str, Dict[str, Any]] = {
+    "print": {"dpi": 300, "format": "jpeg", "jpeg_quality": 90},
+    "email": {"dpi": 150, "format": "jpeg", "jpeg_quality": 70},
+    "original": {"dpi": 0, "format": "original"},
+}
+# Companies without an "output_profile" get their images embedded as they are;
+# re-encoding (which is lossy and flattens transparency) is opt-in.
+DEFAULT_PROFILE = "original"
+# What custom profiles in config.json start from before their own settings.
+CUSTOM_PROFILE_BASE = "print"
+
+_MM_PER_INCH = 25.4
+
+
+class DerivedAsset(NamedTuple):
+    """
+    A built image variant. crop is the part of the source it shows, as
+    fractions (left, top, right, bottom); aspect is the source's height / width.
+    """
+    path: str
+    crop: Tuple[float, float, float, float]
+    aspect: float
+
+
+NO_CROP = (0.0, 0.0, 1.0, 1.0)
+
+
+def resolve_profile(name: Optional[str], custom: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Returns the settings of a named profile, built-in or from config.json."""
+    name = name or DEFAULT_PROFILE
+    custom = custom or {}
+    if name not in OUTPUT_PROFILES and name not in custom:
+        raise ValueError(f"Unknown output profile: {name}")
+    # Custom profiles only need the settings that differ from the built-in (or "print") one.
+    profile = dict(OUTPUT_PROFILES.get(name, OUTPUT_PROFILES[CUSTOM_PROFILE_BASE]))
+    profile.update(custom.get(name, {}))
+    profile["name"] = name
+    return profile
+
+
+class AssetPipeline:
+    """
+    Builds letterhead, stamp and signature variants sized for an output
+    profile: downsampled to the profile's DPI at their placed width, opaque
+    images re-encoded as JPEG (or flate), and transparent margins trimmed off
+    stamps and signatures. Variants are stored on disk by a hash of the source
+    file and the settings, so every process builds each one once.
+    """
+    def __init__(self, directory: Optional[Union[str, Path]] = None):
+        self.directory = Path(directory) if directory else get_cache_dir() / "assets"
+        self._lock = threading.Lock()
+        self._memo: Dict[Tuple, DerivedAsset] = {}
+
+    def derive(self, source: str, profile: Dict[str, Any], width_mm: Optional[float] = None) -> DerivedAsset:
+        """Returns the variant of source for profile, placed width_mm wide, building it on first use."""
+        if profile.get("format") == "original":
+            return DerivedAsset(source, NO_CROP, 0.0)
+
+        digest = file_digest(source)
+        target_px = round(width_mm / _MM_PER_INCH * profile["dpi"]) if width_mm and profile.get("dpi") else 0
+        settings = (
+            PIPELINE_VERSION, digest, target_px, profile.get("format"),
+            profile.get("jpeg_quality"), bool(profile.get("trim", True)),
+        )
+        with self._lock:
+            derived = self._memo.get(settings)
+        if derived is not None:
+            return derived
+
+        key = hashlib.sha256(repr(settings).encode("utf-8")).hexdigest()
+        meta_path = self.directory / key[:2] / f"{key}.json"
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            derived = DerivedAsset(str(meta_path.with_name(meta["file"])), tuple(meta["crop"]), meta["aspect"])
+            if not os.path.exists(derived.path):
+                derived = None
+        except (IOError, ValueError, KeyError):
+            derived = None
+        if derived is None:
+            derived = self._build(source, profile, target_px, meta_path)
+
+        with self._lock:
+            self._memo[settings] = derived
+        return derived
+
+    def _build(self, source: str, profile: Dict[str, Any], target_px: int, meta_path: Path) -> DerivedAsset:
+        with Image.open(source) as img:
+            source_format = img.format
+            aspect = img.height / img.width
+            img.load()
+            crop = NO_CROP
+            has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+            if has_alpha:
+                img = img.convert("RGBA")
+                alpha = img.getchannel("A")
+                bbox = alpha.getbbox()
+                if alpha.getextrema()[0] == 255:
+                    has_alpha = False  # An alpha channel with nothing transparent in it
+                elif profile.get("trim", True) and bbox and bbox != (0, 0, img.width, img.height):
+                    crop = (
+                        bbox[0] / img.width, bbox[1] / img.height,
+                        bbox[2] / img.width, bbox[3] / img.height,
+                    )
+                    img = img.crop(bbox)
+            resized = False
+            if target_px:
+                full_width = img.width / (crop[2] - crop[0])
+                scale = target_px / full_width
+                if scale < 1:  # Never upsample
+                    img = img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))), Image.LANCZOS)
+                    resized = True
+
+            buffer = io.BytesIO()
+            if has_alpha:
+                suffix = ".png"
+                img.save(buffer, format="PNG", optimize=True)
+            elif profile.get("format") == "jpeg":
+                suffix = ".jpg"
+                if source_format == "JPEG" and not resized:
+                    # Already JPEG at the right size; re-encoding would only lose quality.
+                    with open(source, "rb") as f:
+                        buffer.write(f.read())
+                else:
+                    img.convert("RGB").save(buffer, format="JPEG", quality=profile.get("jpeg_quality", 85), optimize=True)
+            else:
+                suffix = ".png"
+                img.convert("RGB").save(buffer, format="PNG", optimize=True)
+
+        data = buffer.getvalue()
+        if source_format in ("PNG", "JPEG") and len(data) >= os.path.getsize(source):
+            # Nothing gained (a small PNG recompressed, say); embed the source as it is.
+            with open(source, "rb") as f:
+                data = f.read()
+            suffix = ".png" if source_format == "PNG" else ".jpg"
+            crop = NO_CROP
+
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        image_path = meta_path.with_suffix(suffix)
+        _write_atomic(image_path, data)
+        _write_atomic(meta_path, json.dumps({
+            "source": source, "file": image_path.name, "crop": crop, "aspect": aspect
+        }).encode("utf-8"))
+        return DerivedAsset(str(image_path), crop, aspect)
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    # Other processes may be building the same variant; they write identical bytes.
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+_pipeline: Optional[AssetPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_asset_pipeline() -> AssetPipeline:
+    """Returns the asset pipeline shared by every PDFGenerator in this process."""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = AssetPipeline()
+        return _pipeline
@@ -0,0 +1,290 @@
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Union
+
+from line_items import document_totals
+from utils import get_output_dir
+
+INDEX_NAME = "document_index.db"
+
+# Form fields that name the other party, by document type.
+_CLIENT_FIELDS = ("M/s", "Employee Name", "Company Name")
+_TITLE_FIELDS = ("Campaign", "Subject", "Month")
+
+DateLike = Union[date, str, None]
+
+
+def parse_date(value: DateLike) -> Optional[str]:
+    """Returns a form date ('dd-mm-yyyy'), ISO string or date as 'yyyy-mm-dd'."""
+    if not value:
+        return None
+    if isinstance(value, date):
+        return value.strftime("%Y-%m-%d")
+    for pattern in ("%d-%m-%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(str(value).strip(), pattern).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
+
+def _first(form_data: Dict[str, Any], fields) -> str:
+    for field in fields:
+        if form_data.get(field):
+            return str(form_data[field])
+    return ""
+
+
+class DocumentIndex:
+    """
+    Searchable index of generated documents, built from their sidecar JSON.
+    One row per document (a bundle contributes one row per document in it),
+    plus an FTS5 table over client, title and line-item descriptions.
+
+    refresh() rescans the output folder and only re-reads sidecars whose
+    mtime changed; DocumentManager also indexes every sidecar it writes.
+    """
+    def __init__(self, db_file: Optional[Union[str, Path]] = None, root: Optional[Union[str, Path]] = None):
+        self.root = Path(root) if root else get_output_dir()
+        self.db_file = Path(db_file) if db_file else self.root / INDEX_NAME
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    id INTEGER PRIMARY KEY,
+                    sidecar TEXT NOT NULL,
+                    part INTEGER NOT NULL,
+                    pdf TEXT NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    company TEXT,
+                    doc_type TEXT,
+                    client TEXT,
+                    invoice_no TEXT,
+                    title TEXT,
+                    doc_date TEXT,
+                    amount REAL,
+                    UNIQUE (sidecar, part)
+                );
+                CREATE INDEX IF NOT EXISTS documents_invoice_no ON documents (invoice_no);
+                CREATE INDEX IF NOT EXISTS documents_doc_date ON documents (doc_date);
+                CREATE INDEX IF NOT EXISTS documents_amount ON documents (amount);
+            """)
+            try:
+                conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts "
+                    "USING fts5(client, title, invoice_no, descriptions)"
+                )
+                self.has_fts = True
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5: text search falls back to LIKE.
+                self.has_fts = False
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_file, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ---------- UPDATING ----------
+    def refresh(self) -> Dict[str, int]:
+        """Brings the index up to date with the sidecars on disk. Returns counts of what changed."""
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        with self._lock, self._connect() as conn:
+            known = {
+                row["sidecar"]: row["mtime_ns"]
+                for row in conn.execute("SELECT sidecar, MAX(mtime_ns) AS mtime_ns FROM documents GROUP BY sidecar")
+            }
+            seen = set()
+            for json_path in self.root.rglob("*.json"):
+                key = str(json_path.resolve())
+                try:
+                    mtime_ns = json_path.stat().st_mtime_ns
+                except OSError:
+                    continue
+                seen.add(key)
+                if known.get(key) == mtime_ns:
+                    stats["unchanged"] += 1
+                    continue
+                if self._index_safely(conn, json_path, mtime_ns):
+                    stats["updated" if key in known else "added"] += 1
+
+            for key in set(known) - seen:
+                self._remove(conn, key)
+                stats["removed"] += 1
+        return stats
+
+    def rebuild(self) -> Dict[str, int]:
+        """Drops every row and indexes the output folder from scratch."""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM documents")
+            if self.has_fts:
+                conn.execute("DELETE FROM documents_fts")
+        return self.refresh()
+
+    def add(self, json_path: Union[str, Path], payload: Optional[Dict[str, Any]] = None) -> None:
+        """Indexes one sidecar right after it was written."""
+        json_path = Path(json_path)
+        with self._lock, self._connect() as conn:
+            self._index_safely(conn, json_path, json_path.stat().st_mtime_ns, payload)
+
+    def _index_safely(
+        self,
+        conn: sqlite3.Connection,
+        json_path: Path,
+        mtime_ns: int,
+        payload: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """_index_file(), skipping a sidecar whose contents it can't make sense of."""
+        try:
+            return self._index_file(conn, json_path, mtime_ns, payload)
+        except (ValueError, TypeError, AttributeError, ArithmeticError):
+            # Drop any rows it got as far as adding; one bad sidecar mustn't stop a refresh.
+            self._remove(conn, str(json_path.resolve()))
+            return False
+
+    def _index_file(
+        self,
+        conn: sqlite3.Connection,
+        json_path: Path,
+        mtime_ns: int,
+        payload: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        if payload is None:
+            try:
+                with open(json_path, "r") as f:
+                    payload = json.load(f)
+            except (json.JSONDecodeError, IOError, UnicodeDecodeError):
+                return False
+        if not isinstance(payload, dict):
+            return False
+
+        if payload.get("bundle"):
+            documents = payload.get("documents", [])
+        elif "doc_type" in payload and "form_data" in payload:
+            documents = [payload]
+        else:
+            return False  # Some other JSON file, e.g. a manifest
+
+        key = str(json_path.resolve())
+        pdf = str(json_path.with_suffix(".pdf").resolve())
+        self._remove(conn, key)
+        # Grand totals (line items plus GST) of every document in the bundle in one pass
+        totals = document_totals(
+            (document.get("doc_type", ""), document.get("form_data") or {}) for document in documents
+        )
+        for part, (document, total) in enumerate(zip(documents, totals)):
+            form_data = document.get("form_data") or {}
+            doc_type = document.get("doc_type", "")
+            client = _first(form_data, _CLIENT_FIELDS)
+            title = _first(form_data, _TITLE_FIELDS)
+            invoice_no = str(form_data.get("Invoice No", ""))
+            cursor = conn.execute(
+                "INSERT INTO documents (sidecar, part, pdf, mtime_ns, company, doc_type, client, "
+                "invoice_no, title, doc_date, amount) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key, part, pdf, mtime_ns, document.get("company", ""), doc_type, client,
+                    invoice_no, title, parse_date(form_data.get("Date")),
+                    None if total is None else total / 100,
+                )
+            )
+            if self.has_fts:
+                items = form_data.get("line_items")
+                descriptions = " ".join(
+                    str(item.get("Description", "")) for item in items if isinstance(item, dict)
+                ) if isinstance(items, list) else str(form_data.get("content", ""))
+                conn.execute(
+                    "INSERT INTO documents_fts (rowid, client, title, invoice_no, descriptions) VALUES (?, ?, ?, ?, ?)",
+                    (cursor.lastrowid, client, title, invoice_no, descriptions)
+                )
+        return True
+
+    def _remove(self, conn: sqlite3.Connection, key: str) -> None:
+        if self.has_fts:
+            conn.execute("DELETE FROM documents_fts WHERE rowid IN (SELECT id FROM documents WHERE sidecar = ?)", (key,))
+        conn.execute("DELETE FROM documents WHERE sidecar = ?", (key,))
+
+    # ---------- QUERYING ----------
+    def search(
+        self,
+        text: Optional[str] = None,
+        company: Optional[str] = None,
+        doc_type: Optional[str] = None,
+        client: Optional[str] = None,
+        invoice_no: Optional[str] = None,
+        date_from: DateLike = None,
+        date_to: DateLike = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        limit: int = 200
+    ) -> List[Dict[str, Any]]:
+        """
+        Finds documents, newest first. `text` is a full-text query over client,
+        campaign/subject, invoice number and line-item descriptions (prefix
+        matches, so "bill" finds "billboard"); the other filters are exact
+        (company, doc_type), substring (client, invoice_no) or ranges.
+        Each result has pdf, sidecar and part (the document's index in a bundle).
+        """
+        clauses, params = [], []
+        if text and text.strip():
+            if self.has_fts:
+                terms = ['"' + word.replace('"', '""') + '"*' for word in text.split()]
+                clauses.append("id IN (SELECT rowid FROM documents_fts WHERE documents_fts MATCH ?)")
+                params.append(" ".join(terms))
+            else:
+                for word in text.split():
+                    clauses.append("(client LIKE ? OR title LIKE ? OR invoice_no LIKE ?)")
+                    params += [f"%{word}%"] * 3
+        for column, value in (("company", company), ("doc_type", doc_type)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        for column, value in (("client", client), ("invoice_no", invoice_no)):
+            if value:
+                clauses.append(f"{column} LIKE ?")
+                params.append(f"%{value}%")
+        for op, value in ((">=", parse_date(date_from)), ("<=", parse_date(date_to))):
+            if value:
+                clauses.append(f"doc_date {op} ?")
+                params.append(value)
+        for op, value in ((">=", min_amount), ("<=", max_amount)):
+            if value is not None:
+                clauses.append(f"amount {op} ?")
+                params.append(value)
+
+        query = "SELECT * FROM documents"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY doc_date DESC, id DESC LIMIT ?"
+        params.append(limit)
+        with self._connect() as conn:
+            return [
+                {key: row[key] for key in row.keys() if key not in ("id", "mtime_ns")}
+                for row in conn.execute(query, params)
+            ]
+
+    def count(self) -> int:
+        """Returns the number of indexed documents."""
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+
+_index: Optional[DocumentIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_document_index() -> DocumentIndex:
+    """Returns the index of the default output folder."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = DocumentIndex()
+        return _index
@@ -1,21 +1,34 @@
 import os
-import importlib
 import sys
 import json
-import re
+import csv
+import hashlib
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, Optional
-from pdf_generator import PDFGenerator
-from utils import get_output_dir, resource_path
-from invoice_logic import InvoiceNumberGenerator
+from typing import Dict, Any, Optional, List, Set, Iterable, Union, Tuple, Callable, TYPE_CHECKING
+from utils import get_output_dir, get_cache_dir, resource_path
+from invoice_logic import InvoiceNumberGenerator, InvoiceNumberConflict, InvoiceLease
+from template_registry import get_template_registry
+from templates.base_template import BaseTemplate
+from validation import as_result
+from document_index import get_document_index, parse_date
+from asset_pipeline import resolve_profile
+from render_cache import RenderCache, render_key, DEFAULT_MAX_BYTES as DEFAULT_RENDER_CACHE_BYTES
+from output_layout import DEFAULT_LAYOUT, BUNDLE_FOLDER, sanitize_filename, shard_dir, claim_path
 
-def _sanitize_filename(name: str) -> str:
-    """Sanitizes a string to be safe for use in a filename."""
-    s = str(name).strip().replace(' ', '_')
-    s = re.sub(r'[\\/:*?"<>|]', '', s) # Remove invalid characters
-    return s
+if TYPE_CHECKING:
+    from pdf_generator import PDFGenerator
 
+# Output profile of the form preview: screen resolution is plenty.
+PREVIEW_PROFILE = "email"
+
+# How often generate_document re-renders after another process took its number.
+_COMMIT_ATTEMPTS = 5
+# Sidecars rerender_archive() hands to the worker pool at a time.
+_RERENDER_CHUNK = 200
 
 class DocumentManager:
     """Manages document templates and generation process."""
@@ -37,6 +50,7 @@ class DocumentManager:
         self.signature_path: Optional[str] = None
         self.stamp_path: Optional[str] = None
         self.invoice_generator = InvoiceNumberGenerator(config_file=self.config_file)
+        self.render_cache = self._create_render_cache()
 
     def _load_config(self):
         """Loads the main config file."""
@@ -48,27 +62,19 @@ class DocumentManager:
                 raise ValueError("Error reading config.json")
         raise FileNotFoundError("config.json not found")
 
-    def _load_templates(self) -> Dict[str, Dict[str, Any]]:
-        """Load all templates from the templates directory."""
-        templates = {}
-        templates_dir = Path(resource_path("src/templates"))
-
-        # Ensure current directory is in Python path
-        if str(Path(__file__).parent) not in sys.path:
-            sys.path.insert(0, str(Path(__file__).parent))
+    def _create_render_cache(self) -> Optional[RenderCache]:
+        """Opens the shared render cache, sized by "render_cache_mb" in config.json (0 turns it off)."""
+        max_mb = self.config.get("render_cache_mb", DEFAULT_RENDER_CACHE_BYTES // (1024 * 1024))
+        if not max_mb:
+            return None
+        return RenderCache(get_cache_dir() / "renders", max_bytes=int(max_mb * 1024 * 1024))
 
-        for filename in os.listdir(templates_dir):
-            if filename.endswith(".py") and filename not in ("__init__.py", "base_template.py"):
-                try:
-                    module_name = f"templates.{filename[:-3]}"
-                    module = importlib.import_module(module_name)
-                    template_class = module.get_template_class()
-                    template_data = template_class.get_template()
-                    template_data["template_class"] = template_class  # Attach the class instance
-                    templates[template_data["type"]] = template_data
-                except (ImportError, AttributeError) as e:
-                    print(f"Error loading template {filename}: {e}")
-        return templates
+    def _load_templates(self) -> Dict[str, Dict[str, Any]]:
+        """Returns the cached template schemas, including any user template directories from config.json."""
+        registry = get_template_registry()
+        for directory in self.config.get("template_dirs", []):
+            registry.register_directory(directory)
+        return registry.schemas()
 
     def get_letterhead_path(self, company: str) -> Optional[str]:
         """Find the appropriate letterhead image for a company from the config."""
@@ -81,25 +87,178 @@ class DocumentManager:
         except KeyError:
             return None
 
-    def generate_document(
+    def _build_output_path(self, company: str, doc_type: str, data: Dict[str, Any]) -> Path:
+        """
+        Builds the output PDF path from the M/s name, company and a timestamp,
+        in the folder given by the "output_layout" config setting. The file is
+        created empty to claim the name; a numeric suffix is added if it is taken.
+        """
+        now = datetime.now()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
+        output_dir = shard_dir(get_output_dir(), self.output_layout, company, doc_type, now)
+
+        # Incorporate M/s name and company into filename
+        ms_name = data.get("M/s", "")
+        company_prefix = company.split(' ')[0]  # e.g., "Glory" or "GoFar"
+
+        if ms_name:
+            sanitized_ms_name = sanitize_filename(ms_name)
+            filename_base = f"{sanitized_ms_name}_{company_prefix.replace(' ', '_')}_{doc_type.replace(' ', '_')}"
+        else:
+            filename_base = f"{company_prefix.replace(' ', '_')}_{doc_type.replace(' ', '_')}"
+
+        return claim_path(output_dir, f"{filename_base}_{timestamp}")
+
+    @property
+    def output_layout(self) -> str:
+        """Sub-folder pattern for generated documents, e.g. "{company}/{year}/{month}"."""
+        return self.config.get("output_layout", DEFAULT_LAYOUT)
+
+    def render_document(
         self,
         company: str,
         doc_type: str,
-        data: Optional[Dict[str, Any]] = None,
-        is_resave: bool = False
-    ) -> str:
-        """Generate a complete document with the given parameters."""
+        data: Dict[str, Any],
+        output_path: str
+    ) -> None:
+        """
+        Renders a document to output_path without touching counters or sidecars.
+        A document rendered before with identical inputs is copied from the
+        render cache instead, without loading fpdf2.
+        """
+        key = None
+        if self.render_cache is not None:
+            key = self._render_key(company, doc_type, data)
+            if self.render_cache.fetch(key, output_path):
+                return
+
+        from pdf_generator import PDFGenerator  # fpdf2 is loaded on the first render, not at startup
+        pdf_gen = PDFGenerator()
+        self._add_document(pdf_gen, company, doc_type, data)
+        pdf_gen.output(output_path)
+
+        if key is not None:
+            self.render_cache.store(key, output_path)
+
+    def render_preview(
+        self,
+        company: str,
+        doc_type: str,
+        data: Dict[str, Any],
+        output_profile: Optional[str] = PREVIEW_PROFILE
+    ) -> bytes:
+        """
+        Renders a document into memory for an on-screen preview. No file,
+        sidecar or invoice number is touched, and images are embedded at the
+        (smaller) output_profile, which is faster to build and to rasterize.
+        """
+        from pdf_generator import PDFGenerator
+        pdf_gen = PDFGenerator()
+        profile = resolve_profile(output_profile, self.config.get("output_profiles")) if output_profile else None
+        self._add_document(pdf_gen, company, doc_type, data, profile)
+        return pdf_gen.output_bytes()
+
+    def get_output_profile(self, company: str) -> Dict[str, Any]:
+        """The image settings for a company's documents, from its "output_profile" in config.json."""
+        company_config = self.config.get("companies", {}).get(company, {})
+        return resolve_profile(company_config.get("output_profile"), self.config.get("output_profiles"))
+
+    def build_assets(self, profiles: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Builds the image variants documents will embed: each company's
+        letterhead for its output profile (or for each of profiles), and the
+        signatures and stamps in assets/ for the same profiles. Returns one row
+        per variant with the source and variant sizes in bytes.
+        """
+        from pdf_generator import LETTERHEAD_WIDTH_MM, SIGNATURE_WIDTH_MM, STAMP_WIDTH_MM
+        from asset_pipeline import get_asset_pipeline
+        pipeline = get_asset_pipeline()
+        custom = self.config.get("output_profiles")
+
+        jobs = []
+        for company in self.config.get("companies", {}):
+            names = profiles or [self.get_output_profile(company)["name"]]
+            letterhead = self.get_letterhead_path(company)
+            if letterhead:
+                jobs += [(letterhead, name, LETTERHEAD_WIDTH_MM) for name in names]
+        names = profiles or sorted({self.get_output_profile(company)["name"] for company in self.config.get("companies", {})})
+        for folder, width_mm in (("assets/signatures", SIGNATURE_WIDTH_MM), ("assets/stamps", STAMP_WIDTH_MM)):
+            for image in sorted(Path(resource_path(folder)).glob("*")):
+                if image.suffix.lower() in (".png", ".jpg", ".jpeg"):
+                    jobs += [(str(image), name, width_mm) for name in names]
+
+        rows = []
+        for source, name, width_mm in jobs:
+            derived = pipeline.derive(source, resolve_profile(name, custom), width_mm)
+            rows.append({
+                "source": source,
+                "profile": name,
+                "variant": derived.path,
+                "source_bytes": os.path.getsize(source),
+                "variant_bytes": os.path.getsize(derived.path),
+            })
+        return rows
+
+    def _render_key(self, company: str, doc_type: str, data: Dict[str, Any]) -> str:
+        """Cache key over the form data, template, company settings and image files."""
+        schema = self.templates.get(doc_type) or {}
+        company_config = dict(self.config.get("companies", {}).get(company, {}))
+        company_config["output_profile"] = self.get_output_profile(company)
+        return render_key(
+            doc_type,
+            data,
+            schema.get("template_class"),
+            company_config,
+            [self.get_letterhead_path(company), self.signature_path, self.stamp_path],
+        )
+
+    def render_bundle(self, documents: List[Dict[str, Any]], output_path: str) -> List[List[int]]:
+        """
+        Renders {company, doc_type, form_data} documents as consecutive pages
+        of one PDF. Returns the first and last page of each document.
+        """
+        from pdf_generator import PDFGenerator
+        pdf_gen = PDFGenerator()
+        pages = []
+        for index, document in enumerate(documents):
+            try:
+                first_page, last_page = self._add_document(
+                    pdf_gen, document["company"], document["doc_type"], document["form_data"]
+                )
+            except Exception as e:
+                raise ValueError(f"Record {index}: {e}") from e
+            pages.append([first_page, last_page])
+        pdf_gen.output(output_path)
+        return pages
+
+    def _bundle_render_key(self, documents: List[Dict[str, Any]]) -> str:
+        """Combines the render keys of every document in a bundle."""
+        keys = [self._render_key(doc["company"], doc["doc_type"], doc["form_data"]) for doc in documents]
+        return hashlib.sha256(",".join(keys).encode("ascii")).hexdigest()
+
+    def _render_to_claimed_path(self, company: str, doc_type: str, data: Dict[str, Any], filename: Path) -> None:
+        """Renders into a path from _build_output_path, removing the empty placeholder if rendering fails."""
+        try:
+            self.render_document(company, doc_type, data, str(filename))
+        except BaseException:
+            filename.unlink(missing_ok=True)
+            raise
+
+    def _add_document(
+        self,
+        pdf_gen: 'PDFGenerator',
+        company: str,
+        doc_type: str,
+        data: Dict[str, Any],
+        output_profile: Optional[Dict[str, Any]] = None
+    ) -> Tuple[int, int]:
+        """
+        Appends a document to pdf_gen and returns its first and last page
+        numbers. output_profile overrides the company's profile.
+        """
         template = self.templates.get(doc_type)
         if not template:
             raise ValueError(f"Unknown document type: {doc_type}")
-        
-        data = data or {}
-
-        is_invoice = "Invoice" in doc_type
-        # Only generate a new invoice number if it's a new document
-        if is_invoice and not is_resave:
-            invoice_no = self.invoice_generator.peek_next(company)
-            data["Invoice No"] = invoice_no
 
         letterhead = self.get_letterhead_path(company)
         if not letterhead:
@@ -108,47 +267,679 @@ class DocumentManager:
                 f"Please check that the filename in config.json exists in assets/letterheads/"
             )
 
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_dir = get_output_dir()
-        
-        # Incorporate M/s name and company into filename
-        ms_name = data.get("M/s", "")
-        company_prefix = company.split(' ')[0]  # e.g., "Glory" or "GoFar"
-
-        if ms_name:
-            sanitized_ms_name = _sanitize_filename(ms_name)
-            filename_base = f"{sanitized_ms_name}_{company_prefix.replace(' ', '_')}_{doc_type.replace(' ', '_')}"
-        else:
-            filename_base = f"{company_prefix.replace(' ', '_')}_{doc_type.replace(' ', '_')}"
-        
-        filename = output_dir / f"{filename_base}_{timestamp}.pdf"
-
-        # Create and configure PDF generator
-        pdf_gen = PDFGenerator()
-        pdf_gen.generate(
+        return pdf_gen.add_document(
             company=company,
             doc_type=doc_type,
             template=template,
             letterhead_path=letterhead,
-            output_path=str(filename),
             data=data,
             signature_path=self.signature_path,
-            stamp_path=self.stamp_path
+            stamp_path=self.stamp_path,
+            output_profile=output_profile or self.get_output_profile(company)
         )
 
-        # --- Commit the invoice number only for new invoices ---
-        if is_invoice and not is_resave:
-            self.invoice_generator.commit(company)
-
-        # Save data to a JSON file for future editing
+    def _write_sidecar(self, pdf_path: Path, company: str, doc_type: str, data: Dict[str, Any]) -> Path:
+        """Saves data to a JSON file next to the PDF for future editing."""
         data_to_save = {
             "company": company,
             "doc_type": doc_type,
             "form_data": data,
+            # Lets rerender_archive() skip documents whose inputs haven't changed
+            "render_key": self._render_key(company, doc_type, data),
         }
-        json_path = filename.with_suffix(".json")
+        json_path = pdf_path.with_suffix(".json")
         with open(json_path, "w") as f:
             json.dump(data_to_save, f, indent=4)
+        self._index_sidecar(json_path, data_to_save)
+        return json_path
+
+    def _write_bundle_sidecar(self, pdf_path: Path, documents: List[Dict[str, Any]]) -> Path:
+        """Saves every document of a bundle, with its page range, next to the PDF."""
+        sidecar = {
+            "bundle": True,
+            "documents": documents,
+            "render_key": self._bundle_render_key(documents),
+        }
+        json_path = pdf_path.with_suffix(".json")
+        with open(json_path, "w") as f:
+            json.dump(sidecar, f, indent=4)
+        self._index_sidecar(json_path, sidecar)
+        return json_path
+
+    def _index_sidecar(self, json_path: Path, payload: Dict[str, Any]) -> None:
+        """Adds a freshly written sidecar to the search index; a failure here never fails generation."""
+        try:
+            get_document_index().add(json_path, payload)
+        except (sqlite3.Error, OSError) as e:
+            print(f"Could not index {json_path.name}: {e}")
+
+    def generate_document(
+        self,
+        company: str,
+        doc_type: str,
+        data: Optional[Dict[str, Any]] = None,
+        is_resave: bool = False
+    ) -> str:
+        """Generate a complete document with the given parameters."""
+        template = self.templates.get(doc_type)
+        if not template:
+            raise ValueError(f"Unknown document type: {doc_type}")
+        
+        data = data or {}
+
+        is_invoice = "Invoice" in doc_type
+        # Only generate a new invoice number if it's a new document
+        if not is_invoice or is_resave:
+            filename = self._build_output_path(company, doc_type, data)
+            self._render_to_claimed_path(company, doc_type, data, filename)
+            self._write_sidecar(filename, company, doc_type, data)
+            return str(filename.absolute())
+
+        for attempt in range(_COMMIT_ATTEMPTS):
+            number = self.invoice_generator.peek_number(company)
+            data["Invoice No"] = self.invoice_generator.format_number(company, number)
+
+            filename = self._build_output_path(company, doc_type, data)
+            self._render_to_claimed_path(company, doc_type, data, filename)
+
+            # --- Commit the invoice number only once the PDF is saved ---
+            try:
+                self.invoice_generator.commit(company, number)
+                break
+            except InvoiceNumberConflict:
+                # Another window or batch took this number while we rendered.
+                filename.unlink(missing_ok=True)
+                if attempt == _COMMIT_ATTEMPTS - 1:
+                    raise
+
+        self._write_sidecar(filename, company, doc_type, data)
 
         return str(filename.absolute())
+
+    def generate_batch(
+        self,
+        records: Union[str, Path, Iterable[Dict[str, Any]]],
+        workers: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Generates many documents in a process pool. See generate_many()."""
+        return self.generate_many(records, workers=workers, executor="process")
+
+    def generate_many(
+        self,
+        records: Union[str, Path, Iterable[Dict[str, Any]]],
+        workers: Optional[int] = None,
+        executor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Generates many documents from {company, doc_type, form_data} records,
+        either given directly or as a path to a JSONL/CSV file.
+
+        executor is "process" (a process pool) or "thread" (a thread pool in
+        this process, cheaper where starting processes is slow). It defaults to
+        threads in the frozen exe and processes otherwise.
+
+        A failing record is reported in the manifest and does not stop the
+        others. Invoice numbers are allocated in input order and stay gapless:
+        numbers are leased from the counter store up front; if a record fails,
+        the invoices after it are renumbered and re-rendered, and the numbers
+        left over are handed back when the batch ends.
+        """
+        if executor is None:
+            executor = "thread" if getattr(sys, "frozen", False) else "process"
+        if executor not in ("process", "thread"):
+            raise ValueError(f"Unknown executor: {executor}")
+
+        if isinstance(records, (str, Path)):
+            records = load_batch_records(records)
+
+        started = time.perf_counter()
+        manifest: List[Dict[str, Any]] = []
+        jobs: Dict[int, Dict[str, Any]] = {}
+
+        for index, record in enumerate(records):
+            is_object = isinstance(record, dict)
+            entry = {
+                "index": index,
+                "company": record.get("company") if is_object else None,
+                "doc_type": record.get("doc_type") if is_object else None,
+                "status": "pending",
+                "path": None,
+                "invoice_no": None,
+                "error": None,
+            }
+            manifest.append(entry)
+            try:
+                company, doc_type, data, numbered = self._parse_batch_record(record)
+                jobs[index] = {
+                    "company": company,
+                    "doc_type": doc_type,
+                    "data": data,
+                    "numbered": numbered,
+                    "path": self._build_output_path(company, doc_type, data),
+                }
+            except (KeyError, TypeError, ValueError) as e:
+                entry["status"] = "error"
+                entry["error"] = f"Invalid record: {e}"
+
+        leases = self._lease_batch_numbers(jobs.values())
+        try:
+            dirty = self._assign_batch_numbers(jobs, leases)
+            while dirty:
+                failures = self._run_batch_jobs({i: jobs[i] for i in sorted(dirty)}, workers, executor)
+                for index, error in failures.items():
+                    manifest[index]["status"] = "error"
+                    manifest[index]["error"] = error
+                    jobs.pop(index)["path"].unlink(missing_ok=True)
+                # Failed invoices leave holes; shift the later ones down and re-render them.
+                dirty = self._assign_batch_numbers(jobs, leases) if failures else set()
+        except BaseException:
+            for lease in leases.values():
+                self.invoice_generator.release(lease, lease.numbers)
+            for job in jobs.values():
+                job["path"].unlink(missing_ok=True)
+            raise
+
+        # Hand back the numbers the failed records would have used.
+        for company, lease in leases.items():
+            used = sum(1 for job in jobs.values() if job["numbered"] and job["company"] == company)
+            self.invoice_generator.release(lease, lease.numbers[used:])
+
+        for index in sorted(jobs):
+            job = jobs[index]
+            self._write_sidecar(job["path"], job["company"], job["doc_type"], job["data"])
+            manifest[index].update(
+                status="ok",
+                path=str(job["path"].absolute()),
+                invoice_no=job["data"].get("Invoice No"),
+            )
+
+        succeeded = sum(1 for entry in manifest if entry["status"] == "ok")
+        return {
+            "records": manifest,
+            "succeeded": succeeded,
+            "failed": len(manifest) - succeeded,
+            "executor": executor,
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+        }
+
+    def generate_bundle(
+        self,
+        records: Union[str, Path, Iterable[Dict[str, Any]]],
+        output_path: Optional[Union[str, Path]] = None
+    ) -> Dict[str, Any]:
+        """
+        Renders many documents as consecutive pages of one PDF, so shared
+        letterheads are embedded once for the whole file. The sidecar lists
+        every document with its form data and page range.
+
+        The bundle is all-or-nothing: invoice numbers are leased up front and
+        given back if any record is invalid or the file can't be written.
+        """
+        if isinstance(records, (str, Path)):
+            records = load_batch_records(records)
+
+        started = time.perf_counter()
+        parsed = []
+        for index, record in enumerate(records):
+            try:
+                parsed.append(self._parse_batch_record(record))
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"Record {index}: {e}") from e
+        if not parsed:
+            raise ValueError("No documents to bundle.")
+
+        leases = self._lease_batch_numbers(
+            {"company": company, "numbered": numbered} for company, _, _, numbered in parsed
+        )
+        claimed = None
+        try:
+            offsets: Dict[str, int] = {}
+            documents: List[Dict[str, Any]] = []
+            for company, doc_type, data, numbered in parsed:
+                if numbered:
+                    offset = offsets.get(company, 0)
+                    number = leases[company].numbers[offset]
+                    data["Invoice No"] = self.invoice_generator.format_number(company, number)
+                    offsets[company] = offset + 1
+                documents.append({"company": company, "doc_type": doc_type, "form_data": data})
+
+            if output_path is None:
+                now = datetime.now()
+                output_dir = shard_dir(get_output_dir(), self.output_layout, BUNDLE_FOLDER, "Bundle", now)
+                output_path = claimed = claim_path(output_dir, f"Bundle_{now.strftime('%Y%m%d_%H%M%S')}")
+            output_path = Path(output_path)
+            for document, pages in zip(documents, self.render_bundle(documents, str(output_path))):
+                document["pages"] = pages
+        except BaseException:
+            for lease in leases.values():
+                self.invoice_generator.release(lease, lease.numbers)
+            if claimed is not None:
+                claimed.unlink(missing_ok=True)
+            raise
+
+        for lease in leases.values():
+            self.invoice_generator.release(lease, [])
+
+        self._write_bundle_sidecar(output_path, documents)
+
+        return {
+            "path": str(output_path.absolute()),
+            "documents": [
+                {
+                    "company": doc["company"],
+                    "doc_type": doc["doc_type"],
+                    "invoice_no": doc["form_data"].get("Invoice No"),
+                    "pages": doc["pages"],
+                }
+                for doc in documents
+            ],
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+        }
+
+    def validate_records(self, records: Union[str, Path, Iterable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Checks batch records against their templates in one pass, without
+        leasing invoice numbers or rendering anything. Returns counts and
+        every error found, each with its record index and field path (e.g.
+        "form_data.line_items[2].Amount").
+        """
+        started = time.perf_counter()
+        errors: List[Dict[str, Any]] = []
+        if isinstance(records, (str, Path)):
+            read_errors: List[Tuple[int, str]] = []
+            records = load_batch_records(records, read_errors)
+            errors.extend({"index": index, "path": "", "message": message} for index, message in read_errors)
+
+        registry = get_template_registry()
+        companies = self.config.get("companies", {})
+        total = 0
+        for index, record in enumerate(records):
+            total += 1
+            if record is None:
+                continue  # Didn't parse; already reported
+            if not isinstance(record, dict):
+                errors.append({"index": index, "path": "", "message": "Record must be an object."})
+                continue
+            company, doc_type = record.get("company"), record.get("doc_type")
+            if company not in companies:
+                errors.append({"index": index, "path": "company", "message": f"Unknown company: {company}"})
+            template = registry.get(doc_type) if doc_type in self.templates else None
+            if template is None:
+                errors.append({"index": index, "path": "doc_type", "message": f"Unknown document type: {doc_type}"})
+                continue
+            data = record.get("form_data") or {}
+            try:
+                if type(template).validate_data is BaseTemplate.validate_data:
+                    # Numbered invoices get their Invoice No when the batch runs.
+                    numbered = "Invoice" in doc_type and not record.get("is_resave", False)
+                    result = template.validator.validate(data, skip=("Invoice No",) if numbered else ())
+                else:
+                    result = as_result(template.validate_data(data))
+            except Exception as e:
+                # A validator tripping over one record mustn't cost the report for the rest.
+                errors.append({"index": index, "path": "form_data", "message": f"Could not be validated: {e}"})
+                continue
+            errors.extend(
+                {"index": index, "path": "form_data." + error.path if error.path else "form_data", "message": error.message}
+                for error in result.errors
+            )
+
+        errors.sort(key=lambda error: error["index"])
+        invalid = len({error["index"] for error in errors})
+        return {
+            "records": total,
+            "valid": total - invalid,
+            "invalid": invalid,
+            "errors": errors,
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+        }
+
+    def rerender_archive(
+        self,
+        company: Optional[str] = None,
+        doc_type: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        workers: Optional[int] = None,
+        executor: Optional[str] = None,
+        force: bool = False,
+        suffix: Optional[str] = None,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Re-renders generated documents from their sidecars with their original
+        invoice numbers, e.g. after a letterhead or template change.
+
+        Sidecars under the output folder are streamed in chunks and filtered by
+        company, doc type and form date (a bundle matches if any of its
+        documents does). Documents whose stored render key still matches are
+        skipped unless force is set, and so are PDFs changed after their
+        sidecar was written (e.g. signed), since re-rendering would lose that.
+
+        Each PDF is rendered to a temp file and moved over the original, or
+        written next to it as <name><suffix>.pdf when suffix is given.
+        progress(report) is called after every sidecar.
+        """
+        if executor is None:
+            executor = "thread" if getattr(sys, "frozen", False) else "process"
+        date_from, date_to = parse_date(date_from), parse_date(date_to)
+
+        started = time.perf_counter()
+        sidecars = sorted(get_output_dir().rglob("*.json"))
+        report: Dict[str, Any] = {
+            "total": len(sidecars),
+            "processed": 0,
+            "rerendered": 0,
+            "unchanged": 0,
+            "modified": 0,
+            "ignored": 0,
+            "failed": 0,
+            "errors": [],
+        }
+
+        def update_rate() -> None:
+            elapsed = time.perf_counter() - started
+            report["elapsed_seconds"] = round(elapsed, 3)
+            report["docs_per_second"] = round(report["rerendered"] / elapsed, 2) if elapsed else 0.0
+
+        def skip(reason: str) -> None:
+            report[reason] += 1
+            report["processed"] += 1
+            if progress is not None:
+                update_rate()
+                progress(report)
+
+        chunk: Dict[int, Dict[str, Any]] = {}
+
+        def done(index: int, error: Optional[str]) -> None:
+            job = chunk[index]
+            if error is None:
+                os.replace(job["path"], job["target"])
+                if suffix is None:
+                    if "documents" in job:
+                        for document, pages in zip(job["documents"], job["result"]):
+                            document["pages"] = pages
+                        self._write_bundle_sidecar(job["target"], job["documents"])
+                    else:
+                        self._write_sidecar(job["target"], job["company"], job["doc_type"], job["data"])
+                report["rerendered"] += 1
+            else:
+                job["path"].unlink(missing_ok=True)
+                report["failed"] += 1
+                report["errors"].append({"sidecar": str(job["sidecar"]), "error": error})
+            report["processed"] += 1
+            if progress is not None:
+                update_rate()
+                progress(report)
+
+        for json_path in sidecars:
+            try:
+                with open(json_path, "r") as f:
+                    sidecar = json.load(f)
+            except (json.JSONDecodeError, IOError, UnicodeDecodeError):
+                skip("ignored")
+                continue
+            if not isinstance(sidecar, dict):
+                skip("ignored")
+                continue
+
+            documents = sidecar.get("documents") if sidecar.get("bundle") else [sidecar]
+            if not documents or not all(isinstance(d, dict) and "form_data" in d for d in documents):
+                skip("ignored")
+                continue
+            if not any(self._matches_filter(d, company, doc_type, date_from, date_to) for d in documents):
+                skip("ignored")
+                continue
+
+            pdf_path = json_path.with_suffix(".pdf")
+            target = pdf_path if suffix is None else pdf_path.with_name(f"{pdf_path.stem}{suffix}.pdf")
+            if not force:
+                if pdf_path.exists() and pdf_path.stat().st_mtime > json_path.stat().st_mtime + 2:
+                    skip("modified")
+                    continue
+                try:
+                    if sidecar.get("bundle"):
+                        current_key = self._bundle_render_key(documents)
+                    else:
+                        current_key = self._render_key(sidecar.get("company"), sidecar.get("doc_type"), sidecar["form_data"])
+                except OSError:
+                    current_key = None
+                if current_key is not None and current_key == sidecar.get("render_key") and target.exists():
+                    skip("unchanged")
+                    continue
+
+            job: Dict[str, Any] = {
+                "sidecar": json_path,
+                "target": target,
+                "path": target.with_name(target.name + ".tmp"),
+            }
+            if sidecar.get("bundle"):
+                job["documents"] = [
+                    {"company": d.get("company"), "doc_type": d.get("doc_type"), "form_data": d["form_data"]}
+                    for d in documents
+                ]
+            else:
+                job.update(company=sidecar.get("company"), doc_type=sidecar.get("doc_type"), data=sidecar["form_data"])
+            chunk[len(chunk)] = job
+
+            if len(chunk) >= _RERENDER_CHUNK:
+                self._run_batch_jobs(chunk, workers, executor, on_done=done)
+                chunk = {}
+
+        if chunk:
+            self._run_batch_jobs(chunk, workers, executor, on_done=done)
+
+        update_rate()
+        return report
+
+    @staticmethod
+    def _matches_filter(
+        document: Dict[str, Any],
+        company: Optional[str],
+        doc_type: Optional[str],
+        date_from: Optional[str],
+        date_to: Optional[str]
+    ) -> bool:
+        if company and document.get("company") != company:
+            return False
+        if doc_type and document.get("doc_type") != doc_type:
+            return False
+        if date_from or date_to:
+            doc_date = parse_date((document.get("form_data") or {}).get("Date"))
+            if not doc_date or (date_from and doc_date < date_from) or (date_to and doc_date > date_to):
+                return False
+        return True
+
+    def _parse_batch_record(self, record: Dict[str, Any]) -> Tuple[str, str, Dict[str, Any], bool]:
+        """
+        Checks a {company, doc_type, form_data} record and returns its parts,
+        plus whether it needs a new invoice number.
+        """
+        if not isinstance(record, dict):
+            raise ValueError("Record must be an object.")
+        company = record["company"]
+        doc_type = record["doc_type"]
+        if doc_type not in self.templates:
+            raise ValueError(f"Unknown document type: {doc_type}")
+        if company not in self.config.get("companies", {}):
+            raise ValueError(f"Unknown company: {company}")
+        data = dict(record.get("form_data") or {})
+        numbered = "Invoice" in doc_type and not record.get("is_resave", False)
+        return company, doc_type, data, numbered
+
+    def _lease_batch_numbers(self, jobs: Iterable[Dict[str, Any]]) -> Dict[str, InvoiceLease]:
+        """Leases one invoice number per numbered job, per company."""
+        counts: Dict[str, int] = {}
+        for job in jobs:
+            if job["numbered"]:
+                counts[job["company"]] = counts.get(job["company"], 0) + 1
+        leases: Dict[str, InvoiceLease] = {}
+        try:
+            for company, count in counts.items():
+                leases[company] = self.invoice_generator.lease(company, count)
+        except BaseException:
+            for lease in leases.values():
+                self.invoice_generator.release(lease, lease.numbers)
+            raise
+        return leases
+
+    def _assign_batch_numbers(
+        self,
+        jobs: Dict[int, Dict[str, Any]],
+        leases: Dict[str, InvoiceLease]
+    ) -> Set[int]:
+        """
+        Gives every numbered job the next leased invoice number for its company,
+        in input order. Returns the jobs whose number changed and need rendering.
+        """
+        offsets: Dict[str, int] = {}
+        changed = set()
+        for index in sorted(jobs):
+            job = jobs[index]
+            if job["numbered"]:
+                offset = offsets.get(job["company"], 0)
+                number = leases[job["company"]].numbers[offset]
+                invoice_no = self.invoice_generator.format_number(job["company"], number)
+                offsets[job["company"]] = offset + 1
+                if job["data"].get("Invoice No") != invoice_no or not job.get("rendered"):
+                    job["data"]["Invoice No"] = invoice_no
+                    changed.add(index)
+            elif not job.get("rendered"):
+                changed.add(index)
+        return changed
+
+    def _run_batch_jobs(
+        self,
+        jobs: Dict[int, Dict[str, Any]],
+        workers: Optional[int],
+        executor: str = "process",
+        on_done: Optional[Callable[[int, Optional[str]], None]] = None
+    ) -> Dict[int, str]:
+        """
+        Renders jobs, in a process or thread pool when worthwhile. A job with a
+        "documents" list is rendered as one bundle. on_done(index, error) is
+        called as each job finishes. Returns errors by job index.
+        """
+        failures: Dict[int, str] = {}
+        workers = workers or os.cpu_count() or 1
+
+        def finished(index: int, error: Optional[str], result: Any = None) -> None:
+            if error is None:
+                jobs[index]["rendered"] = True
+                jobs[index]["result"] = result
+            else:
+                failures[index] = error
+            if on_done is not None:
+                on_done(index, error)
+
+        if workers <= 1 or len(jobs) <= 1:
+            for index, job in jobs.items():
+                try:
+                    if "documents" in job:
+                        result = self.render_bundle(job["documents"], str(job["path"]))
+                    else:
+                        result = self.render_document(job["company"], job["doc_type"], job["data"], str(job["path"]))
+                    finished(index, None, result)
+                except Exception as e:
+                    finished(index, str(e))
+            return failures
+
+        if executor == "thread":
+            # PDFGenerator, the templates and the asset cache share no unguarded
+            # state, and fpdf2 spends much of its time in zlib/PIL with the GIL released.
+            pool = ThreadPoolExecutor(max_workers=min(workers, len(jobs)))
+            submit = lambda job: (
+                pool.submit(self.render_bundle, job["documents"], str(job["path"])) if "documents" in job
+                else pool.submit(self.render_document, job["company"], job["doc_type"], job["data"], str(job["path"]))
+            )
+        else:
+            pool = ProcessPoolExecutor(
+                max_workers=min(workers, len(jobs)),
+                initializer=_init_batch_worker,
+                initargs=(str(self.config_file), self.signature_path, self.stamp_path),
+            )
+            submit = lambda job: (
+                pool.submit(_render_bundle_job, job["documents"], str(job["path"])) if "documents" in job
+                else pool.submit(_render_batch_job, job["company"], job["doc_type"], job["data"], str(job["path"]))
+            )
+
+        with pool:
+            futures = {submit(job): index for index, job in jobs.items()}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                    finished(futures[future], None, result)
+                except Exception as e:
+                    finished(futures[future], str(e) or type(e).__name__)
+        return failures
+
+
+def load_batch_records(
+    path: Union[str, Path],
+    errors: Optional[List[Tuple[int, str]]] = None
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Reads batch records from a JSONL or CSV file.
+    JSONL lines use the sidecar shape: {"company", "doc_type", "form_data"}.
+    CSV rows need company and doc_type columns, plus either a form_data column
+    holding JSON, or one column per form field (line_items as a JSON list).
+
+    JSON that doesn't parse raises ValueError; if errors is given, it is
+    added there as (record index, message) and the record is read as None,
+    so the whole file can be checked at once.
+    """
+    path = Path(path)
+    records: List[Optional[Dict[str, Any]]] = []
+
+    def bad(message: str) -> None:
+        if errors is None:
+            raise ValueError(message)
+        errors.append((len(records), message))
+        records.append(None)
+
+    if path.suffix.lower() == ".csv":
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for row_no, row in enumerate(csv.DictReader(f), 2):  # Row 1 is the header
+                record = {"company": row.pop("company", ""), "doc_type": row.pop("doc_type", "")}
+                try:
+                    if "form_data" in row:
+                        record["form_data"] = json.loads(row["form_data"] or "{}")
+                    else:
+                        form_data = {k: v for k, v in row.items() if k and v is not None}
+                        if form_data.get("line_items"):
+                            form_data["line_items"] = json.loads(form_data["line_items"])
+                        record["form_data"] = form_data
+                except json.JSONDecodeError as e:
+                    bad(f"{path.name}, row {row_no}: {e}")
+                    continue
+                records.append(record)
+        return records
+
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                bad(f"{path.name}, line {line_no}: {e}")
+    return records
+
+
+# --- Process pool workers: one DocumentManager per worker process ---
+_batch_manager: Optional[DocumentManager] = None
+
+
+def _init_batch_worker(config_file: str, signature_path: Optional[str], stamp_path: Optional[str]) -> None:
+    global _batch_manager
+    _batch_manager = DocumentManager(config_file=config_file)
+    _batch_manager.signature_path = signature_path
+    _batch_manager.stamp_path = stamp_path
+
+
+def _render_batch_job(company: str, doc_type: str, data: Dict[str, Any], output_path: str) -> None:
+    _batch_manager.render_document(company, doc_type, data, output_path)
+
+
+def _render_bundle_job(documents: List[Dict[str, Any]], output_path: str) -> List[List[int]]:
+    return _batch_manager.render_bundle(documents, output_path)
@@ -0,0 +1,201 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import lru_cache
+from typing import Tuple, Union
+
+Number = Union[int, float, str, Decimal]
+
+# Money formatting and amount-in-words without locale or num2words.
+# Nothing here touches process-global state, so it is safe to call from
+# several rendering threads at once.
+
+_ONES = [
+    "zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine",
+    "ten", "eleven", "twelve", "thirteen", "fourteen", "fifteen", "sixteen",
+    "seventeen", "eighteen", "nineteen",
+]
+_TENS = ["", "", "twenty", "thirty", "forty", "fifty", "sixty", "seventy", "eighty", "ninety"]
+_INTERNATIONAL_SCALES = ["", "thousand", "million", "billion", "trillion", "quadrillion"]
+
+# Largest amount in paisa that to_paisa() accepts: what a signed 64-bit column holds.
+MAX_PAISA = 2 ** 63 - 1
+
+MONEY_STYLES = {
+    "plain": "{amount}",
+    "Rs.": "Rs. {amount}/-",
+    "PKR": "PKR {amount}",
+}
+
+
+def to_decimal(amount: Number) -> Decimal:
+    """Converts a number or a user-entered string like '1,25,000.50' to Decimal."""
+    if isinstance(amount, Decimal):
+        value = amount
+    else:
+        if isinstance(amount, str):
+            amount = amount.replace(",", "").strip() or "0"
+        try:
+            # str() first so floats keep their shortest repr (0.1 -> 0.1, not 0.1000000000000000055)
+            value = Decimal(str(amount))
+        except InvalidOperation:
+            raise ValueError(f"'{amount}' is not a valid amount.")
+    # NaN and Infinity parse, but nothing downstream can format or round them.
+    if not value.is_finite():
+        raise ValueError(f"'{amount}' is not a valid amount.")
+    return value
+
+
+def _group_western(digits: str) -> str:
+    groups = []
+    while len(digits) > 3:
+        groups.insert(0, digits[-3:])
+        digits = digits[:-3]
+    groups.insert(0, digits)
+    return ",".join(groups)
+
+
+def _group_indian(digits: str) -> str:
+    # Last three digits, then pairs: 1,23,45,678
+    if len(digits) <= 3:
+        return digits
+    head, tail = digits[:-3], digits[-3:]
+    groups = []
+    while len(head) > 2:
+        groups.insert(0, head[-2:])
+        head = head[:-2]
+    groups.insert(0, head)
+    return ",".join(groups) + "," + tail
+
+
+def format_amount(amount: Number, decimals: int = 2, grouping: str = "western") -> str:
+    """
+    Formats an amount with thousands separators, rounding half up.
+    grouping is "western" (1,234,567.00) or "indian" (12,34,567.00).
+    """
+    value = to_decimal(amount)
+    quantum = Decimal(1).scaleb(-decimals)
+    value = value.quantize(quantum, rounding=ROUND_HALF_UP)
+    sign = "-" if value < 0 else ""
+    text = f"{abs(value):.{decimals}f}"
+    digits, _, fraction = text.partition(".")
+    grouped = _group_indian(digits) if grouping == "indian" else _group_western(digits)
+    return sign + grouped + ("." + fraction if fraction else "")
+
+
+def format_money(amount: Number, style: str = "plain", decimals: int = 2, grouping: str = "western") -> str:
+    """Formats an amount in one of MONEY_STYLES: "plain", "Rs." or "PKR"."""
+    return MONEY_STYLES[style].format(amount=format_amount(amount, decimals, grouping))
+
+
+def _below_hundred(n: int) -> str:
+    if n < 20:
+        return _ONES[n]
+    tens, ones = divmod(n, 10)
+    return _TENS[tens] + ("-" + _ONES[ones] if ones else "")
+
+
+def _below_thousand(n: int, use_and: bool) -> str:
+    hundreds, rest = divmod(n, 100)
+    if not hundreds:
+        return _below_hundred(rest)
+    words = _ONES[hundreds] + " hundred"
+    if rest:
+        words += (" and " if use_and else " ") + _below_hundred(rest)
+    return words
+
+
+def _join_groups(parts, rest: int, use_and: bool) -> str:
+    """Joins scale groups with commas; a trailing group under 100 gets 'and', as in 'one thousand and one'."""
+    if rest:
+        if parts and rest < 100:
+            tail = ("and " if use_and else "") + _below_hundred(rest)
+            return ", ".join(parts) + " " + tail
+        parts.append(_below_thousand(rest, use_and))
+    return ", ".join(parts)
+
+
+@lru_cache(maxsize=4096)
+def number_to_words(n: int, system: str = "indian", use_and: bool = True) -> str:
+    """
+    Spells out a whole number in English, memoized.
+    system "indian" uses thousand/lakh/crore, "international" uses thousand/million/billion.
+    """
+    if n < 0:
+        return "minus " + number_to_words(-n, system, use_and)
+    if n == 0:
+        return _ONES[0]
+
+    parts = []
+    if system == "indian":
+        crore, n = divmod(n, 10_000_000)
+        lakh, n = divmod(n, 100_000)
+        thousand, rest = divmod(n, 1000)
+        if crore:
+            parts.append(number_to_words(crore, system, use_and) + " crore")
+        if lakh:
+            parts.append(_below_hundred(lakh) + " lakh")
+        if thousand:
+            parts.append(_below_hundred(thousand) + " thousand")
+        return _join_groups(parts, rest, use_and)
+
+    groups = []
+    while n:
+        n, group = divmod(n, 1000)
+        groups.append(group)
+    rest = groups[0]
+    for scale in range(len(groups) - 1, 0, -1):
+        if groups[scale]:
+            if scale < len(_INTERNATIONAL_SCALES):
+                parts.append(_below_thousand(groups[scale], use_and) + " " + _INTERNATIONAL_SCALES[scale])
+            else:
+                raise ValueError("Number too large to spell out.")
+    return _join_groups(parts, rest, use_and)
+
+
+def to_paisa(amount: Number) -> int:
+    """Converts an amount in rupees to whole paisa, rounding half up (away from zero)."""
+    paisa = None
+    if type(amount) is int:
+        paisa = amount * 100
+    elif isinstance(amount, str):
+        # Plain '1,25,000.50' needs no Decimal; anything else (signs, exponents, 3+ decimals) does.
+        whole, _, fraction = amount.replace(",", "").strip().partition(".")
+        if whole.isdecimal() and len(fraction) <= 2 and (fraction.isdecimal() or not fraction):
+            paisa = int(whole + fraction.ljust(2, "0"))
+    if paisa is None:
+        try:
+            paisa = int(to_decimal(amount).scaleb(2).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+        except InvalidOperation:  # More digits than the decimal context holds, e.g. '1e30'
+            raise ValueError(f"'{amount}' is too large an amount.")
+    if not -MAX_PAISA <= paisa <= MAX_PAISA:
+        raise ValueError(f"'{amount}' is too large an amount.")
+    return paisa
+
+
+def paisa_to_decimal(paisa: int) -> Decimal:
+    """Converts whole paisa back to an exact rupee amount with two decimals."""
+    return Decimal(paisa).scaleb(-2)
+
+
+def split_rupees(amount: Number) -> Tuple[int, int]:
+    """Splits an amount into whole rupees and paisa, rounding paisa half up."""
+    paisa_total = to_paisa(amount)
+    sign = -1 if paisa_total < 0 else 1
+    rupees, paisa = divmod(abs(paisa_total), 100)
+    return sign * rupees, paisa
+
+
+@lru_cache(maxsize=4096)
+def _rupees_in_words(rupees: int, paisa: int, system: str) -> str:
+    words = number_to_words(rupees, system) + " rupees"
+    if paisa:
+        words += " and " + number_to_words(paisa, system) + " paisa"
+    return words
+
+
+def amount_in_words(amount: Number, system: str = "indian") -> str:
+    """
+    Spells out a money amount, e.g. 1250.5 -> 'one thousand, two hundred and fifty
+    rupees and fifty paisa'. Paisa are only mentioned when non-zero.
+    """
+    rupees, paisa = split_rupees(amount)
+    return _rupees_in_words(rupees, paisa, system)
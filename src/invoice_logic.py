@@ -1,11 +1,203 @@
 import json
+import sqlite3
+import time
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
 from utils import resource_path
 
+
+class InvoiceNumberConflict(Exception):
+    """Raised when the number being committed was already taken by another process."""
+
+
+class InvoiceLease(NamedTuple):
+    """A block of invoice numbers reserved for one batch."""
+    company: str
+    lease_id: int
+    numbers: List[int]
+
+
+class CounterStore:
+    """
+    Crash-safe invoice counters in an SQLite database (WAL mode, full fsync).
+    Every change runs in its own write transaction, so several app instances
+    and batch workers can share the store without handing out a number twice.
+
+    Numbers that were reserved but never used (a failed batch) are returned
+    to the store; if they can't be rolled back off the end of the sequence
+    they are kept as "released" and handed out before any new number, so the
+    sequence stays gapless.
+    """
+    def __init__(self, db_file: Path, legacy_json: Optional[Path] = None):
+        self.db_file = Path(db_file)
+        conn = sqlite3.connect(self.db_file, timeout=30, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            conn.close()
+
+        with self._transaction() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (company TEXT PRIMARY KEY, last_number INTEGER NOT NULL)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS released ("
+                "company TEXT NOT NULL, number INTEGER NOT NULL, PRIMARY KEY (company, number))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, company TEXT NOT NULL, "
+                "numbers TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            is_new = conn.execute("SELECT COUNT(*) FROM counters").fetchone()[0] == 0
+            if is_new and legacy_json is not None:
+                self._import_json(conn, Path(legacy_json))
+
+    @staticmethod
+    def _import_json(conn: sqlite3.Connection, json_file: Path) -> None:
+        """Seeds the store from the old invoice_counter.json on first use."""
+        if not json_file.exists():
+            return
+        try:
+            with open(json_file, 'r') as f:
+                counters = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return
+        conn.executemany(
+            "INSERT OR REPLACE INTO counters (company, last_number) VALUES (?, ?)",
+            [(key, int(value)) for key, value in counters.items()]
+        )
+
+    @contextmanager
+    def _transaction(self):
+        """Opens a connection and holds the database write lock until the block ends."""
+        conn = sqlite3.connect(self.db_file, timeout=30, isolation_level=None)
+        try:
+            conn.execute("PRAGMA synchronous=FULL")
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _state(conn: sqlite3.Connection, company: str):
+        row = conn.execute("SELECT last_number FROM counters WHERE company = ?", (company,)).fetchone()
+        released = [r[0] for r in conn.execute(
+            "SELECT number FROM released WHERE company = ? ORDER BY number", (company,)
+        )]
+        return (row[0] if row else 0), released
+
+    @staticmethod
+    def _set_last(conn: sqlite3.Connection, company: str, last_number: int) -> None:
+        conn.execute(
+            "INSERT INTO counters (company, last_number) VALUES (?, ?) "
+            "ON CONFLICT(company) DO UPDATE SET last_number = excluded.last_number",
+            (company, last_number)
+        )
+
+    def snapshot(self) -> Dict[str, int]:
+        """Returns the last used number of every company."""
+        with self._transaction() as conn:
+            return dict(conn.execute("SELECT company, last_number FROM counters"))
+
+    def peek(self, company: str, offset: int = 0) -> int:
+        """Returns the number that would be handed out offset places from now."""
+        with self._transaction() as conn:
+            last_number, released = self._state(conn, company)
+        if offset < len(released):
+            return released[offset]
+        return last_number + 1 + offset - len(released)
+
+    def commit(self, company: str, number: Optional[int] = None) -> int:
+        """
+        Marks the next number as used and returns it. If number is given, it
+        must still be the next one, otherwise InvoiceNumberConflict is raised.
+        """
+        with self._transaction() as conn:
+            last_number, released = self._state(conn, company)
+            expected = released[0] if released else last_number + 1
+            if number is not None and number != expected:
+                raise InvoiceNumberConflict(
+                    f"Invoice number {number} was already used; the next free number is {expected}."
+                )
+            if released:
+                conn.execute("DELETE FROM released WHERE company = ? AND number = ?", (company, expected))
+            else:
+                self._set_last(conn, company, expected)
+            return expected
+
+    def set_last(self, company: str, last_number: int) -> None:
+        """Sets the last used number and forgets any released numbers."""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM released WHERE company = ?", (company,))
+            self._set_last(conn, company, last_number)
+
+    def lease(self, company: str, count: int) -> InvoiceLease:
+        """Reserves count numbers in one transaction, released ones first."""
+        with self._transaction() as conn:
+            last_number, released = self._state(conn, company)
+            numbers = released[:count]
+            if numbers:
+                conn.executemany(
+                    "DELETE FROM released WHERE company = ? AND number = ?",
+                    [(company, n) for n in numbers]
+                )
+            fresh = count - len(numbers)
+            numbers += list(range(last_number + 1, last_number + 1 + fresh))
+            if fresh:
+                self._set_last(conn, company, last_number + fresh)
+            cursor = conn.execute(
+                "INSERT INTO leases (company, numbers, created) VALUES (?, ?, ?)",
+                (company, json.dumps(numbers), time.time())
+            )
+            return InvoiceLease(company, cursor.lastrowid, numbers)
+
+    def release(self, lease: InvoiceLease, unused: List[int]) -> None:
+        """Closes a lease, returning the numbers it did not use."""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM leases WHERE id = ?", (lease.lease_id,))
+            self._return_numbers(conn, lease.company, unused)
+
+    def recover_leases(self, older_than: float) -> int:
+        """
+        Returns the numbers of leases older than `older_than` seconds, left
+        behind by a batch that crashed. Returns how many leases were recovered.
+        """
+        cutoff = time.time() - older_than
+        with self._transaction() as conn:
+            stale = conn.execute("SELECT id, company, numbers FROM leases WHERE created < ?", (cutoff,)).fetchall()
+            for lease_id, company, numbers in stale:
+                conn.execute("DELETE FROM leases WHERE id = ?", (lease_id,))
+                self._return_numbers(conn, company, json.loads(numbers))
+        return len(stale)
+
+    def _return_numbers(self, conn: sqlite3.Connection, company: str, numbers: List[int]) -> None:
+        if not numbers:
+            return
+        last_number, released = self._state(conn, company)
+        pool = set(released) | set(numbers)
+        # Roll the counter back over returned numbers at the end of the sequence.
+        while last_number in pool:
+            pool.remove(last_number)
+            last_number -= 1
+        self._set_last(conn, company, last_number)
+        conn.execute("DELETE FROM released WHERE company = ?", (company,))
+        conn.executemany(
+            "INSERT INTO released (company, number) VALUES (?, ?)",
+            [(company, n) for n in sorted(pool) if n <= last_number]
+        )
+
+
 class InvoiceNumberGenerator:
     """
     Manages invoice number generation with a persistent counter.
     Uses a 'peek' and 'commit' system to prevent skipping numbers on error.
+    Counters live in an SQLite store next to invoice_counter.json, which is
+    imported once when the store is first created.
     """
     def __init__(self, counter_file='invoice_counter.json', config_file='config.json'):
         self.counter_file = Path(resource_path(counter_file))
@@ -13,18 +205,17 @@ class InvoiceNumberGenerator:
             self.config_file = Path(config_file)
         else:
             self.config_file = Path(resource_path(config_file))
-        self.counters = self._load_counters()
+        self.store = CounterStore(self.counter_file.with_suffix(".db"), legacy_json=self.counter_file)
         self.config = self._load_config()
 
+    @property
+    def counters(self) -> Dict[str, int]:
+        """Last used number per company key, read fresh from the store."""
+        return self.store.snapshot()
+
     def _load_counters(self):
-        """Loads the counter file from disk. Returns empty dict if not found."""
-        if self.counter_file.exists():
-            try:
-                with open(self.counter_file, 'r') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError):
-                return {}
-        return {}
+        """Returns the current counters from the store."""
+        return self.store.snapshot()
 
     def _load_config(self):
         """Loads the main config file."""
@@ -36,39 +227,51 @@ class InvoiceNumberGenerator:
                 raise ValueError("Error reading config.json")
         raise FileNotFoundError("config.json not found")
 
-    def _save_counters(self):
-        """Saves the current counters to the file."""
-        with open(self.counter_file, 'w') as f:
-            json.dump(self.counters, f, indent=4)
-
     def _get_company_key(self, company_name: str) -> str:
         """Generates a consistent key from the company name."""
         return company_name.lower().replace(' ', '_')
 
-    def peek_next(self, company_name: str) -> str:
-        """
-        Determines the next invoice number without incrementing the counter.
-        """
-        company_key = self._get_company_key(company_name)
-        last_number = self.counters.get(company_key, 0)
-        next_number = last_number + 1
-
+    def format_number(self, company_name: str, number: int) -> str:
+        """Formats a raw counter value with the company's invoice pattern."""
         try:
             pattern = self.config["companies"][company_name]["invoice_pattern"]
-            return pattern.format(next_number)
+            return pattern.format(number)
         except KeyError:
             # Fallback for any other company not in config
-            return f"INV-{next_number}"
+            return f"INV-{number}"
+
+    def peek_number(self, company_name: str, offset: int = 0) -> int:
+        """Returns the raw next counter value without using it."""
+        return self.store.peek(self._get_company_key(company_name), offset)
+
+    def peek_next(self, company_name: str, offset: int = 0) -> str:
+        """
+        Determines the next invoice number without incrementing the counter.
+        A non-zero offset looks further ahead, e.g. offset=1 gives the number
+        after next.
+        """
+        return self.format_number(company_name, self.peek_number(company_name, offset))
 
-    def commit(self, company_name: str):
+    def commit(self, company_name: str, number: Optional[int] = None):
         """
         Increments and saves the counter for the given company.
         This should only be called after the document is successfully saved.
+        Pass the peeked number to make sure no other process took it meanwhile;
+        InvoiceNumberConflict is raised if one did.
         """
-        company_key = self._get_company_key(company_name)
-        last_number = self.counters.get(company_key, 0)
-        self.counters[company_key] = last_number + 1
-        self._save_counters()
+        return self.store.commit(self._get_company_key(company_name), number)
+
+    def lease(self, company_name: str, count: int) -> InvoiceLease:
+        """Reserves count numbers for a batch. Return unused ones with release()."""
+        return self.store.lease(self._get_company_key(company_name), count)
+
+    def release(self, lease: InvoiceLease, unused: List[int]) -> None:
+        """Closes a lease and gives its unused numbers back."""
+        self.store.release(lease, unused)
+
+    def recover_leases(self, older_than: float = 3600) -> int:
+        """Gives back numbers leased by batches that never finished."""
+        return self.store.recover_leases(older_than)
 
     def set_counter(self, company_name: str, new_next_number: int):
         """
@@ -77,10 +280,7 @@ class InvoiceNumberGenerator:
         """
         if not isinstance(new_next_number, int) or new_next_number < 1:
             raise ValueError("Invoice number must be a positive integer.")
-            
+
         company_key = self._get_company_key(company_name)
         # We store the 'last used' number, so subtract 1 from the desired 'next' number.
-        self.counters[company_key] = new_next_number - 1
-        self._save_counters()
-        # Reload counters from disk to ensure consistency
-        self.counters = self._load_counters()
+        self.store.set_last(company_key, new_next_number - 1)
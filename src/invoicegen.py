@@ -0,0 +1,445 @@
+"""
+Headless command-line entry point.
+
+    python -m invoicegen generate "GoFar Media" Invoice --data form.json
+    python -m invoicegen batch records.jsonl --workers 4
+    python -m invoicegen validate records.jsonl
+    python -m invoicegen renumber "GoFar Media" 130
+    python -m invoicegen search billboard --client Acme --from 01-01-2025
+    python -m invoicegen stamp "GoFar Media" generated_docs/GoFar_Media/2025/11 --preset signed
+
+Run from the src directory (or with src on PYTHONPATH). Nothing here imports
+tkinter, customtkinter or the signer, so it works on servers without a display.
+"""
+import argparse
+import json
+import sys
+from multiprocessing import freeze_support
+
+
+def _load_manager():
+    # Imported on demand so `--help` and argument errors don't pay for fpdf2 and the templates.
+    from document_manager import DocumentManager
+    return DocumentManager()
+
+
+def _write_manifest(manifest, path) -> None:
+    output = json.dumps(manifest, indent=4)
+    if path:
+        with open(path, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+def _cmd_generate(args) -> int:
+    if args.data == "-":
+        data = json.load(sys.stdin)
+    else:
+        with open(args.data, "r") as f:
+            data = json.load(f)
+    # Accept either bare form data or a full sidecar file.
+    if "form_data" in data:
+        data = data["form_data"]
+
+    doc_manager = _load_manager()
+    doc_manager.signature_path = args.signature
+    doc_manager.stamp_path = args.stamp
+    filepath = doc_manager.generate_document(
+        company=args.company,
+        doc_type=args.doc_type,
+        data=data,
+        is_resave=args.resave
+    )
+    print(filepath)
+    return 0
+
+
+def _print_validation(report) -> None:
+    for error in report["errors"]:
+        where = f"record {error['index']}" + (f", {error['path']}" if error["path"] else "")
+        print(f"{where}: {error['message']}", file=sys.stderr)
+    print(
+        f"{report['valid']} of {report['records']} records valid, {report['invalid']} invalid "
+        f"({len(report['errors'])} errors) in {report['elapsed_seconds']}s",
+        file=sys.stderr
+    )
+
+
+def _cmd_validate(args) -> int:
+    doc_manager = _load_manager()
+    report = doc_manager.validate_records(args.records)
+    if args.manifest:
+        _write_manifest(report, args.manifest)
+    _print_validation(report)
+    return 0 if report["invalid"] == 0 else 1
+
+
+def _cmd_batch(args) -> int:
+    doc_manager = _load_manager()
+    if args.validate:
+        report = doc_manager.validate_records(args.records)
+        if report["invalid"]:
+            # Stop before any invoice number is leased or anything is rendered.
+            _write_manifest(report, args.manifest)
+            _print_validation(report)
+            return 1
+
+    if args.bundle:
+        manifest = doc_manager.generate_bundle(args.records, output_path=args.output)
+        _write_manifest(manifest, args.manifest)
+        print(f"{len(manifest['documents'])} documents bundled into {manifest['path']}", file=sys.stderr)
+        return 0
+
+    manifest = doc_manager.generate_many(args.records, workers=args.workers, executor=args.executor)
+    _write_manifest(manifest, args.manifest)
+    print(
+        f"{manifest['succeeded']} generated, {manifest['failed']} failed "
+        f"in {manifest['elapsed_seconds']}s",
+        file=sys.stderr
+    )
+    return 0 if manifest["failed"] == 0 else 1
+
+
+def _cmd_renumber(args) -> int:
+    doc_manager = _load_manager()
+    generator = doc_manager.invoice_generator
+    companies = list(doc_manager.config.get("companies", {}).keys())
+
+    if args.recover_leases is not None:
+        recovered = generator.recover_leases(older_than=args.recover_leases * 60)
+        print(f"Recovered {recovered} unfinished batch lease(s).")
+
+    if args.company is None:
+        for company in companies:
+            print(f"{company}: next invoice is {generator.peek_next(company)}")
+        return 0
+
+    if args.company not in companies:
+        print(f"Unknown company: {args.company}", file=sys.stderr)
+        return 2
+    if args.next_number is None:
+        print(f"{args.company}: next invoice is {generator.peek_next(args.company)}")
+        return 0
+
+    generator.set_counter(args.company, args.next_number)
+    print(f"{args.company}: next invoice is {generator.peek_next(args.company)}")
+    return 0
+
+
+def _cmd_templates(args) -> int:
+    if args.write_manifest:
+        from template_registry import write_manifest
+        modules = write_manifest(args.write_manifest)
+        print(f"Wrote manifest with {len(modules)} modules: {', '.join(modules)}")
+        return 0
+
+    doc_manager = _load_manager()
+    for doc_type in doc_manager.templates:
+        print(doc_type)
+    return 0
+
+
+def _cmd_reindex(args) -> int:
+    from document_index import get_document_index
+    index = get_document_index()
+    stats = index.rebuild() if args.full else index.refresh()
+    print(
+        f"{stats['added']} added, {stats['updated']} updated, {stats['removed']} removed, "
+        f"{stats['unchanged']} unchanged; {index.count()} documents indexed."
+    )
+    return 0
+
+
+def _cmd_search(args) -> int:
+    from document_index import get_document_index
+    index = get_document_index()
+    if not args.no_refresh:
+        index.refresh()
+    results = index.search(
+        text=" ".join(args.text) or None,
+        company=args.company,
+        doc_type=args.doc_type,
+        client=args.client,
+        invoice_no=args.invoice_no,
+        date_from=args.date_from,
+        date_to=args.date_to,
+        min_amount=args.min_amount,
+        max_amount=args.max_amount,
+        limit=args.limit,
+    )
+    if args.json:
+        print(json.dumps(results, indent=4))
+        return 0
+    for row in results:
+        amount = f"{row['amount']:,.2f}" if row["amount"] is not None else ""
+        print(f"{row['doc_date'] or '':<10}  {row['invoice_no'] or '':<20}  {row['client'][:30]:<30}  {amount:>14}  {row['pdf']}")
+    return 0
+
+
+def _cmd_migrate(args) -> int:
+    from output_layout import migrate
+    from utils import get_output_dir
+    layout = args.layout if args.layout is not None else _load_manager().output_layout
+    stats = migrate(get_output_dir(), layout, dry_run=args.dry_run)
+    verb = "would move" if args.dry_run else "moved"
+    print(
+        f"{stats['moved']} {verb}, {stats['in_place']} already in place, "
+        f"{stats['skipped']} skipped (no sidecar)."
+    )
+    if not args.dry_run and stats["moved"]:
+        from document_index import get_document_index
+        get_document_index().refresh()
+    return 0
+
+
+def _cmd_rerender(args) -> int:
+    doc_manager = _load_manager()
+    doc_manager.signature_path = args.signature
+    doc_manager.stamp_path = args.stamp
+
+    def progress(report):
+        print(
+            f"\r{report['processed']}/{report['total']}  re-rendered {report['rerendered']}, "
+            f"unchanged {report['unchanged']}, failed {report['failed']}  "
+            f"({report['docs_per_second']} docs/s)",
+            end="", file=sys.stderr, flush=True
+        )
+
+    report = doc_manager.rerender_archive(
+        company=args.company,
+        doc_type=args.doc_type,
+        date_from=args.date_from,
+        date_to=args.date_to,
+        workers=args.workers,
+        executor=args.executor,
+        force=args.force,
+        suffix=args.suffix,
+        progress=None if args.quiet else progress,
+    )
+    if not args.quiet:
+        print(file=sys.stderr)
+    _write_manifest(report, args.manifest)
+    print(
+        f"{report['rerendered']} re-rendered, {report['unchanged']} unchanged, "
+        f"{report['modified']} changed since generation (use --force), {report['failed']} failed "
+        f"in {report['elapsed_seconds']}s ({report['docs_per_second']} docs/s)",
+        file=sys.stderr
+    )
+    return 0 if report["failed"] == 0 else 1
+
+
+def _cmd_presets(args) -> int:
+    from stamping import PresetStore
+    store = PresetStore()
+    if args.name is None:
+        for name, preset in store.presets(args.company).items():
+            anchor = f' from "{preset["anchor"]}"' if preset.get("anchor") else ""
+            print(
+                f"{name}: {preset['image']} on page {preset['page']} at ({preset['x']:g}, {preset['y']:g}){anchor}, "
+                f"{preset['width']:g} x {preset['height']:g} pt, rotated {preset['rotation']}"
+            )
+        return 0
+    if args.delete:
+        if not store.delete(args.company, args.name):
+            print(f"No stamp preset {args.name!r} for {args.company}", file=sys.stderr)
+            return 2
+        print(f"Deleted {args.name}.")
+        return 0
+    if not args.image or args.width is None or args.height is None:
+        print("A new preset needs --image, --width and --height.", file=sys.stderr)
+        return 2
+    page = args.page if args.page == "all" else int(args.page)
+    store.save(args.company, args.name, {
+        "image": args.image, "page": page, "x": args.x, "y": args.y,
+        "width": args.width, "height": args.height, "rotation": args.rotation, "anchor": args.anchor,
+    })
+    print(f"Saved {args.name}.")
+    return 0
+
+
+def _cmd_stamp(args) -> int:
+    from stamping import PresetStore, stamp_files
+    store = PresetStore()
+    try:
+        presets = [store.get(args.company, name) for name in args.preset]
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    def progress(report):
+        print(
+            f"\r{report['processed']}/{report['total']}  stamped {report['stamped']}, "
+            f"skipped {report['skipped']}, failed {report['failed']}  ({report['docs_per_second']} docs/s)",
+            end="", file=sys.stderr, flush=True
+        )
+
+    report = stamp_files(
+        args.paths,
+        presets,
+        company=None if args.all_companies else args.company,
+        output_dir=args.output,
+        workers=args.workers,
+        force=args.force,
+        progress=None if args.quiet else progress,
+    )
+    if not args.quiet:
+        print(file=sys.stderr)
+    _write_manifest(report, args.manifest)
+    skipped_note = "copied unchanged; use --force" if args.output else "use --force"
+    print(
+        f"{report['stamped']} stamped, {report['skipped']} already stamped ({skipped_note}), "
+        f"{report['ignored']} of other companies, {report['failed']} failed in {report['elapsed_seconds']}s",
+        file=sys.stderr
+    )
+    return 0 if report["failed"] == 0 else 1
+
+
+def _cmd_assets(args) -> int:
+    import os
+    rows = _load_manager().build_assets(profiles=args.profile)
+    for row in rows:
+        print(
+            f"{row['profile']:<10}  {row['source_bytes'] / 1024:>8.1f} KB -> {row['variant_bytes'] / 1024:>8.1f} KB  "
+            f"{os.path.basename(row['source'])}"
+        )
+    print(
+        f"{len(rows)} variants, {sum(r['variant_bytes'] for r in rows) / 1024:.1f} KB "
+        f"from {sum(r['source_bytes'] for r in rows) / 1024:.1f} KB of sources.",
+        file=sys.stderr
+    )
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="invoicegen", description="Generate documents without the GUI.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="Generate a single document.")
+    generate.add_argument("company", help="Company name as in config.json.")
+    generate.add_argument("doc_type", help='Document type, e.g. "Invoice" or "Sales Tax Invoice".')
+    generate.add_argument("-d", "--data", required=True, help="Form data or sidecar JSON file ('-' for stdin).")
+    generate.add_argument("--resave", action="store_true", help="Keep the Invoice No from the data instead of allocating one.")
+    generate.add_argument("--signature", help="Signature image to place on the document.")
+    generate.add_argument("--stamp", help="Stamp image to place on the document.")
+    generate.set_defaults(func=_cmd_generate)
+
+    batch = commands.add_parser("batch", help="Generate documents from a JSONL or CSV file of records.")
+    batch.add_argument("records", help="Path to a .jsonl or .csv file of {company, doc_type, form_data} records.")
+    batch.add_argument("-w", "--workers", type=int, default=None, help="Worker processes or threads (default: CPU count).")
+    batch.add_argument(
+        "--executor", choices=("process", "thread"), default=None,
+        help="Render in a process pool or a thread pool (default: threads in the frozen exe, processes otherwise)."
+    )
+    batch.add_argument("-m", "--manifest", help="Write the results manifest here instead of stdout.")
+    batch.add_argument("--bundle", action="store_true", help="Render every record into a single PDF.")
+    batch.add_argument("-o", "--output", help="Bundle file path (default: Bundle_<timestamp>.pdf in the output folder).")
+    batch.add_argument(
+        "--validate", action="store_true",
+        help="Check every record first and stop, with a report of all errors, before any number is allocated."
+    )
+    batch.set_defaults(func=_cmd_batch)
+
+    validate = commands.add_parser("validate", help="Check a JSONL or CSV file of records without generating anything.")
+    validate.add_argument("records", help="Path to a .jsonl or .csv file of {company, doc_type, form_data} records.")
+    validate.add_argument("-m", "--manifest", help="Also write the report as JSON here.")
+    validate.set_defaults(func=_cmd_validate)
+
+    renumber = commands.add_parser("renumber", help="Show or set the next invoice number for a company.")
+    renumber.add_argument("company", nargs="?", help="Company name; omit to list all companies.")
+    renumber.add_argument("next_number", nargs="?", type=int, help="The next invoice number to hand out.")
+    renumber.add_argument(
+        "--recover-leases", type=float, metavar="MINUTES", nargs="?", const=60,
+        help="First give back numbers leased by batches that crashed at least MINUTES ago (default 60)."
+    )
+    renumber.set_defaults(func=_cmd_renumber)
+
+    templates = commands.add_parser("templates", help="List document templates or rebuild a template manifest.")
+    templates.add_argument("--write-manifest", metavar="DIR", help="Scan DIR once and write its manifest.json.")
+    templates.set_defaults(func=_cmd_templates)
+
+    reindex = commands.add_parser("reindex", help="Update the search index of generated documents.")
+    reindex.add_argument("--full", action="store_true", help="Rebuild the index from scratch.")
+    reindex.set_defaults(func=_cmd_reindex)
+
+    search = commands.add_parser("search", help="Find generated documents.")
+    search.add_argument("text", nargs="*", help="Words to find in client, campaign, invoice number or line items.")
+    search.add_argument("--company", help="Company name as in config.json.")
+    search.add_argument("--doc-type", help='Document type, e.g. "Invoice".')
+    search.add_argument("--client", help="Part of the M/s (or employee) name.")
+    search.add_argument("--invoice-no", help="Part of the invoice number.")
+    search.add_argument("--from", dest="date_from", help="Earliest document date (dd-mm-yyyy).")
+    search.add_argument("--to", dest="date_to", help="Latest document date (dd-mm-yyyy).")
+    search.add_argument("--min-amount", type=float)
+    search.add_argument("--max-amount", type=float)
+    search.add_argument("--limit", type=int, default=50)
+    search.add_argument("--json", action="store_true", help="Print results as JSON.")
+    search.add_argument("--no-refresh", action="store_true", help="Search the index as is, without rescanning.")
+    search.set_defaults(func=_cmd_search)
+
+    migrate = commands.add_parser("migrate", help="Move generated documents into the configured folder layout.")
+    migrate.add_argument("--layout", help='Folder pattern to use instead of config.json\'s "output_layout", e.g. "{company}/{year}".')
+    migrate.add_argument("--dry-run", action="store_true", help="Only report what would be moved.")
+    migrate.set_defaults(func=_cmd_migrate)
+
+    rerender = commands.add_parser(
+        "rerender", help="Re-render generated documents from their sidecars, keeping their invoice numbers."
+    )
+    rerender.add_argument("--company", help="Only documents of this company.")
+    rerender.add_argument("--doc-type", help='Only this document type, e.g. "Invoice".')
+    rerender.add_argument("--from", dest="date_from", help="Earliest document date (dd-mm-yyyy).")
+    rerender.add_argument("--to", dest="date_to", help="Latest document date (dd-mm-yyyy).")
+    rerender.add_argument("-w", "--workers", type=int, default=None, help="Worker processes or threads (default: CPU count).")
+    rerender.add_argument("--executor", choices=("process", "thread"), default=None)
+    rerender.add_argument("--force", action="store_true", help="Also re-render unchanged documents and PDFs edited after generation.")
+    rerender.add_argument("--suffix", help="Write <name><SUFFIX>.pdf next to each original instead of replacing it.")
+    rerender.add_argument("--signature", help="Signature image to place on the documents.")
+    rerender.add_argument("--stamp", help="Stamp image to place on the documents.")
+    rerender.add_argument("-m", "--manifest", help="Write the report here instead of stdout.")
+    rerender.add_argument("-q", "--quiet", action="store_true", help="Don't show progress.")
+    rerender.set_defaults(func=_cmd_rerender)
+
+    assets = commands.add_parser("assets", help="Build the letterhead, signature and stamp variants for the output profiles.")
+    assets.add_argument(
+        "-p", "--profile", action="append",
+        help='Profile to build, e.g. "email" or "print"; repeat for several (default: each company\'s own).'
+    )
+    assets.set_defaults(func=_cmd_assets)
+
+    presets = commands.add_parser("presets", help="List, save or delete a company's stamp placement presets.")
+    presets.add_argument("company", help="Company name as in config.json.")
+    presets.add_argument("name", nargs="?", help="Preset to save or delete; omit to list the presets.")
+    presets.add_argument("--image", help="Signature or stamp image.")
+    presets.add_argument("--page", default="0", help='Page number from 0 (negative counts from the end) or "all".')
+    presets.add_argument("--x", type=float, default=0.0, help="Left edge in points, from the page or the anchor text.")
+    presets.add_argument("--y", type=float, default=0.0, help="Top edge in points, from the page or the anchor text.")
+    presets.add_argument("--width", type=float, help="Width in points.")
+    presets.add_argument("--height", type=float, help="Height in points.")
+    presets.add_argument("--rotation", type=int, default=0, help="Rotation in degrees, counter-clockwise.")
+    presets.add_argument("--anchor", help='Position relative to the last match of this text on the page, e.g. "TOTAL".')
+    presets.add_argument("--delete", action="store_true", help="Delete the preset.")
+    presets.set_defaults(func=_cmd_presets)
+
+    stamp = commands.add_parser("stamp", help="Stamp PDFs with saved presets, without the GUI.")
+    stamp.add_argument("company", help="Company whose presets to use.")
+    stamp.add_argument("paths", nargs="+", help="PDF files or folders (searched recursively).")
+    stamp.add_argument("-p", "--preset", action="append", required=True, help="Preset name; repeat for several.")
+    stamp.add_argument("-o", "--output", help="Write stamped copies under this folder instead of stamping in place.")
+    stamp.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    stamp.add_argument("--force", action="store_true", help="Stamp again files already stamped with the preset.")
+    stamp.add_argument("--all-companies", action="store_true", help="Don't skip PDFs whose sidecar names another company.")
+    stamp.add_argument("-m", "--manifest", help="Write the report here instead of stdout.")
+    stamp.add_argument("-q", "--quiet", action="store_true", help="Don't show progress.")
+    stamp.set_defaults(func=_cmd_stamp)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    except (ValueError, FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    freeze_support()
+    sys.exit(main())
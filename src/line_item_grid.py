@@ -0,0 +1,280 @@
+import csv
+import io
+import tkinter as tk
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence
+
+import customtkinter as ctk
+from tkcalendar import DateEntry
+
+# Editor rows built for the grid; scrolling rebinds them to other rows of the model.
+VISIBLE_ROWS = 8
+DATE_FORMAT = "%d-%m-%Y"
+# Dates pasted from spreadsheets come in any of these; they are stored as dd-mm-yyyy.
+PASTE_DATE_FORMATS = (DATE_FORMAT, "%Y-%m-%d", "%d/%m/%Y", "%d.%m.%Y")
+
+
+def _today() -> str:
+    return datetime.now().strftime(DATE_FORMAT)
+
+
+def _normalize_date(value: str) -> str:
+    """Returns value as dd-mm-yyyy, or today's date if it isn't a date, as a DateEntry would show."""
+    value = (value or "").strip()
+    for pattern in PASTE_DATE_FORMATS:
+        try:
+            return datetime.strptime(value, pattern).strftime(DATE_FORMAT)
+        except ValueError:
+            continue
+    return _today()
+
+
+class LineItemGrid(ctk.CTkFrame):
+    """
+    The line items of the form as a virtualized grid. The rows live in a
+    plain model (one dict of column -> text per row); only VISIBLE_ROWS rows
+    of editor widgets exist, and scrolling rebinds them to other rows, so a
+    1,000-row media plan costs no more widgets than an 8-row one. Edits are
+    written to the model as they are typed.
+
+    Pasting several lines of tab- or comma-separated text (e.g. cells copied
+    from Excel) into any cell fills the grid from that cell, adding rows as
+    needed.
+    """
+    def __init__(self, master, columns: Sequence[str], on_change: Optional[Callable[[], None]] = None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.columns = list(columns)
+        self.date_columns = {i for i, column in enumerate(self.columns) if "date" in column.lower()}
+        self.on_change = on_change
+        self.rows: List[Dict[str, str]] = []
+        self.first = 0  # Model index of the top editor row
+        self.editors: List[List] = []
+        self.row_widgets: List[List[tk.Widget]] = []
+
+        for col, column in enumerate(self.columns, 1):
+            ctk.CTkLabel(self, text=column, font=("Helvetica", 11, "bold")).grid(row=0, column=col, padx=3)
+        for index in range(VISIBLE_ROWS):
+            self._build_editor(index)
+        self.scrollbar = ctk.CTkScrollbar(self, orientation="vertical", command=self._on_scrollbar)
+        self.scrollbar.grid(row=1, column=len(self.columns) + 2, rowspan=VISIBLE_ROWS, sticky="ns", padx=(3, 0))
+        self.count_label = ctk.CTkLabel(self, text="", text_color="gray")
+        self.count_label.grid(row=VISIBLE_ROWS + 1, column=0, columnspan=len(self.columns) + 2, sticky="w", padx=5)
+
+        for widget in [self] + [w for row in self.row_widgets for w in row]:
+            widget.bind("<MouseWheel>", self._on_wheel, add="+")
+            widget.bind("<Button-4>", self._on_wheel, add="+")
+            widget.bind("<Button-5>", self._on_wheel, add="+")
+        self.clear()
+
+    # ---------- EDITOR POOL ----------
+    def _build_editor(self, index: int) -> None:
+        grid_row = index + 1
+        number = ctk.CTkLabel(self, text="", width=36, anchor="e", text_color="gray")
+        number.grid(row=grid_row, column=0, padx=(5, 2))
+        entries = []
+        for col, column in enumerate(self.columns):
+            if col in self.date_columns:
+                entry = DateEntry(self, date_pattern='dd-mm-yyyy', width=12)
+                entry.bind("<<DateEntrySelected>>", lambda _, i=index, c=col: self._store(i, c), add="+")
+            else:
+                entry = ctk.CTkEntry(self, width=120, placeholder_text=column)
+            entry.grid(row=grid_row, column=col + 1, padx=3, pady=2)
+            entry.bind("<KeyRelease>", lambda event, i=index, c=col: self._on_key(event, i, c), add="+")
+            entry.bind("<FocusOut>", lambda _, i=index, c=col: self._store(i, c), add="+")
+            entry.bind("<<Paste>>", lambda _, i=index, c=col: self._on_paste(i, c), add="+")
+            entries.append(entry)
+        remove_btn = ctk.CTkButton(
+            self, text="✕", width=30,
+            fg_color="red", hover_color="#a33",
+            command=lambda i=index: self.remove_row(self.first + i)
+        )
+        remove_btn.grid(row=grid_row, column=len(self.columns) + 1, padx=5)
+        self.editors.append(entries)
+        self.row_widgets.append([number] + entries + [remove_btn])
+
+    def _inner(self, entry) -> tk.Widget:
+        # CTkEntry draws a tk Entry inside a frame; bindings and focus go to that.
+        return getattr(entry, "_entry", entry)
+
+    def _show(self) -> None:
+        """Binds the editor rows to the model rows from self.first on."""
+        self.first = max(0, min(self.first, len(self.rows) - VISIBLE_ROWS))
+        for index, widgets in enumerate(self.row_widgets):
+            model_index = self.first + index
+            if model_index >= len(self.rows):
+                for widget in widgets:
+                    widget.grid_remove()
+                continue
+            for widget in widgets:
+                widget.grid()
+            widgets[0].configure(text=f"{model_index + 1}.")
+            row = self.rows[model_index]
+            for col, entry in enumerate(self.editors[index]):
+                value = row[self.columns[col]]
+                if col in self.date_columns:
+                    entry.set_date(datetime.strptime(value, DATE_FORMAT))
+                else:
+                    entry.delete(0, "end")
+                    if value:
+                        entry.insert(0, value)
+
+        total = len(self.rows)
+        if total > VISIBLE_ROWS:
+            self.scrollbar.grid()
+            self.scrollbar.set(self.first / total, (self.first + VISIBLE_ROWS) / total)
+        else:
+            self.scrollbar.grid_remove()
+        self.count_label.configure(text=f"{total} item{'s' if total != 1 else ''}")
+
+    def _store(self, index: int, col: int) -> None:
+        """Writes one editor's value back to the row it shows."""
+        model_index = self.first + index
+        if model_index >= len(self.rows):
+            return
+        entry = self.editors[index][col]
+        if col in self.date_columns:
+            value = entry.get_date().strftime(DATE_FORMAT)
+        else:
+            value = entry.get().strip()
+        row = self.rows[model_index]
+        if row[self.columns[col]] != value:
+            row[self.columns[col]] = value
+            self._changed()
+
+    def _changed(self) -> None:
+        if self.on_change:
+            self.on_change()
+
+    # ---------- SCROLLING AND KEYS ----------
+    def scroll_to(self, first: int) -> None:
+        self._store_all()
+        self.first = first
+        self._show()
+
+    def _store_all(self) -> None:
+        for index in range(len(self.editors)):
+            for col in range(len(self.columns)):
+                self._store(index, col)
+
+    def _on_scrollbar(self, *args) -> None:
+        if args[0] == "moveto":
+            self.scroll_to(round(float(args[1]) * len(self.rows)))
+        elif args[0] == "scroll":
+            step = VISIBLE_ROWS if args[2] == "pages" else 1
+            self.scroll_to(self.first + int(args[1]) * step)
+
+    def _on_wheel(self, event) -> str:
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self.scroll_to(self.first - 3)
+        else:
+            self.scroll_to(self.first + 3)
+        return "break"
+
+    def _on_key(self, event, index: int, col: int) -> None:
+        if event.keysym in ("Up", "Down"):
+            # Move to the same column in the row above or below, scrolling past the editors' ends.
+            down = event.keysym == "Down"
+            target = self.first + index + (1 if down else -1)
+            if 0 <= target < len(self.rows):
+                self._store(index, col)
+                if not self.first <= target < self.first + VISIBLE_ROWS:
+                    self.scroll_to(target - (VISIBLE_ROWS - 1 if down else 0))
+                self._inner(self.editors[target - self.first][col]).focus_set()
+            return
+        self._store(index, col)
+
+    # ---------- ROW MODEL ----------
+    def _new_row(self) -> Dict[str, str]:
+        return {column: (_today() if col in self.date_columns else "") for col, column in enumerate(self.columns)}
+
+    def _coerce_row(self, item: Dict[str, str]) -> Dict[str, str]:
+        row = {}
+        for col, column in enumerate(self.columns):
+            value = str(item.get(column) or "")
+            row[column] = _normalize_date(value) if col in self.date_columns else value
+        return row
+
+    def get_rows(self) -> List[Dict[str, str]]:
+        """Returns every row, with the values being edited included."""
+        self._store_all()
+        return [dict(row) for row in self.rows]
+
+    def set_rows(self, items: Sequence[Dict[str, str]]) -> None:
+        """Replaces the rows, e.g. with a saved document's line items."""
+        self.rows = [self._coerce_row(item) for item in items if isinstance(item, dict)] or [self._new_row()]
+        self.first = 0
+        self._show()
+        self._changed()
+
+    def clear(self) -> None:
+        """Back to a single new row, as a fresh form has."""
+        self.rows = [self._new_row()]
+        self.first = 0
+        self._show()
+        self._changed()
+
+    def add_row(self) -> None:
+        self._store_all()
+        self.rows.append(self._new_row())
+        self.first = len(self.rows) - VISIBLE_ROWS
+        self._show()
+        editor = min(len(self.rows), VISIBLE_ROWS) - 1
+        self._inner(self.editors[editor][0]).focus_set()
+        self._changed()
+
+    def remove_row(self, model_index: int) -> None:
+        self._store_all()
+        if 0 <= model_index < len(self.rows):
+            del self.rows[model_index]
+        if not self.rows:
+            self.rows.append(self._new_row())
+        self._show()
+        self._changed()
+
+    # ---------- PASTE ----------
+    def _on_paste(self, index: int, col: int) -> Optional[str]:
+        try:
+            text = self.clipboard_get()
+        except tk.TclError:
+            return None
+        if "\n" not in text.strip() and "\t" not in text:
+            return None  # A single value: let the entry paste it as usual
+        self.paste(text, self.first + index, col)
+        return "break"
+
+    def paste_clipboard(self) -> int:
+        """Appends the rows on the clipboard. Returns how many were pasted."""
+        try:
+            text = self.clipboard_get()
+        except tk.TclError:
+            return 0
+        start = len(self.rows)
+        if len(self.rows) == 1 and self.get_rows()[0] == self._new_row():
+            start = 0  # Replace the form's untouched first row
+        return self.paste(text, start, 0)
+
+    def paste(self, text: str, start_row: int, start_col: int) -> int:
+        """
+        Fills the grid with tab-separated (or, failing that, comma-separated)
+        text from a cell onwards, adding rows at the end as needed. Returns
+        the number of rows pasted.
+        """
+        text = text.strip("\r\n")
+        if not text:
+            return 0
+        delimiter = "\t" if "\t" in text else ","
+        lines = [cells for cells in csv.reader(io.StringIO(text), delimiter=delimiter) if any(c.strip() for c in cells)]
+        self._store_all()
+        for offset, cells in enumerate(lines):
+            model_index = start_row + offset
+            while model_index >= len(self.rows):
+                self.rows.append(self._new_row())
+            row = self.rows[model_index]
+            for col, value in enumerate(cells[:len(self.columns) - start_col], start_col):
+                value = value.strip()
+                row[self.columns[col]] = _normalize_date(value) if col in self.date_columns else value
+        if not self.first <= start_row < self.first + VISIBLE_ROWS:
+            self.first = start_row
+        self._show()
+        self._changed()
+        return len(lines)
@@ -0,0 +1,160 @@
+from array import array
+from datetime import date, datetime
+from decimal import Decimal
+from fractions import Fraction
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from formatting import Number, to_decimal, to_paisa
+
+DEFAULT_GST_RATE = Decimal(15)
+DATE_FORMAT = "%d-%m-%Y"
+
+
+def _parse_date(text: str) -> Optional[date]:
+    try:
+        return datetime.strptime(text, DATE_FORMAT).date()
+    except ValueError:
+        return None
+
+
+class LineItem:
+    """
+    One line item, for rendering. The form's text is kept as typed; amount is
+    in whole paisa (None if the Amount isn't a number) and the campaign dates
+    are dates (None if empty or not dd-mm-yyyy).
+    """
+    __slots__ = (
+        "description", "start_text", "end_text", "size", "duration", "amount_text",
+        "start", "end", "amount",
+    )
+
+    def __init__(self, row: Dict[str, Any], amount: Optional[int]):
+        self.description = str(row.get("Description") or "").strip()
+        self.start_text = str(row.get("Campaign Start Date") or "").strip()
+        self.end_text = str(row.get("Campaign End Date") or "").strip()
+        self.size = str(row.get("Size") or "")
+        self.duration = str(row.get("Duration") or "")
+        self.amount_text = str(row.get("Amount") or "")
+        self.start = _parse_date(self.start_text) if self.start_text else None
+        self.end = _parse_date(self.end_text) if self.end_text else None
+        self.amount = amount
+
+
+class LineItems:
+    """
+    The line items of one document, parsed once and shared by validation,
+    totals, GST and rendering. The amounts are a column of paisa, so totals
+    are integer sums; the LineItem records for the other columns are only
+    built when something iterates over the items.
+    """
+    __slots__ = ("rows", "amounts", "invalid", "_items")
+
+    def __init__(self, rows: Optional[Sequence[Dict[str, Any]]] = None):
+        self.rows = [row if isinstance(row, dict) else None for row in rows or []]
+        amounts = []
+        # Positions whose Amount isn't a number; they count as 0 in the totals.
+        self.invalid: List[int] = []
+        for index, row in enumerate(self.rows):
+            try:
+                amounts.append(to_paisa(row.get("Amount") or 0) if row is not None else 0)
+            except ValueError:
+                amounts.append(0)
+                self.invalid.append(index)
+        self.amounts = array("q", amounts)
+        self._items: Optional[List[LineItem]] = None
+
+    @classmethod
+    def from_form_data(cls, data: Dict[str, Any]) -> 'LineItems':
+        """Parses data["line_items"], as collected by the form or read from a sidecar."""
+        rows = data.get("line_items")
+        return cls(rows if isinstance(rows, list) else [])
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[LineItem]:
+        if self._items is None:
+            invalid = set(self.invalid)
+            self._items = [
+                LineItem(row or {}, None if index in invalid else amount)
+                for index, (row, amount) in enumerate(zip(self.rows, self.amounts))
+            ]
+        return iter(self._items)
+
+    @property
+    def amounts_valid(self) -> bool:
+        """False if any Amount isn't a number."""
+        return not self.invalid
+
+    @property
+    def total(self) -> int:
+        """The sum of the amounts, in paisa."""
+        return sum(self.amounts)
+
+
+def gst_rate(data: Dict[str, Any]) -> Decimal:
+    """The document's GST percentage, 15 when the form leaves it empty."""
+    return to_decimal(data.get("GST Percentage") or DEFAULT_GST_RATE)
+
+
+def apply_rate(paisa: int, rate: Number) -> int:
+    """rate percent of an amount in paisa, rounded half up to whole paisa, exactly."""
+    return grand_totals((paisa,), [rate])[0] - paisa
+
+
+def grand_totals(subtotals: Sequence[int], rates: Iterable[Number]) -> List[int]:
+    """
+    Adds tax at each rate percent to the matching subtotal (both in paisa),
+    rounding the tax half up to whole paisa. Works column-wise in integers:
+    each distinct rate is turned into a fraction once, so a batch of
+    thousands of documents costs a multiply and a divide per document.
+    The totals are plain ints, so a large subtotal or rate can't overflow.
+    """
+    fractions: Dict[Number, Tuple[int, int]] = {}
+    totals: List[int] = []
+    for subtotal, rate in zip(subtotals, rates):
+        ratio = fractions.get(rate)
+        if ratio is None:
+            fraction = Fraction(to_decimal(rate)) / 100
+            ratio = fractions[rate] = (fraction.numerator, fraction.denominator)
+        numerator, denominator = ratio
+        # Half up, away from zero: floor(|x| + 1/2) with the sign put back.
+        tax = (2 * abs(subtotal * numerator) + denominator) // (2 * denominator)
+        totals.append(subtotal + (tax if (subtotal < 0) == (numerator < 0) else -tax))
+    return totals
+
+
+def document_totals(documents: Iterable[Tuple[str, Dict[str, Any]]]) -> List[Optional[int]]:
+    """
+    Grand totals in paisa of (doc_type, form_data) pairs: the line items'
+    sum, plus GST for sales tax invoices. None for documents without line
+    items, or with an Amount or GST percentage that isn't a number.
+    """
+    subtotals: List[int] = []
+    rates: List[Number] = []
+    positions: List[int] = []
+    results: List[Optional[int]] = []
+    for doc_type, form_data in documents:
+        if not isinstance(form_data.get("line_items"), list):
+            results.append(None)
+            continue
+        items = LineItems.from_form_data(form_data)
+        if not items.amounts_valid:
+            results.append(None)
+            continue
+        subtotal = items.total
+        if doc_type == "Sales Tax Invoice":
+            try:
+                rate = gst_rate(form_data)
+            except ValueError:
+                results.append(None)
+                continue
+        else:
+            rate = 0
+        positions.append(len(results))
+        results.append(subtotal)
+        subtotals.append(subtotal)
+        rates.append(rate)
+    for position, total in zip(positions, grand_totals(subtotals, rates)):
+        results[position] = total
+    return results
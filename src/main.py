@@ -1,17 +1,34 @@
+import sys
+import time
+# Taken before any other import so the startup report covers module loading too.
+_STARTED = time.perf_counter()
+_BASELINE_MODULES = set(sys.modules)
+
 import customtkinter as ctk
-from tkinter import filedialog, messagebox
+from tkinter import filedialog, messagebox, simpledialog, ttk
 from tkcalendar import DateEntry
 from datetime import datetime
 from document_manager import DocumentManager
-from signer import PDFSignatureApp
 from splash import SplashScreen
+from startup import StartupProfile
 from utils import get_output_dir
+from validation import as_result
+from preview import PreviewWorker
+from line_item_grid import LineItemGrid
 from pathlib import Path
+import importlib
 import json
+import threading
 
 ctk.set_appearance_mode("System")  # "Dark", "Light", or "System"
 ctk.set_default_color_theme("blue")  # Options: "blue", "dark-blue", "green"
 
+# Live preview: wait this long after the last keystroke before re-rendering,
+# and check this often for the background render to finish.
+PREVIEW_DEBOUNCE_MS = 300
+PREVIEW_POLL_MS = 30
+PREVIEW_WIDTH = 340  # Pixels; A4 pages are shown at this width
+
 class CounterManagerDialog(ctk.CTkToplevel):
     def __init__(self, parent, doc_manager):
         super().__init__(parent)
@@ -23,22 +40,21 @@ class CounterManagerDialog(ctk.CTkToplevel):
         self.transient(parent)
 
         self.entries = {}
+        # The numbers as shown, so saving only touches counters the user changed
+        self.shown = {}
 
         ctk.CTkLabel(self, text="Set Next Invoice Number", font=("Helvetica", 16, "bold")).pack(pady=15)
 
         scroll_frame = ctk.CTkScrollableFrame(self)
         scroll_frame.pack(fill="both", expand=True, padx=15, pady=10)
 
-        # Reload counters to ensure we have the latest
-        self.doc_manager.invoice_generator.counters = self.doc_manager.invoice_generator._load_counters()
-
+        invoice_generator = self.doc_manager.invoice_generator
         for company in self.doc_manager.config.get("companies", {}).keys():
             frame = ctk.CTkFrame(scroll_frame)
             frame.pack(fill="x", pady=5)
 
-            company_key = self.doc_manager.invoice_generator._get_company_key(company)
-            last_number = self.doc_manager.invoice_generator.counters.get(company_key, 0)
-            next_number = last_number + 1
+            # peek_number() hands out released numbers first, as the next invoice will.
+            next_number = invoice_generator.peek_number(company)
 
             ctk.CTkLabel(frame, text=company, width=200, anchor="w").pack(side="left", padx=10)
             
@@ -46,44 +62,198 @@ class CounterManagerDialog(ctk.CTkToplevel):
             entry.insert(0, str(next_number))
             entry.pack(side="left", padx=10)
             self.entries[company] = entry
+            self.shown[company] = str(next_number)
 
         save_button = ctk.CTkButton(self, text="Save and Close", command=self.save_and_close)
         save_button.pack(pady=15)
 
     def save_and_close(self):
         try:
+            changed = {}
             for company, entry in self.entries.items():
-                new_val_str = entry.get()
+                new_val_str = entry.get().strip()
+                if new_val_str == self.shown[company]:
+                    continue  # Left alone; setting it would drop the released numbers
                 if not new_val_str.isdigit():
                     messagebox.showerror("Invalid Input", f"'{new_val_str}' is not a valid number for {company}.", parent=self)
                     return
-                
-                new_val = int(new_val_str)
+                changed[company] = int(new_val_str)
+
+            for company, new_val in changed.items():
                 self.doc_manager.invoice_generator.set_counter(company, new_val)
             
-            messagebox.showinfo("Success", "Invoice counters updated successfully.\nThe form will now reload.", parent=self)
-            self.master.load_form_fields() # Reload main form
+            messagebox.showinfo("Success", "Invoice counters updated successfully.", parent=self)
+            self.master.refresh_invoice_number()  # Only the Invoice No field depends on the counters
             self.destroy()
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {e}", parent=self)
 
 
+class DocumentSearchDialog(ctk.CTkToplevel):
+    """Finds a generated document through the search index and loads it into the form."""
+    FILTERS = [
+        ("Search", "text"),
+        ("M/s", "client"),
+        ("Invoice No", "invoice_no"),
+        ("From (dd-mm-yyyy)", "date_from"),
+        ("To (dd-mm-yyyy)", "date_to"),
+        ("Min Amount", "min_amount"),
+        ("Max Amount", "max_amount"),
+    ]
+
+    def __init__(self, parent, on_select):
+        super().__init__(parent)
+        self.on_select = on_select
+        self.title("Load & Edit")
+        self.geometry("900x550")
+        self.lift()
+        self.transient(parent)
+        self.results = []
+        self.entries = {}
+
+        from document_index import get_document_index
+        self.index = get_document_index()
+
+        filters = ctk.CTkFrame(self)
+        filters.pack(fill="x", padx=15, pady=10)
+        for i, (label, key) in enumerate(self.FILTERS):
+            ctk.CTkLabel(filters, text=label + ":", anchor="w").grid(row=i // 4 * 2, column=i % 4, padx=5, sticky="w")
+            entry = ctk.CTkEntry(filters, width=190)
+            entry.grid(row=i // 4 * 2 + 1, column=i % 4, padx=5, pady=(0, 8))
+            entry.bind("<Return>", lambda _: self.run_search())
+            self.entries[key] = entry
+        ctk.CTkButton(filters, text="Search", command=self.run_search, width=120).grid(row=3, column=3, padx=5)
+
+        columns = ("date", "invoice_no", "client", "doc_type", "amount")
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", selectmode="browse")
+        for column, heading, width in zip(columns, ("Date", "Invoice No", "M/s", "Type", "Amount"), (90, 160, 260, 130, 110)):
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, anchor="e" if column == "amount" else "w")
+        self.tree.pack(fill="both", expand=True, padx=15)
+        self.tree.bind("<Double-1>", lambda _: self.open_selected())
+
+        buttons = ctk.CTkFrame(self, fg_color="transparent")
+        buttons.pack(fill="x", padx=15, pady=10)
+        self.status = ctk.CTkLabel(buttons, text="Updating index...", anchor="w")
+        self.status.pack(side="left")
+        ctk.CTkButton(buttons, text="Open", command=self.open_selected, width=100).pack(side="right", padx=5)
+        ctk.CTkButton(buttons, text="Browse...", command=self.browse, width=100).pack(side="right", padx=5)
+
+        # Pick up files copied in or edited outside the app without blocking the dialog.
+        self._refresh_done = threading.Event()
+        threading.Thread(target=self._refresh_index, daemon=True).start()
+        self.after(50, self._wait_for_refresh)
+
+    def _refresh_index(self):
+        try:
+            self.index.refresh()
+        finally:
+            self._refresh_done.set()
+
+    def _wait_for_refresh(self):
+        if self._refresh_done.is_set():
+            self.run_search()
+        else:
+            self.after(50, self._wait_for_refresh)
+
+    def run_search(self):
+        values = {key: entry.get().strip() or None for key, entry in self.entries.items()}
+        try:
+            for key in ("min_amount", "max_amount"):
+                if values[key] is not None:
+                    values[key] = float(values[key].replace(",", ""))
+        except ValueError:
+            messagebox.showerror("Invalid Input", "Amounts must be numbers.", parent=self)
+            return
+
+        self.results = self.index.search(**values)
+        self.tree.delete(*self.tree.get_children())
+        for i, row in enumerate(self.results):
+            amount = f"{row['amount']:,.2f}" if row["amount"] is not None else ""
+            date = datetime.strptime(row["doc_date"], "%Y-%m-%d").strftime("%d-%m-%Y") if row["doc_date"] else ""
+            self.tree.insert("", "end", iid=str(i), values=(date, row["invoice_no"], row["client"], row["doc_type"], amount))
+        self.status.configure(text=f"{len(self.results)} document(s) found")
+
+    def open_selected(self):
+        selection = self.tree.selection()
+        if not selection:
+            return
+        row = self.results[int(selection[0])]
+        self.destroy()
+        self.on_select(Path(row["sidecar"]), row["part"])
+
+    def browse(self):
+        filepath = filedialog.askopenfilename(filetypes=[("PDF files", "*.pdf")], parent=self)
+        if filepath:
+            self.destroy()
+            self.on_select(Path(filepath).with_suffix(".json"), None)
+
+
+class _FormView:
+    """The widgets of one document type's form, kept while other types are shown."""
+    def __init__(self, frame, template):
+        self.frame = frame
+        self.template = template
+        self.entry_widgets = {}
+        self.earnings_entries = []
+        self.content_text = None
+        self.line_items_grid = None
+
+
+def _reset_widget(widget):
+    """Empties an entry, or sets a DateEntry back to today, as a new one would be."""
+    if isinstance(widget, DateEntry):
+        widget.set_date(datetime.now().date())
+        return
+    state = widget.cget("state")
+    if state == "disabled":
+        widget.configure(state="normal")
+    widget.delete(0, "end")
+    if state == "disabled":
+        widget.configure(state="disabled")
+
+
 class DocumentApp(ctk.CTk):
-    def __init__(self):
+    def __init__(self, startup_profile=None, show_splash=False):
         super().__init__()
+        self.startup_profile = startup_profile or StartupProfile()
         self.title("Invoice Genius")
-        self.geometry("900x700")
+        self.geometry("1280x720")
         self.minsize(850, 600)
+        self.startup_profile.mark("create root window")
+
+        # The splash goes up as soon as there is a root window, so it covers
+        # loading the config and building the form, the slowest part of startup.
+        self.splash = None
+        if show_splash:
+            self.withdraw()
+            self.splash = SplashScreen(self)
+            self.startup_profile.mark("show splash")
 
         self.doc_manager = DocumentManager()
+        self.startup_profile.mark("load config and templates")
         self.entry_widgets = {}
-        self.line_item_entries = []
         self.error_labels = {}
         self.earnings_entries = []
+        self.content_text = None
+        self.line_items_grid = None
         self.is_editing_mode = False
+        # Built forms by document type, and the one on screen
+        self.forms = {}
+        self.form = None
+
+        # Live preview state; renders run on the worker's thread, never this one.
+        self.preview_worker = PreviewWorker(self.doc_manager)
+        self.preview_page = 0
+        self._preview_after = None
+        self._preview_generation = 0
+        self._preview_polling = False
+        self._preview_photo = None
 
         self._setup_ui()
+        self.startup_profile.mark("build main window")
         self.load_form_fields() # Initial load
+        self.startup_profile.mark("build first form")
 
     def _setup_ui(self):
         # -------- Sidebar for Selections --------
@@ -99,7 +269,7 @@ class DocumentApp(ctk.CTk):
         self.company_menu = ctk.CTkOptionMenu(
             sidebar, variable=self.company_var,
             values=company_list,
-            command=lambda _: self.load_form_fields() # Reload form on company change
+            command=lambda _: self.on_company_changed()
         )
         self.company_menu.pack(fill="x", pady=(0, 15))
         if company_list:
@@ -120,14 +290,39 @@ class DocumentApp(ctk.CTk):
         ctk.CTkButton(sidebar, text="📂 Load & Edit", command=self.load_document_for_edit, width=180).pack(pady=5)
         ctk.CTkButton(sidebar, text="🔢 Manage Counters", command=self.open_counter_manager, width=180).pack(pady=5)
 
+        self.preview_var = ctk.BooleanVar(value=True)
+        ctk.CTkSwitch(sidebar, text="👁 Live Preview", variable=self.preview_var, command=self._toggle_preview).pack(pady=(20, 5))
+
 
         # Developer Credit
         ctk.CTkLabel(sidebar, text="Developed by\nDevDuo Innovation", font=("Helvetica", 10), text_color="gray").pack(side="bottom", pady=20)
 
 
 
+        # -------- Preview Pane (packed before the form so it sits on the far right) --------
+        self.preview_frame = ctk.CTkFrame(self, corner_radius=15)
+        self.preview_frame.pack(side="right", fill="y", padx=(0, 10), pady=10)
+        ctk.CTkLabel(self.preview_frame, text="Preview", font=("Helvetica", 16, "bold")).pack(pady=(10, 5))
+        self.preview_canvas = ctk.CTkCanvas(
+            self.preview_frame, width=PREVIEW_WIDTH, height=round(PREVIEW_WIDTH * 297 / 210),
+            highlightthickness=0, bg="#d9d9d9"
+        )
+        self.preview_canvas.pack(padx=10)
+        preview_nav = ctk.CTkFrame(self.preview_frame, fg_color="transparent")
+        preview_nav.pack(pady=5)
+        ctk.CTkButton(preview_nav, text="◀", width=30, command=lambda: self._preview_step(-1)).pack(side="left", padx=5)
+        self.preview_page_label = ctk.CTkLabel(preview_nav, text="", width=60)
+        self.preview_page_label.pack(side="left")
+        ctk.CTkButton(preview_nav, text="▶", width=30, command=lambda: self._preview_step(1)).pack(side="left", padx=5)
+        self.preview_status = ctk.CTkLabel(self.preview_frame, text="", text_color="gray", wraplength=PREVIEW_WIDTH)
+        self.preview_status.pack(pady=(0, 10))
+
+        # Any typing or date pick inside the form schedules a re-render.
+        self.bind_all("<KeyRelease>", self._on_form_edited, add="+")
+        self.bind_all("<<DateEntrySelected>>", self._on_form_edited, add="+")
+
         # -------- Main Content (Scrollable Form) --------
-        main_frame = ctk.CTkFrame(self, corner_radius=15)
+        main_frame = self.main_frame = ctk.CTkFrame(self, corner_radius=15)
         main_frame.pack(side="right", fill="both", expand=True, padx=10, pady=10)
 
         self.canvas = ctk.CTkCanvas(main_frame, highlightthickness=0)
@@ -142,40 +337,93 @@ class DocumentApp(ctk.CTk):
 
     # ---------- FORM BUILDING ----------
     def load_form_fields(self):
+        """
+        Shows the form for the selected document type with every field back
+        at its default. Each type's form is built once and then kept, hidden
+        while another type is selected, because building one (DateEntry
+        widgets especially) is slow.
+        """
         # When loading fields, assume we are not in edit mode unless loading a file.
         self.is_editing_mode = False
-        self.focus_set()  # Move focus away from child widgets before destroying them
-        for widget in self.scroll_frame.winfo_children():
-            widget.destroy()
-        self.entry_widgets.clear()
-        self.line_item_entries.clear()
-        self.earnings_entries.clear()
-
         doc_type = self.doc_type_var.get()
-        company = self.company_var.get()
+        form = self.forms.get(doc_type)
+        if form is None:
+            form = self.forms[doc_type] = self._build_form(doc_type)
+        else:
+            self._reset_form(form)
+
+        if form is not self.form:
+            self.focus_set()  # Move focus away from the form being hidden
+            if self.form is not None:
+                self.form.frame.pack_forget()
+            form.frame.pack(fill="both", expand=True)
+            self.canvas.yview_moveto(0)
+            self._use_form(form)
+
+        self.refresh_invoice_number()
+        self.preview_page = 0
+        self._schedule_preview()
+
+    def on_company_changed(self):
+        """Only the invoice number (and the letterhead in the preview) depends on the company."""
+        self.is_editing_mode = False
+        self.refresh_invoice_number()
+        self._schedule_preview()
+
+    def refresh_invoice_number(self):
+        """Shows the company's next invoice number in the read-only Invoice No field."""
+        widget = self.entry_widgets.get("Invoice No")
+        if widget is None or "Invoice" not in self.doc_type_var.get():
+            return
+        widget.configure(state="normal")
+        widget.delete(0, "end")
+        widget.insert(0, self.doc_manager.invoice_generator.peek_next(self.company_var.get()))
+        widget.configure(state="disabled")
+
+    def _use_form(self, form):
+        self.form = form
+        self.entry_widgets = form.entry_widgets
+        self.earnings_entries = form.earnings_entries
+        self.content_text = form.content_text
+        self.line_items_grid = form.line_items_grid
+
+    def _build_form(self, doc_type):
         template = self.doc_manager.templates.get(doc_type, {})
+        form = _FormView(ctk.CTkFrame(self.scroll_frame, fg_color="transparent"), template)
 
-        ctk.CTkLabel(self.scroll_frame, text=f"{doc_type} Form",
+        ctk.CTkLabel(form.frame, text=f"{doc_type} Form",
                      font=("Helvetica", 20, "bold")).pack(pady=(10, 15))
 
-        # --- Special handling for Invoice No ---
+        # --- Special handling for Invoice No; refresh_invoice_number() fills it in ---
         if "Invoice" in doc_type:
-            invoice_no = self.doc_manager.invoice_generator.peek_next(company)
-            self._add_form_field("Invoice No", "readonly", default_value=invoice_no)
+            self._add_form_field(form, "Invoice No", "readonly")
 
         for field, field_type in template.get("header_fields", []):
             if field == "Invoice No": continue # Skip manual addition
-            self._add_form_field(field, field_type)
+            self._add_form_field(form, field, field_type)
 
         if doc_type in ["Invoice", "Sales Tax Invoice"]:
-            self._add_line_items_section(template)
+            self._add_line_items_section(form)
         elif doc_type == "Request Letter":
-            self._add_letter_content_field()
+            self._add_letter_content_field(form)
         elif doc_type == "Salary Slip":
-            self._add_salary_slip_sections(template)
-
-    def _add_form_field(self, field, field_type, default_value=None):
-        frame = ctk.CTkFrame(self.scroll_frame, corner_radius=10)
+            self._add_salary_slip_sections(form)
+        return form
+
+    def _reset_form(self, form):
+        """Puts a kept form back the way _build_form() left it."""
+        for widget in form.entry_widgets.values():
+            _reset_widget(widget)
+        for _, entry in form.earnings_entries:
+            entry.delete(0, "end")
+            entry.insert(0, "0")
+        if form.content_text is not None:
+            form.content_text.delete("1.0", "end")
+        if form.line_items_grid is not None:
+            form.line_items_grid.clear()
+
+    def _add_form_field(self, form, field, field_type):
+        frame = ctk.CTkFrame(form.frame, corner_radius=10)
         frame.pack(fill="x", pady=5, padx=15)
 
         ctk.CTkLabel(frame, text=field + ":", width=180, anchor="w").pack(side="left", padx=10, pady=5)
@@ -184,23 +432,20 @@ class DocumentApp(ctk.CTk):
             entry = DateEntry(frame, date_pattern='dd-mm-yyyy')
         else:
             entry = ctk.CTkEntry(frame, width=300, placeholder_text=f"Enter {field}")
-        
-        if default_value:
-            entry.insert(0, default_value)
-        
+
         if field_type == "readonly":
             entry.configure(state="disabled")
 
         entry.pack(side="left", padx=5, pady=5)
-        self.entry_widgets[field] = entry
+        form.entry_widgets[field] = entry
 
-    def _add_salary_slip_sections(self, template):
-        ctk.CTkLabel(self.scroll_frame, text="💰 Earnings", font=("Helvetica", 16, "bold")).pack(pady=(15, 5))
-        for item in template.get("earnings_inputs", []):
-            self._add_salary_item(item)
+    def _add_salary_slip_sections(self, form):
+        ctk.CTkLabel(form.frame, text="💰 Earnings", font=("Helvetica", 16, "bold")).pack(pady=(15, 5))
+        for item in form.template.get("earnings_inputs", []):
+            self._add_salary_item(form, item)
 
-    def _add_salary_item(self, item):
-        frame = ctk.CTkFrame(self.scroll_frame, corner_radius=8)
+    def _add_salary_item(self, form, item):
+        frame = ctk.CTkFrame(form.frame, corner_radius=8)
         frame.pack(fill="x", pady=3, padx=15)
 
         name = item["name"]
@@ -208,49 +453,108 @@ class DocumentApp(ctk.CTk):
         entry = ctk.CTkEntry(frame, width=120)
         entry.insert(0, "0")
         entry.pack(side="left", padx=5)
-        self.earnings_entries.append((name, entry))
-
-    def _add_letter_content_field(self):
-        ctk.CTkLabel(self.scroll_frame, text="✉️ Letter Content", font=("Helvetica", 16, "bold")).pack(pady=(15, 5))
-        self.content_text = ctk.CTkTextbox(self.scroll_frame, width=700, height=300)
-        self.content_text.pack(padx=15, pady=10, fill="both", expand=True)
-
-    def _add_line_items_section(self, template):
-        ctk.CTkLabel(self.scroll_frame, text="📦 Line Items", font=("Helvetica", 16, "bold")).pack(pady=(15, 5))
-        self.items_container = ctk.CTkFrame(self.scroll_frame, corner_radius=10)
-        self.items_container.pack(fill="x", padx=15, pady=5)
-        self._add_line_item_row(template)
-
-        ctk.CTkButton(self.scroll_frame, text="+ Add Item", command=lambda: self._add_line_item_row(template)).pack(pady=8)
-
-    def _add_line_item_row(self, template):
-        row = ctk.CTkFrame(self.items_container, corner_radius=5)
-        row.pack(fill="x", pady=2, padx=5)
-
-        entry_list = []
-        for col in template["line_items"]["columns"]:
-            # Detect columns containing "date"
-            if "date" in col.lower():
-                entry = DateEntry(row, date_pattern='dd-mm-yyyy', width=12)
-            else:
-                entry = ctk.CTkEntry(row, width=120, placeholder_text=col)
-
-            entry.pack(side="left", padx=3, pady=3)
-            entry_list.append(entry)
-
-        remove_btn = ctk.CTkButton(
-            row, text="✕", width=30,
-            fg_color="red", hover_color="#a33",
-            command=lambda: self._remove_line_item_row(row, entry_list)
+        form.earnings_entries.append((name, entry))
+
+    def _add_letter_content_field(self, form):
+        ctk.CTkLabel(form.frame, text="✉️ Letter Content", font=("Helvetica", 16, "bold")).pack(pady=(15, 5))
+        form.content_text = ctk.CTkTextbox(form.frame, width=700, height=300)
+        form.content_text.pack(padx=15, pady=10, fill="both", expand=True)
+
+    def _add_line_items_section(self, form):
+        ctk.CTkLabel(form.frame, text="📦 Line Items", font=("Helvetica", 16, "bold")).pack(pady=(15, 5))
+        form.line_items_grid = LineItemGrid(
+            form.frame, form.template["line_items"]["columns"],
+            on_change=self._schedule_preview, corner_radius=10
         )
-        remove_btn.pack(side="left", padx=5)
-
-        self.line_item_entries.append(entry_list)
+        form.line_items_grid.pack(fill="x", padx=15, pady=5)
+
+        buttons = ctk.CTkFrame(form.frame, fg_color="transparent")
+        buttons.pack(pady=8)
+        ctk.CTkButton(buttons, text="+ Add Item", command=form.line_items_grid.add_row).pack(side="left", padx=5)
+        ctk.CTkButton(buttons, text="📋 Paste Rows", command=lambda: self._paste_line_items(form)).pack(side="left", padx=5)
+
+    def _paste_line_items(self, form):
+        """Appends rows copied from a spreadsheet, one line item per line, columns in form order."""
+        if not form.line_items_grid.paste_clipboard():
+            messagebox.showinfo(
+                "Paste Rows",
+                "Copy the rows from a spreadsheet first, columns in this order:\n"
+                + ", ".join(form.line_items_grid.columns),
+                parent=self
+            )
 
+    # ---------- LIVE PREVIEW ----------
+    def _on_form_edited(self, event):
+        if str(getattr(event, "widget", "")).startswith(str(self.scroll_frame)):
+            self._schedule_preview()
+
+    def _schedule_preview(self):
+        """Re-renders the preview once the form has been left alone for PREVIEW_DEBOUNCE_MS."""
+        if not self.preview_var.get():
+            return
+        if self._preview_after is not None:
+            self.after_cancel(self._preview_after)
+        self._preview_after = self.after(PREVIEW_DEBOUNCE_MS, self._request_preview)
+
+    def _request_preview(self):
+        self._preview_after = None
+        doc_type = self.doc_type_var.get()
+        company = self.company_var.get()
+        if not doc_type or not company:
+            return
+        try:
+            data = self.collect_form_data()
+        except Exception as e:
+            self.preview_status.configure(text=f"Preview unavailable: {e}")
+            return
+        # Supersedes any render still running for older form contents.
+        self._preview_generation = self.preview_worker.submit(company, doc_type, data, self.preview_page, PREVIEW_WIDTH)
+        self.preview_status.configure(text="Rendering...")
+        if not self._preview_polling:
+            self._preview_polling = True
+            self.after(PREVIEW_POLL_MS, self._poll_preview)
+
+    def _poll_preview(self):
+        if not self.preview_var.get():
+            self._preview_polling = False
+            return
+        result = self.preview_worker.take_result()
+        if result is None or result.generation != self._preview_generation:
+            self.after(PREVIEW_POLL_MS, self._poll_preview)
+            return
+        self._preview_polling = False
+
+        if result.error:
+            # Keep the last good page on screen while the form is half filled in.
+            self.preview_status.configure(text=f"Preview unavailable: {result.error}")
+            return
+        from PIL import ImageTk
+        self._preview_photo = ImageTk.PhotoImage(result.image)  # Keep a reference or Tk drops the image
+        self.preview_canvas.delete("all")
+        self.preview_canvas.create_image(0, 0, anchor="nw", image=self._preview_photo)
+        self.preview_page = result.page
+        self.preview_page_label.configure(text=f"{result.page + 1} / {result.page_count}")
+        self.preview_status.configure(text=f"Rendered in {result.elapsed_ms:.0f} ms")
+
+    def _preview_step(self, delta):
+        self.preview_page = max(0, self.preview_page + delta)
+        if self.preview_var.get():
+            self._request_preview()  # Same document, so the worker only rasterizes the new page
+
+    def _toggle_preview(self):
+        if self.preview_var.get():
+            self.preview_frame.pack(side="right", fill="y", padx=(0, 10), pady=10, before=self.main_frame)
+            self._schedule_preview()
+        else:
+            if self._preview_after is not None:
+                self.after_cancel(self._preview_after)
+                self._preview_after = None
+            self.preview_worker.cancel()
+            self.preview_frame.pack_forget()
 
-    def _remove_line_item_row(self, frame, entry_list):
-        frame.destroy()
-        self.line_item_entries.remove(entry_list)
+    def destroy(self):
+        self.preview_worker.close()
+        super().destroy()
 
     # ---------- DATA COLLECTION ----------
     def collect_form_data(self):
@@ -272,12 +576,7 @@ class DocumentApp(ctk.CTk):
         if doc_type == "Request Letter":
             data["content"] = self.content_text.get("1.0", "end").strip()
         if doc_type in ["Invoice", "Sales Tax Invoice"]:
-            columns = template["line_items"]["columns"]
-            data["line_items"] = []
-            for entry_row in self.line_item_entries:
-                row = {col: entry_row[i].get().strip() for i, col in enumerate(columns)}
-                if any(row.values()):
-                    data["line_items"].append(row)
+            data["line_items"] = [row for row in self.line_items_grid.get_rows() if any(row.values())]
         return data
 
     # ---------- GENERATE DOCUMENT ----------
@@ -295,9 +594,9 @@ class DocumentApp(ctk.CTk):
             template = self.doc_manager.templates.get(doc_type, {})
             template_class = template.get("template_class")
             if template_class:
-                is_valid, message = template_class.validate_data(data)
-                if not is_valid:
-                    messagebox.showerror("Validation Error", message)
+                result = as_result(template_class.validate_data(data))
+                if not result.valid:
+                    messagebox.showerror("Validation Error", result.message)
                     return
 
             filepath = self.doc_manager.generate_document(
@@ -307,6 +606,7 @@ class DocumentApp(ctk.CTk):
                 is_resave=self.is_editing_mode 
             )
             if messagebox.askyesno("Success", f"Document generated successfully!\n{filepath}\n\nAdd signature?"):
+                from signer import PDFSignatureApp  # Pulls in PyMuPDF; only load it when signing
                 PDFSignatureApp(ctk.CTkToplevel(self), filepath)
             
             # Refresh the form to show the next invoice number and reset state
@@ -322,18 +622,30 @@ class DocumentApp(ctk.CTk):
 
     # ---------- LOAD EXISTING DOCUMENT ----------
     def load_document_for_edit(self):
-        try:
-            filepath = filedialog.askopenfilename(filetypes=[("PDF files", "*.pdf")])
-            if not filepath:
-                return
+        DocumentSearchDialog(self, self.load_sidecar_for_edit)
 
-            json_path = Path(filepath).with_suffix(".json")
+    def load_sidecar_for_edit(self, json_path, part=None):
+        try:
             if not json_path.exists():
                 messagebox.showerror("Error", "No editable data found for this document.")
                 return
 
             with open(json_path, "r") as f:
                 saved_data = json.load(f)
+
+            # Bundles hold several documents; pick the one to edit.
+            if saved_data.get("bundle") and part is not None:
+                saved_data = saved_data["documents"][part]
+            elif saved_data.get("bundle"):
+                documents = saved_data.get("documents", [])
+                choice = simpledialog.askinteger(
+                    "Bundle",
+                    f"This file contains {len(documents)} documents.\nWhich one do you want to edit?",
+                    minvalue=1, maxvalue=len(documents), parent=self
+                )
+                if not choice:
+                    return
+                saved_data = documents[choice - 1]
             
             self.populate_form_with_data(saved_data)
             self.is_editing_mode = True # Set edit mode AFTER populating
@@ -348,8 +660,8 @@ class DocumentApp(ctk.CTk):
 
         self.company_var.set(company)
         self.doc_type_var.set(doc_type)
-        # This will build the form, including a placeholder for the next invoice number
-        self.load_form_fields() 
+        # This shows the (reset) form, including a placeholder for the next invoice number
+        self.load_form_fields()
 
         # Now, overwrite the form fields with the loaded data
         # Overwrite the auto-generated invoice number with the one from the loaded file
@@ -383,37 +695,32 @@ class DocumentApp(ctk.CTk):
             self.content_text.delete("1.0", "end")
             self.content_text.insert("1.0", form_data.get("content", ""))
         elif doc_type in ["Invoice", "Sales Tax Invoice"]:
-            template = self.doc_manager.templates.get(doc_type, {})
-            for child in self.items_container.winfo_children():
-                child.destroy()
-            self.line_item_entries.clear()
-            for item in form_data.get("line_items", []):
-                self._add_line_item_row(template)
-                for i, (col, val) in enumerate(item.items()):
-                    widget = self.line_item_entries[-1][i]
-                    if isinstance(widget, DateEntry):
-                        try:
-                            widget.set_date(datetime.strptime(val, "%d-%m-%Y"))
-                        except (ValueError, TypeError):
-                            pass # Ignore invalid date formats
-                    else:
-                        widget.insert(0, val)
+            self.line_items_grid.set_rows(form_data.get("line_items", []))
         elif doc_type == "Salary Slip":
             for name, entry in self.earnings_entries:
                 entry.delete(0, "end")
                 entry.insert(0, form_data.get(name, "0"))
 
 if __name__ == "__main__":
-    app = DocumentApp()
-    app.withdraw()
+    profile = StartupProfile(started=_STARTED, baseline_modules=_BASELINE_MODULES)
+    profile.mark("import UI modules")
+
+    app = DocumentApp(startup_profile=profile, show_splash=True)
 
-    splash = SplashScreen(app)
+    # Load the PDF renderer (fpdf2) in the background so the first Generate
+    # click doesn't stall; the splash stays up exactly until it's ready.
+    warm_up = threading.Thread(target=importlib.import_module, args=("pdf_generator",), daemon=True)
+    warm_up.start()
 
     def show_main_window():
+        if warm_up.is_alive():
+            app.after(50, show_main_window)
+            return
+        profile.mark("load PDF renderer")
         app.deiconify()
-        splash.fade_out_and_destroy()
+        app.splash.fade_out_and_destroy()
+        profile.print_report()
 
-    # Schedule the main window to appear after 3500ms
-    app.after(3500, show_main_window)
+    app.after(50, show_main_window)
     
     app.mainloop()
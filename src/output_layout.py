@@ -0,0 +1,109 @@
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+# Sub-folders for generated documents, relative to get_output_dir().
+# Placeholders: {company}, {doc_type}, {year}, {month}, {day}. "" keeps the old flat folder.
+DEFAULT_LAYOUT = "{company}/{year}/{month}"
+BUNDLE_FOLDER = "Bundles"
+
+_TIMESTAMP_RE = re.compile(r"_(\d{8})_(\d{6})(?:_\d+)?$")
+
+
+def sanitize_filename(name: str) -> str:
+    """Sanitizes a string to be safe for use in a filename."""
+    s = str(name).strip().replace(' ', '_')
+    s = re.sub(r'[\\/:*?"<>|]', '', s) # Remove invalid characters
+    return s
+
+
+def shard_dir(root: Path, layout: str, company: str, doc_type: str = "", when: Optional[datetime] = None) -> Path:
+    """Returns the folder a document belongs in under the given layout."""
+    when = when or datetime.now()
+    relative = layout.format(
+        company=sanitize_filename(company),
+        doc_type=sanitize_filename(doc_type),
+        year=f"{when.year:04d}",
+        month=f"{when.month:02d}",
+        day=f"{when.day:02d}",
+    )
+    return root / relative if relative.strip("/") else root
+
+
+def claim_path(directory: Path, stem: str, suffix: str = ".pdf") -> Path:
+    """
+    Picks a free file name in directory and creates it empty, so no other
+    thread or process can take the same name. A numeric suffix is added when
+    the name is already used, e.g. two documents generated in the same second.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    candidate = directory / f"{stem}{suffix}"
+    counter = 2
+    while True:
+        try:
+            with open(candidate, "x"):
+                return candidate
+        except FileExistsError:
+            candidate = directory / f"{stem}_{counter}{suffix}"
+            counter += 1
+
+
+def _document_time(pdf_path: Path) -> datetime:
+    """Reads the generation time from the file name, falling back to the file's mtime."""
+    match = _TIMESTAMP_RE.search(pdf_path.stem)
+    if match:
+        try:
+            return datetime.strptime(match.group(1) + match.group(2), "%Y%m%d%H%M%S")
+        except ValueError:
+            pass
+    return datetime.fromtimestamp(pdf_path.stat().st_mtime)
+
+
+def migrate(root: Union[str, Path], layout: str = DEFAULT_LAYOUT, dry_run: bool = False) -> Dict[str, int]:
+    """
+    Moves existing PDFs and their sidecars into the given layout. The company
+    is read from the sidecar; PDFs without one are left where they are.
+    Files already in the right folder are skipped, so it is safe to re-run,
+    and switching layouts later just moves everything again.
+    """
+    root = Path(root)
+    stats = {"moved": 0, "in_place": 0, "skipped": 0}
+    for pdf_path in sorted(root.rglob("*.pdf")):
+        json_path = pdf_path.with_suffix(".json")
+        try:
+            with open(json_path, "r") as f:
+                sidecar = json.load(f)
+        except (IOError, json.JSONDecodeError, UnicodeDecodeError):
+            stats["skipped"] += 1
+            continue
+
+        if sidecar.get("bundle"):
+            company, doc_type = BUNDLE_FOLDER, "Bundle"
+        else:
+            company, doc_type = sidecar.get("company"), sidecar.get("doc_type", "")
+        if not company:
+            stats["skipped"] += 1
+            continue
+
+        target_dir = shard_dir(root, layout, company, doc_type, _document_time(pdf_path))
+        if pdf_path.parent == target_dir:
+            stats["in_place"] += 1
+            continue
+        stats["moved"] += 1
+        if dry_run:
+            continue
+
+        target_pdf = claim_path(target_dir, pdf_path.stem)
+        # Same volume, so these are renames; the sidecar follows the PDF's final name.
+        os.replace(pdf_path, target_pdf)
+        os.replace(json_path, target_pdf.with_suffix(".json"))
+
+        # Drop folders the move left empty (never the root itself).
+        parent = pdf_path.parent
+        while parent != root and parent.is_dir() and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+    return stats
@@ -0,0 +1,69 @@
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+# Rendered pages kept per document; each A4 page at 100% zoom is about 2.7 MB.
+DEFAULT_MAX_PAGES = 12
+
+
+class PageRenderer:
+    """
+    Rasterizes PDF pages in-process with PyMuPDF, straight to the pixel size
+    the canvas shows, instead of rendering at a fixed DPI and resizing.
+    Results are cached per (page, width, height), least recently used first out.
+    """
+    def __init__(self, path: Optional[str] = None, max_pages: int = DEFAULT_MAX_PAGES, data: Optional[bytes] = None):
+        """Opens the PDF at path, or the PDF bytes in data (e.g. a preview that was never saved)."""
+        self.path = path
+        self.max_pages = max_pages
+        if data is None:
+            # Read into memory so the file isn't held open (Windows would block saving over it).
+            with open(path, "rb") as f:
+                data = f.read()
+        self._doc = fitz.open(stream=data, filetype="pdf")
+        self._cache: "OrderedDict[Tuple[int, int, int], Image.Image]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def page_count(self) -> int:
+        return self._doc.page_count
+
+    def page_sizes(self) -> List[Tuple[float, float]]:
+        """Returns the width and height in PDF points of every page, for laying out a page strip."""
+        return [(page.rect.width, page.rect.height) for page in self._doc]
+
+    def page_size(self, page_index: int = 0) -> Tuple[float, float]:
+        """Returns a page's width and height in PDF points."""
+        rect = self._doc[page_index].rect
+        return rect.width, rect.height
+
+    def render(self, page_index: int, width: int, height: int) -> Image.Image:
+        """Returns the page as an RGB image of exactly width x height pixels."""
+        key = (page_index, width, height)
+        with self._lock:
+            image = self._cache.get(key)
+            if image is not None:
+                self._cache.move_to_end(key)
+                return image
+
+            page = self._doc[page_index]
+            matrix = fitz.Matrix(width / page.rect.width, height / page.rect.height)
+            pixmap = page.get_pixmap(matrix=matrix, alpha=False)
+            image = Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+            if image.size != (width, height):
+                # get_pixmap rounds the page box outwards, so it can be a pixel larger.
+                image = image.crop((0, 0, width, height)) if image.width >= width and image.height >= height \
+                    else image.resize((width, height))
+
+            self._cache[key] = image
+            while len(self._cache) > self.max_pages:
+                self._cache.popitem(last=False)
+            return image
+
+    def close(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._doc.close()
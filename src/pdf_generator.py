@@ -1,44 +1,38 @@
 ﻿from fpdf import FPDF
 from PIL import Image
 from pathlib import Path
-from typing import Dict, Any, Optional, Type
-import locale
+from typing import Dict, Any, Optional, Tuple
+
+from asset_cache import AssetCache, get_asset_cache
+from asset_pipeline import AssetPipeline, NO_CROP, get_asset_pipeline
 
 from templates.base_template import BaseTemplate
-from templates import (
-    invoice_template,
-    letter_template,
-    salary_template,
-    sales_tax_template
-)
+from template_registry import get_template_registry
+from formatting import format_amount
+
+# Placed sizes in mm; asset variants are built for these widths.
+LETTERHEAD_WIDTH_MM = 210
+LETTERHEAD_HEIGHT_MM = 297
+SIGNATURE_WIDTH_MM = 60
+STAMP_WIDTH_MM = 40
 
 class PDFGenerator:
     """Handles PDF document generation with professional formatting."""
 
-    def __init__(self):
+    def __init__(self, asset_cache: Optional[AssetCache] = None, asset_pipeline: Optional[AssetPipeline] = None):
+        self.asset_cache = asset_cache or get_asset_cache()
+        self.asset_pipeline = asset_pipeline or get_asset_pipeline()
+        # Settings from asset_pipeline.resolve_profile(); None embeds the source images as they are.
+        self.output_profile: Optional[Dict[str, Any]] = None
         self.pdf = FPDF()
         self.pdf.set_auto_page_break(auto=True, margin=15)
         self.pdf.set_left_margin(15)
         self.pdf.set_right_margin(15)
-        self._initialize_locale()
-
-    def _initialize_locale(self) -> None:
-        try:
-            locale.setlocale(locale.LC_ALL, 'en_US.UTF-8')
-            self._locale_available = True
-        except locale.Error:
-            try:
-                locale.setlocale(locale.LC_ALL, '')
-                self._locale_available = True
-            except locale.Error:
-                self._locale_available = False
 
     def format_currency(self, amount: float) -> str:
         try:
-            if self._locale_available:
-                return locale.currency(amount, grouping=True, symbol=False)
-            return "{:,.2f}".format(amount)
-        except:
+            return format_amount(amount)
+        except ValueError:
             return str(amount)
 
     def generate(
@@ -55,13 +49,56 @@ class PDFGenerator:
         logo_x: int = 15,
         logo_y: Optional[int] = None,
         logo_width: int = 40,
-        logo_height: int = 0
+        logo_height: int = 0,
+        output_profile: Optional[Dict[str, Any]] = None
     ) -> None:
+        self.add_document(
+            company,
+            doc_type,
+            template,
+            letterhead_path,
+            data,
+            signature_path,
+            stamp_path,
+            company_logo_path,
+            logo_x,
+            logo_y,
+            logo_width,
+            logo_height,
+            output_profile
+        )
+        self.output(output_path)
+
+    def add_document(
+        self,
+        company: str,
+        doc_type: str,
+        template: Dict[str, Any],
+        letterhead_path: str,
+        data: Dict[str, Any],
+        signature_path: Optional[str] = None,
+        stamp_path: Optional[str] = None,
+        company_logo_path: Optional[str] = None,
+        logo_x: int = 15,
+        logo_y: Optional[int] = None,
+        logo_width: int = 40,
+        logo_height: int = 0,
+        output_profile: Optional[Dict[str, Any]] = None
+    ) -> Tuple[int, int]:
+        """
+        Appends one document as new pages of this PDF and returns its first and
+        last page numbers (1-based). Calling this repeatedly builds a bundle in
+        which every page references the same embedded letterhead image.
+        Images are embedded as output_profile's variants of the given files.
+        """
+        self.output_profile = output_profile
+        first_page = self.pdf.page + 1
+        if first_page > 1:
+            self._reset_graphics_state()
         self._create_page_with_letterhead(letterhead_path)
 
-        template_class = self._get_template_class(doc_type)
-        if template_class:
-            template_instance = template_class()
+        template_instance = self._get_template(doc_type)
+        if template_instance:
             template_instance.generate_pdf_content(self.pdf, data)
 
         self._add_signature_stamp(
@@ -74,22 +111,65 @@ class PDFGenerator:
             logo_width,
             logo_height
         )
+        return first_page, self.pdf.page
+
+    def output(self, output_path: str) -> None:
         self.pdf.output(output_path)
 
-    def _get_template_class(self, doc_type: str) -> Optional[Type[BaseTemplate]]:
-        return {
-            "Invoice": invoice_template.InvoiceTemplate,
-            "Request Letter": letter_template.LetterTemplate,
-            "Salary Slip": salary_template.SalaryTemplate,
-            "Sales Tax Invoice": sales_tax_template.SalesTaxTemplate
-        }.get(doc_type)
+    def output_bytes(self) -> bytes:
+        """Returns the finished PDF in memory instead of writing a file."""
+        return bytes(self.pdf.output())
+
+    def _reset_graphics_state(self) -> None:
+        """Restores FPDF defaults so one bundled document can't leak colors or line widths into the next."""
+        self.pdf.set_draw_color(0, 0, 0)
+        self.pdf.set_fill_color(255, 255, 255)
+        self.pdf.set_text_color(0, 0, 0)
+        self.pdf.set_line_width(0.2)
+        self.pdf.set_left_margin(15)
+        self.pdf.set_right_margin(15)
+
+    def _image(self, path: str, **kwargs) -> None:
+        """Places an image, embedding the output profile's variant of it from the shared asset cache."""
+        if self.output_profile is not None and kwargs.get("w"):
+            derived = self.asset_pipeline.derive(path, self.output_profile, kwargs["w"])
+            path = derived.path
+            if derived.crop != NO_CROP:
+                self._place_cropped(path, derived.crop, derived.aspect, **kwargs)
+                return
+        self.pdf.image(self.asset_cache.embed(self.pdf, path), **kwargs)
+
+    def _place_cropped(self, path: str, crop: Tuple[float, float, float, float], aspect: float, **kwargs) -> None:
+        """Places a trimmed variant exactly where the untrimmed image would have shown those pixels."""
+        left, top, right, bottom = crop
+        w = kwargs.pop("w")
+        h = kwargs.pop("h", 0) or w * aspect
+        x = kwargs.pop("x", None)
+        y = kwargs.pop("y", None)
+        flowing = y is None
+        if flowing:
+            # Same page break and cursor advance fpdf2 does for an image placed at the current y.
+            if self.pdf.will_page_break(h):
+                self.pdf.add_page(same=True)
+            y = self.pdf.get_y()
+        if x is None:
+            x = self.pdf.get_x()
+        self.pdf.image(
+            self.asset_cache.embed(self.pdf, path),
+            x=x + w * left, y=y + h * top, w=w * (right - left), h=h * (bottom - top), **kwargs
+        )
+        if flowing:
+            self.pdf.y = y + h  # set_y() would also reset x
+
+    def _get_template(self, doc_type: str) -> Optional[BaseTemplate]:
+        return get_template_registry().get(doc_type)
 
     def _create_page_with_letterhead(self, letterhead_path: str) -> None:
         self.pdf.add_page()
 
         if letterhead_path and Path(letterhead_path).exists():
             try:
-                self.pdf.image(letterhead_path, x=0, y=0, w=210, h=297)
+                self._image(letterhead_path, x=0, y=0, w=LETTERHEAD_WIDTH_MM, h=LETTERHEAD_HEIGHT_MM)
                 self.pdf.set_y(60)
             except Exception as e:
                 print(f"Error loading letterhead: {e}")
@@ -112,14 +192,14 @@ class PDFGenerator:
 
         if signature_path and Path(signature_path).exists():
             try:
-                self.pdf.image(signature_path, x=120, w=60)
+                self._image(signature_path, x=120, w=SIGNATURE_WIDTH_MM)
                 self.pdf.ln(20)
             except Exception as e:
                 pass
 
         if stamp_path and Path(stamp_path).exists():
             try:
-                self.pdf.image(stamp_path, x=140, w=40)
+                self._image(stamp_path, x=140, w=STAMP_WIDTH_MM)
             except Exception as e:
                 pass
 
@@ -129,8 +209,8 @@ class PDFGenerator:
                 if logo_y is None:
                     logo_y = self.pdf.get_y()
                 
-                self.pdf.image(
-                    company_logo_path, 
+                self._image(
+                    company_logo_path,
                     x=logo_x, 
                     y=logo_y, 
                     w=logo_width, 
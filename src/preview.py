@@ -0,0 +1,127 @@
+import json
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from PIL import Image
+    from document_manager import DocumentManager
+    from page_renderer import PageRenderer
+
+
+class PreviewResult(NamedTuple):
+    """A finished preview: one rasterized page, or the error that stopped the render."""
+    generation: int
+    image: Optional['Image.Image']
+    page: int
+    page_count: int
+    elapsed_ms: float
+    error: Optional[str] = None
+
+
+class PreviewWorker:
+    """
+    Renders form previews on one background thread, newest request first.
+    submit() supersedes everything asked for before it: a request still
+    waiting is dropped, and a render already running is thrown away as soon
+    as it finishes building the PDF, before it is rasterized. The UI thread
+    never waits; it polls take_result(), which only ever hands back the
+    newest preview. Every submit() ends in exactly one result for it, an
+    image or an error, unless a later submit() or cancel() supersedes it.
+
+    The last rendered PDF is kept, so flipping pages or resizing only
+    rasterizes again.
+    """
+    def __init__(self, doc_manager: 'DocumentManager'):
+        self.doc_manager = doc_manager
+        self._cond = threading.Condition()
+        self._generation = 0
+        self._pending: Optional[tuple] = None
+        self._result: Optional[PreviewResult] = None
+        self._closed = False
+        self._document_key: Optional[str] = None
+        self._renderer: Optional['PageRenderer'] = None
+        self._thread = threading.Thread(target=self._run, name="preview", daemon=True)
+        self._thread.start()
+
+    def submit(self, company: str, doc_type: str, data: Dict[str, Any], page: int, width: int) -> int:
+        """Asks for page of the document the form describes, width pixels wide. Returns its generation."""
+        with self._cond:
+            self._generation += 1
+            self._pending = (self._generation, company, doc_type, data, page, width)
+            self._cond.notify()
+            return self._generation
+
+    def cancel(self) -> None:
+        """Drops whatever is waiting or running, e.g. when the form is rebuilt."""
+        with self._cond:
+            self._generation += 1
+            self._pending = None
+            self._result = None
+
+    def take_result(self) -> Optional[PreviewResult]:
+        """Returns the newest finished preview once, or None if there is none (yet)."""
+        with self._cond:
+            result, self._result = self._result, None
+            return result
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._pending = None
+            self._cond.notify()
+
+    # ---------- WORKER THREAD ----------
+    def _stale(self, generation: int) -> bool:
+        with self._cond:
+            return generation != self._generation
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    break
+                generation, company, doc_type, data, page, width = self._pending
+                self._pending = None
+            started = time.perf_counter()
+            try:
+                result = self._render(generation, company, doc_type, data, page, width, started)
+            except Exception as e:
+                result = PreviewResult(generation, None, page, 0, 0.0, str(e) or type(e).__name__)
+            if result is None:
+                continue  # Superseded while rendering
+            with self._cond:
+                if result.generation == self._generation:
+                    self._result = result
+        if self._renderer is not None:
+            self._renderer.close()
+
+    def _render(
+        self,
+        generation: int,
+        company: str,
+        doc_type: str,
+        data: Dict[str, Any],
+        page: int,
+        width: int,
+        started: float
+    ) -> Optional[PreviewResult]:
+        from page_renderer import PageRenderer  # PyMuPDF is only loaded once a preview is shown
+
+        key = json.dumps([company, doc_type, data], sort_keys=True, default=str)
+        if key != self._document_key or self._renderer is None:
+            pdf_bytes = self.doc_manager.render_preview(company, doc_type, data)
+            if self._stale(generation):
+                return None
+            if self._renderer is not None:
+                self._renderer.close()
+            self._renderer = PageRenderer(data=pdf_bytes, max_pages=4)
+            self._document_key = key
+
+        page_count = self._renderer.page_count
+        page = max(0, min(page, page_count - 1))
+        page_width, page_height = self._renderer.page_size(page)
+        image = self._renderer.render(page, width, round(width * page_height / page_width))
+        return PreviewResult(generation, image, page, page_count, (time.perf_counter() - started) * 1000)
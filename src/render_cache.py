@@ -0,0 +1,180 @@
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import tempfile
+import threading
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Union
+
+# Modules every template renders through. Their source is part of each key
+# (template modules are versioned by their own), so editing one of them
+# invalidates the cache. asset_pipeline.py covers PIPELINE_VERSION too.
+RENDERER_MODULES = ("pdf_generator.py", "formatting.py", "table_layout.py", "line_items.py", "asset_pipeline.py")
+# Bump when the output changes through something RENDERER_MODULES doesn't cover, e.g. fonts or fpdf2.
+RENDERER_VERSION = "2"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+@lru_cache(maxsize=256)
+def _file_digest(path: str, mtime_ns: int, size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_digest(path: Optional[str]) -> Optional[str]:
+    """SHA-256 of a file, memoized on path + mtime + size."""
+    if not path:
+        return None
+    st = os.stat(path)
+    return _file_digest(os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+
+def renderer_version() -> List[Optional[str]]:
+    """RENDERER_VERSION plus a digest of each of RENDERER_MODULES."""
+    here = Path(__file__).resolve().parent
+    version = [RENDERER_VERSION]
+    for name in RENDERER_MODULES:
+        try:
+            version.append(file_digest(str(here / name)))
+        except OSError:
+            version.append(None)
+    return version
+
+
+def template_version(template) -> str:
+    """A template's `version` attribute if it has one, else a digest of its module source."""
+    version = getattr(template, "version", None)
+    if version:
+        return str(version)
+    try:
+        return file_digest(inspect.getsourcefile(type(template)))
+    except (TypeError, OSError):
+        return type(template).__qualname__
+
+
+def render_key(
+    doc_type: str,
+    form_data: Dict[str, Any],
+    template,
+    company_config: Dict[str, Any],
+    files: Iterable[Optional[str]]
+) -> str:
+    """Hashes everything that affects a rendered document into a cache key."""
+    payload = {
+        "renderer": renderer_version(),
+        "doc_type": doc_type,
+        "template": template_version(template),
+        "company": company_config,
+        "files": [file_digest(path) for path in files],
+        "form_data": form_data,
+    }
+    if getattr(template, "prints_render_date", False):
+        # A cached slip from yesterday would carry yesterday's date.
+        payload["render_date"] = date.today().isoformat()
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """
+    Content-addressed store of rendered PDFs on disk, shared by every
+    process. Files are named by their render_key(), so a hit is a plain file
+    copy. Once the store grows past max_bytes, the least recently used files
+    (by mtime, refreshed on every hit) are deleted.
+    """
+    def __init__(self, directory: Union[str, Path], max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.pdf"
+
+    def fetch(self, key: str, output_path: Union[str, Path]) -> bool:
+        """Copies the cached PDF for key to output_path. Returns False on a miss."""
+        cached = self._path(key)
+        try:
+            shutil.copyfile(cached, output_path)
+            os.utime(cached)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return False
+        with self._lock:
+            self.hits += 1
+        return True
+
+    def store(self, key: str, rendered_path: Union[str, Path]) -> None:
+        """Adds a freshly rendered PDF to the cache."""
+        cached = self._path(key)
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        # Copy to a temp file first so other processes never see a partial PDF.
+        fd, temp_path = tempfile.mkstemp(dir=cached.parent, suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copyfile(rendered_path, temp_path)
+            os.replace(temp_path, cached)
+        except OSError:
+            Path(temp_path).unlink(missing_ok=True)
+            return
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += cached.stat().st_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _scan_size(self) -> int:
+        return sum(path.stat().st_size for path in self.directory.glob("*/*.pdf"))
+
+    def _evict(self) -> None:
+        # Other processes write here too, so start from what is really on disk.
+        files = []
+        for path in self.directory.glob("*/*.pdf"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * 9 // 10
+        for _, size, path in files:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self.evictions += 1
+        self._size = total
+
+    def clear(self) -> None:
+        """Deletes every cached PDF."""
+        with self._lock:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Returns hit/miss/eviction counters for this process and the size on disk."""
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
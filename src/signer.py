@@ -1,26 +1,46 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, simpledialog, Menu
 from PIL import Image, ImageTk
-from pdf2image import convert_from_path
 import fitz  # PyMuPDF
+import json
 import os
-import tempfile
-import sys
-from pathlib import Path
-
-def get_poppler_path():
-    if hasattr(sys, "_MEIPASS"):  # PyInstaller ke liye
-        base_path = Path(sys._MEIPASS)
-    else:
-        base_path = Path(__file__).parent.parent
-    return str(base_path / "poppler" / "bin")
-
-POPPLER_PATH = get_poppler_path()
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import count
+from page_renderer import PageRenderer
+from stamping import OverlayEmbedder, PresetStore, load_overlay, preset_rects, save_document
 
 A4_WIDTH_PX = 794
 A4_HEIGHT_PX = 1123
+# Canvas pixels per PDF point at 100% zoom, so an A4 page is A4_WIDTH_PX wide.
+BASE_SCALE = A4_WIDTH_PX / 595.28
+PAGE_GAP_PX = 12
+ZOOM_STEP = 0.1
+# Pages rendered above and below the ones in view, so short scrolls find them ready.
+PAGE_MARGIN = 1
+# PhotoImages kept for quick back-and-forth scrolling and zooming
+PAGE_PHOTO_CACHE_SIZE = 8
+OVERLAY_PHOTO_CACHE_SIZE = 128
+# Default overlay position, in points from the top-left of the page
+OVERLAY_OFFSET_PT = 75
+
+_overlay_keys = count(1)
+
+
+def _cache_put(cache, key, value, max_size):
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > max_size:
+        cache.popitem(last=False)
+    return value
 
 class PDFSignatureApp:
+    """
+    Shows every page of a PDF in a scrolling strip and stamps signature/stamp
+    images onto them. Only the pages in and next to the viewport are rendered
+    and kept on the canvas, so long documents scroll as fast as short ones.
+    Overlays belong to a page and are positioned in PDF points.
+    """
     def __init__(self, root, pdf_path=None):
         self.root = root
         self.root.title("PDF Signature Tool")
@@ -29,16 +49,30 @@ class PDFSignatureApp:
         self.signature_items = []
         self.selected_item = None
         self.dragging = False
+        self.page_renderer = None
+        self.page_sizes = []    # (width, height) of each page in points
+        self.page_tops = []     # canvas y of each page at the current zoom
+        self._layout_scale = BASE_SCALE
+        self.page_items = {}    # page index -> canvas image, for the pages currently shown
+        self.current_page = 0
+        self._update_pending = False
+        self.page_photos = OrderedDict()     # (page, width, height) -> PhotoImage of the page
+        self.overlay_photos = OrderedDict()  # (image key, rotation, (width, height)) -> PhotoImage
 
         self.canvas_frame = tk.Frame(root)
         self.canvas_frame.pack(fill=tk.BOTH, expand=True)
 
-        self.canvas = tk.Canvas(self.canvas_frame, bg="white", scrollregion=(0, 0, A4_WIDTH_PX, A4_HEIGHT_PX), cursor="arrow")
+        self.canvas = tk.Canvas(self.canvas_frame, bg="gray75", scrollregion=(0, 0, A4_WIDTH_PX, A4_HEIGHT_PX),
+                                cursor="arrow", yscrollincrement=40)
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
         self.scroll_y = tk.Scrollbar(self.canvas_frame, orient=tk.VERTICAL, command=self.canvas.yview)
         self.scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
-        self.canvas.configure(yscrollcommand=self.scroll_y.set)
+        self.canvas.configure(yscrollcommand=self._on_yscroll)
+        self.canvas.bind("<Configure>", lambda e: self._schedule_update())
+        self.canvas.bind("<MouseWheel>", self._on_mousewheel)
+        self.canvas.bind("<Button-4>", lambda e: self.canvas.yview_scroll(-1, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self.canvas.yview_scroll(1, "units"))
 
         btn_frame = tk.Frame(root)
         btn_frame.pack(fill=tk.X, pady=5)
@@ -46,76 +80,317 @@ class PDFSignatureApp:
         tk.Button(btn_frame, text="Zoom In", command=self.zoom_in).pack(side=tk.LEFT, padx=5)
         tk.Button(btn_frame, text="Zoom Out", command=self.zoom_out).pack(side=tk.LEFT, padx=5)
         tk.Button(btn_frame, text="Add Signature/Stamp", command=self.add_image).pack(side=tk.LEFT, padx=5)
+        tk.Button(btn_frame, text="Apply Preset", command=self.apply_preset).pack(side=tk.LEFT, padx=5)
         tk.Button(btn_frame, text="Save PDF", command=self.save_pdf).pack(side=tk.LEFT, padx=5)
+        tk.Button(btn_frame, text="Sign in Place", command=lambda: self.save_pdf(incremental=True)).pack(side=tk.LEFT, padx=5)
+
+        tk.Button(btn_frame, text="Next ▶", command=lambda: self.go_to_page(self.current_page + 1)).pack(side=tk.RIGHT, padx=5)
+        self.page_count_label = tk.Label(btn_frame, text="/ 0")
+        self.page_count_label.pack(side=tk.RIGHT)
+        self.page_var = tk.StringVar(value="0")
+        page_entry = tk.Entry(btn_frame, textvariable=self.page_var, width=5, justify="center")
+        page_entry.pack(side=tk.RIGHT, padx=3)
+        page_entry.bind("<Return>", self._on_page_entry)
+        tk.Button(btn_frame, text="◀ Prev", command=lambda: self.go_to_page(self.current_page - 1)).pack(side=tk.RIGHT, padx=5)
 
         self.root.bind("<Delete>", self.delete_selected)
+        self.root.bind("<Prior>", lambda e: self.go_to_page(self.current_page - 1))
+        self.root.bind("<Next>", lambda e: self.go_to_page(self.current_page + 1))
 
         if self.pdf_path:
             self.load_pdf(self.pdf_path)
 
+    # ---------- LAYOUT ----------
+    @property
+    def scale(self):
+        """Canvas pixels per PDF point at the current zoom."""
+        return BASE_SCALE * self.zoom_factor
+
+    def _page_px(self, page_index):
+        width_pt, height_pt = self.page_sizes[page_index]
+        return int(width_pt * self.scale), int(height_pt * self.scale)
+
+    def _layout(self):
+        """Stacks the pages vertically at the current zoom. Nothing is rendered here."""
+        gap = int(PAGE_GAP_PX * self.zoom_factor)
+        self._layout_scale = self.scale
+        self.page_tops = []
+        y = 0
+        for page_index in range(len(self.page_sizes)):
+            self.page_tops.append(y)
+            y += self._page_px(page_index)[1] + gap
+        width = max((self._page_px(i)[0] for i in range(len(self.page_sizes))), default=A4_WIDTH_PX)
+        self.canvas.config(scrollregion=(0, 0, width, max(y - gap, 1)))
+
+    def _page_at(self, y):
+        """Returns the index of the page at canvas height y."""
+        return max(0, min(bisect_right(self.page_tops, y) - 1, len(self.page_tops) - 1))
+
+    def _total_height(self):
+        return self.page_tops[-1] + self._page_px(len(self.page_tops) - 1)[1]
+
+    # ---------- LOADING / RENDERING ----------
     def load_pdf(self, path):
         self.pdf_path = path
-        self.original_pdf_img = convert_from_path(path, poppler_path=POPPLER_PATH)[0]
+        if self.page_renderer:
+            self.page_renderer.close()
+        self.page_renderer = PageRenderer(path)
+        self.page_sizes = self.page_renderer.page_sizes()
+        self.page_photos.clear()
+        self.canvas.delete("all")
+        self.page_items = {}
+        self.page_tops = []
+        # Overlays survive reopening the file, as long as their page still exists.
+        self.signature_items = [item for item in self.signature_items if item["page"] < len(self.page_sizes)]
+        for item in self.signature_items:
+            item["id"] = None
+        self.current_page = min(self.current_page, max(len(self.page_sizes) - 1, 0))
+        self.page_count_label.config(text=f"/ {len(self.page_sizes)}")
         self.render_pdf()
 
     def render_pdf(self):
-        img = self.original_pdf_img.copy()
-        w, h = int(A4_WIDTH_PX * self.zoom_factor), int(A4_HEIGHT_PX * self.zoom_factor)
-        img = img.resize((w, h))
-        self.pdf_img = img
-        self.tk_pdf = ImageTk.PhotoImage(img)
-
-        self.canvas.delete("all")
-        self.canvas.create_image(0, 0, anchor="nw", image=self.tk_pdf)
+        """Lays the pages out at the current zoom, keeping the current page in view."""
+        if not self.page_sizes:
+            return
+        # Remember how far into the current page the view is, to restore it after zooming.
+        offset_pt = 0.0
+        if self.page_tops:
+            offset_pt = (self.canvas.canvasy(0) - self.page_tops[self.current_page]) / self._layout_scale
+        anchor = self.current_page
+
+        for page_index in list(self.page_items):
+            self._hide_page(page_index)
+        self._layout()
+        y = self.page_tops[anchor] + max(0.0, offset_pt) * self.scale
+        self.canvas.yview_moveto(y / self._total_height())
+        self.update_visible_pages()
+
+    def _on_yscroll(self, first, last):
+        self.scroll_y.set(first, last)
+        self._schedule_update()
+
+    def _on_mousewheel(self, event):
+        self.canvas.yview_scroll(-1 if event.delta > 0 else 1, "units")
+
+    def _schedule_update(self):
+        # Scrolling fires many events per frame; work out the visible pages once per idle.
+        if not self._update_pending:
+            self._update_pending = True
+            self.root.after_idle(self.update_visible_pages)
+
+    def update_visible_pages(self):
+        """Renders the pages in and around the viewport and drops the rest from the canvas."""
+        self._update_pending = False
+        if not self.page_tops:
+            return
+        top = self.canvas.canvasy(0)
+        bottom = self.canvas.canvasy(self.canvas.winfo_height())
+        first = max(0, self._page_at(top) - PAGE_MARGIN)
+        last = min(len(self.page_tops) - 1, self._page_at(bottom) + PAGE_MARGIN)
+
+        for page_index in list(self.page_items):
+            if not first <= page_index <= last:
+                self._hide_page(page_index)
+        for page_index in range(first, last + 1):
+            if page_index not in self.page_items:
+                self._show_page(page_index)
+
+        self.current_page = self._page_at((top + bottom) / 2)
+        self.page_var.set(str(self.current_page + 1))
+
+    def _page_photo(self, page_index):
+        width, height = self._page_px(page_index)
+        key = (page_index, width, height)
+        photo = self.page_photos.get(key)
+        if photo is None:
+            image = self.page_renderer.render(page_index, width, height)
+            photo = _cache_put(self.page_photos, key, ImageTk.PhotoImage(image), PAGE_PHOTO_CACHE_SIZE)
+        else:
+            self.page_photos.move_to_end(key)
+        return photo
+
+    def _show_page(self, page_index):
+        photo = self._page_photo(page_index)
+        canvas_id = self.canvas.create_image(0, self.page_tops[page_index], anchor="nw", image=photo)
+        self.canvas.tag_lower(canvas_id)
+        # Hold the PhotoImage while it is on screen even if the cache lets go of it.
+        self.page_items[page_index] = (canvas_id, photo)
+        for item in self.signature_items:
+            if item["page"] == page_index:
+                self.place_on_canvas(item)
 
+    def _hide_page(self, page_index):
+        canvas_id, _ = self.page_items.pop(page_index)
+        self.canvas.delete(canvas_id)
         for item in self.signature_items:
-            self.place_on_canvas(item)
+            if item["page"] == page_index and item.get("id"):
+                self.canvas.delete(item["id"])
+                item["id"] = None
 
-        self.canvas.config(scrollregion=self.canvas.bbox("all"))
+    # ---------- NAVIGATION ----------
+    def go_to_page(self, page_index):
+        if not self.page_tops:
+            return
+        page_index = max(0, min(page_index, len(self.page_tops) - 1))
+        self.canvas.yview_moveto(self.page_tops[page_index] / self._total_height())
+        self.update_visible_pages()
+        # A short last page can't scroll to the top; still treat it as current.
+        self.current_page = page_index
+        self.page_var.set(str(page_index + 1))
+
+    def _on_page_entry(self, event=None):
+        try:
+            self.go_to_page(int(self.page_var.get()) - 1)
+        except ValueError:
+            self.page_var.set(str(self.current_page + 1))
 
     def zoom_in(self):
-        self.zoom_factor += 0.1
+        # Rounded so every zoom step maps to the same cached page and overlay images.
+        self.zoom_factor = round(self.zoom_factor + ZOOM_STEP, 2)
         self.render_pdf()
 
     def zoom_out(self):
         if self.zoom_factor > 0.3:
-            self.zoom_factor -= 0.1
+            self.zoom_factor = round(self.zoom_factor - ZOOM_STEP, 2)
             self.render_pdf()
 
+    # ---------- OVERLAYS ----------
     def add_image(self):
+        if not self.page_sizes:
+            messagebox.showerror("Error", "Please open a PDF file first.")
+            return
         path = filedialog.askopenfilename(filetypes=[("Image Files", "*.png;*.jpg;*.jpeg")])
         if not path:
             return
         pil_img = Image.open(path).convert("RGBA")
+        page_index = self.current_page
+        # Near the top of the part of the page that is in view
+        visible_top_pt = (self.canvas.canvasy(0) - self.page_tops[page_index]) / self.scale
+        x_pt = OVERLAY_OFFSET_PT
+        y_pt = min(max(OVERLAY_OFFSET_PT, visible_top_pt + OVERLAY_OFFSET_PT), self.page_sizes[page_index][1] - OVERLAY_OFFSET_PT)
+        # Image pixels shown at their 100% zoom size, as before
+        rect = fitz.Rect(x_pt, y_pt, x_pt + pil_img.width / BASE_SCALE, y_pt + pil_img.height / BASE_SCALE)
+        self._add_item(path, pil_img, next(_overlay_keys), page_index, rect)
+
+    def _add_item(self, path, image, image_key, page_index, rect, rotation=0):
         item = {
             "path": path,
-            "image": pil_img,
-            "rotation": 0,
-            "x": 100,
-            "y": 100,
-            "canvas_x_px": 100 * self.zoom_factor,
-            "canvas_y_px": 100 * self.zoom_factor,
-            "width": pil_img.width,
-            "height": pil_img.height,
+            "image": image,
+            "image_key": image_key,
+            "rotation": rotation,
+            "page": page_index,
+            "x_pt": rect.x0,
+            "y_pt": rect.y0,
+            "width_pt": rect.width,
+            "height_pt": rect.height,
             "id": None
         }
         self.signature_items.append(item)
         self.place_on_canvas(item)
+        return item
+
+    # ---------- PRESETS ----------
+    def _document_company(self):
+        """The company in the open PDF's sidecar, or the one the user names."""
+        try:
+            with open(os.path.splitext(self.pdf_path)[0] + ".json", "r") as f:
+                company = json.load(f).get("company")
+        except (IOError, ValueError, AttributeError):
+            company = None
+        return company or simpledialog.askstring("Company", "Company name (as in config.json):", parent=self.root)
+
+    def save_preset(self, item):
+        """Saves an overlay's placement as a named preset for headless stamping."""
+        company = self._document_company()
+        if not company:
+            return
+        name = simpledialog.askstring("Save Preset", "Preset name:", parent=self.root)
+        if not name:
+            return
+        anchor = simpledialog.askstring(
+            "Save Preset", "Position relative to this text on the page (optional), e.g. TOTAL:", parent=self.root
+        )
+        x, y = item["x_pt"], item["y_pt"]
+        if anchor:
+            with fitz.open(self.pdf_path) as doc:
+                matches = doc[item["page"]].search_for(anchor)
+            if not matches:
+                messagebox.showerror("Error", f'"{anchor}" was not found on this page.')
+                return
+            x, y = x - matches[-1].x0, y - matches[-1].y0
+        # Overlays on the last page stay on the last page, however long the document.
+        page = -1 if item["page"] == len(self.page_sizes) - 1 else item["page"]
+        try:
+            PresetStore().save(company, name, {
+                "image": item["path"], "page": page, "x": x, "y": y,
+                "width": item["width_pt"], "height": item["height_pt"],
+                "rotation": item["rotation"], "anchor": anchor or None,
+            })
+        except (ValueError, OSError) as e:
+            messagebox.showerror("Error", str(e))
+            return
+        messagebox.showinfo("Success", f'Preset "{name}" saved for {company}.')
+
+    def apply_preset(self):
+        """Adds the overlays of a saved preset, where it would stamp them."""
+        if not self.page_sizes:
+            messagebox.showerror("Error", "Please open a PDF file first.")
+            return
+        company = self._document_company()
+        if not company:
+            return
+        store = PresetStore()
+        try:
+            names = list(store.presets(company))
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        if not names:
+            messagebox.showinfo("Presets", f"No presets saved for {company}.")
+            return
+        name = simpledialog.askstring("Apply Preset", "Preset name:\n" + "\n".join(names), parent=self.root)
+        if not name:
+            return
+        try:
+            preset = store.get(company, name)
+            image = load_overlay(preset["image"])
+            with fitz.open(self.pdf_path) as doc:
+                places = preset_rects(doc, preset)
+        except (ValueError, OSError) as e:
+            messagebox.showerror("Error", str(e))
+            return
+        image_key = next(_overlay_keys)
+        for page_index, rect in places:
+            self._add_item(preset["image"], image, image_key, page_index, rect, preset["rotation"])
+        self.go_to_page(places[0][0])
+
+    def _overlay_photo(self, item):
+        """Returns the rotated, scaled overlay for the current zoom, transforming it only once."""
+        size = (max(1, int(item["width_pt"] * self.scale)), max(1, int(item["height_pt"] * self.scale)))
+        key = (item["image_key"], item["rotation"], size)
+        photo = self.overlay_photos.get(key)
+        if photo is None:
+            img = item["image"].rotate(item["rotation"], expand=True)
+            img = img.resize(size)
+            photo = _cache_put(self.overlay_photos, key, ImageTk.PhotoImage(img), OVERLAY_PHOTO_CACHE_SIZE)
+        else:
+            self.overlay_photos.move_to_end(key)
+        return photo
 
     def place_on_canvas(self, item):
-        img = item["image"].rotate(item["rotation"], expand=True)
-        img = img.resize(
-            (int(item["width"] * self.zoom_factor), int(item["height"] * self.zoom_factor))
-        )
-        item["tk_img"] = ImageTk.PhotoImage(img)
+        # Overlays on pages that aren't shown get drawn when their page is.
+        if item["page"] not in self.page_items:
+            return
+        item["tk_img"] = self._overlay_photo(item)
 
-        x = int(item["x"] * self.zoom_factor)
-        y = int(item["y"] * self.zoom_factor)
-        item["canvas_x_px"] = x
-        item["canvas_y_px"] = y
+        x = int(item["x_pt"] * self.scale)
+        y = self.page_tops[item["page"]] + int(item["y_pt"] * self.scale)
 
         if item.get("id"):
-            self.canvas.delete(item["id"])
+            # Existing item: swap its image and move it instead of recreating it.
+            self.canvas.itemconfigure(item["id"], image=item["tk_img"])
+            self.canvas.coords(item["id"], x, y)
+            return
 
         item["id"] = self.canvas.create_image(x, y, anchor="nw", image=item["tk_img"])
 
@@ -139,11 +414,12 @@ class PDFSignatureApp:
         item["drag_start"] = (event.x, event.y)
 
     def stop_drag(self, event, item):
-        coords = self.canvas.coords(item["id"])
-        item["canvas_x_px"] = coords[0]
-        item["canvas_y_px"] = coords[1]
-        # item["x"] = coords[0] / self.zoom_factor
-        # item["y"] = coords[1] / self.zoom_factor
+        x, y = self.canvas.coords(item["id"])
+        # Dropping onto another page moves the overlay to that page.
+        page_index = self._page_at(y)
+        item["page"] = page_index
+        item["x_pt"] = x / self.scale
+        item["y_pt"] = (y - self.page_tops[page_index]) / self.scale
         self.canvas.config(cursor="arrow")
         self.dragging = False
 
@@ -152,90 +428,86 @@ class PDFSignatureApp:
         menu = Menu(self.root, tearoff=0)
         menu.add_command(label="Resize", command=lambda: self.resize(item))
         menu.add_command(label="Rotate", command=lambda: self.rotate(item))
+        menu.add_command(label="Save as Preset...", command=lambda: self.save_preset(item))
         menu.add_command(label="Delete", command=lambda: self.delete_item(item))
         menu.post(event.x_root, event.y_root)
 
     def resize(self, item):
-        new_width = simpledialog.askinteger("Resize", "Enter new width (px):", initialvalue=item["width"])
+        # Width in pixels at 100% zoom
+        current_width = round(item["width_pt"] * BASE_SCALE)
+        new_width = simpledialog.askinteger("Resize", "Enter new width (px):", initialvalue=current_width)
         if new_width:
-            ratio = new_width / item["width"]
-            item["width"] = new_width
-            item["height"] = int(item["height"] * ratio)
-            self.render_pdf()
+            ratio = new_width / current_width
+            item["width_pt"] = new_width / BASE_SCALE
+            item["height_pt"] = item["height_pt"] * ratio
+            self.place_on_canvas(item)
 
     def rotate(self, item):
         item["rotation"] = (item["rotation"] + 45) % 360
-        self.render_pdf()
+        self.place_on_canvas(item)
 
     def delete_item(self, item):
         if item in self.signature_items:
             self.signature_items.remove(item)
-        self.render_pdf()
+        if item.get("id"):
+            self.canvas.delete(item["id"])
+            item["id"] = None
 
     def delete_selected(self, event=None):
         if self.selected_item:
             self.delete_item(self.selected_item)
             self.selected_item = None
 
-    def save_pdf(self):
+    def save_pdf(self, incremental=False):
+        """
+        Stamps the overlays into the PDF. With incremental=True the changes are
+        appended to the open file itself instead of writing a new copy.
+        """
         if not self.pdf_path:
             messagebox.showerror("Error", "Please open a PDF file first.")
             return
 
         doc = fitz.open(self.pdf_path)
-        page = doc[0]
-
-        # PDF size in points (72 DPI)
-        pdf_width_pt = page.rect.width
-        pdf_height_pt = page.rect.height
 
-        # Canvas/rendered image size in pixels (after zoom)
-        canvas_width = self.pdf_img.width
-        canvas_height = self.pdf_img.height
-
-        # Scale factors: canvas px → PDF points
-        scale_x = pdf_width_pt / canvas_width
-        scale_y = pdf_height_pt / canvas_height
+        # Each distinct image is embedded once, from memory, at print resolution.
+        embedder = OverlayEmbedder(doc)
 
         # ✅ If there are any signature/stamp items, add them — else skip silently
-        for item in getattr(self, "signature_items", []):
+        for item in self.signature_items:
             try:
-                rotated_img = item["image"].rotate(item["rotation"], expand=True)
-
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".png") as temp_file:
-                    temp_path = temp_file.name
-                    rotated_img.save(temp_path, format="PNG")
-
-                # Get canvas coordinates in pixels
-                x_canvas = item["canvas_x_px"]
-                y_canvas = item["canvas_y_px"]
-
-                # Get width & height on canvas (in pixels), accounting for zoom
-                w = item["width"] * self.zoom_factor
-                h = item["height"] * self.zoom_factor
-
-                # Convert to PDF points
-                x_pt = x_canvas * scale_x
-                y_pt = y_canvas * scale_y
-                w_pt = w * scale_x
-                h_pt = h * scale_y
-
-                rect = fitz.Rect(x_pt, y_pt, x_pt + w_pt, y_pt + h_pt)
-                page.insert_image(rect, filename=temp_path)
-
-                os.unlink(temp_path)
+                # Placements are already in PDF points on their own page.
+                rect = fitz.Rect(
+                    item["x_pt"], item["y_pt"],
+                    item["x_pt"] + item["width_pt"], item["y_pt"] + item["height_pt"]
+                )
+                embedder.place(doc[item["page"]], rect, item["image"], item["rotation"], image_key=item["image_key"])
 
             except Exception:
                 pass  # Silently skip any image errors
 
-        # ✅ Always allow saving, even if no images were added
-        save_path = filedialog.asksaveasfilename(
-            defaultextension=".pdf",
-            filetypes=[("PDF files", "*.pdf")],
-            title="Save PDF As"
-        )
+        if incremental:
+            save_path = self.pdf_path
+        else:
+            # ✅ Always allow saving, even if no images were added
+            save_path = filedialog.asksaveasfilename(
+                defaultextension=".pdf",
+                filetypes=[("PDF files", "*.pdf")],
+                title="Save PDF As"
+            )
+
+        same_file = False
+        try:
+            if save_path:
+                # PyMuPDF can only write over the file it opened by appending to it.
+                same_file = os.path.exists(save_path) and os.path.samefile(save_path, self.pdf_path)
+                save_document(doc, save_path, incremental=incremental or same_file)
+        finally:
+            doc.close()
 
+        if same_file:
+            # The overlays are part of the page now; show it and don't stamp them twice.
+            for item in list(self.signature_items):
+                self.delete_item(item)
+            self.load_pdf(self.pdf_path)
         if save_path:
-            doc.save(save_path)
-            doc.close()
             messagebox.showinfo("Success", f"PDF saved to:\n{save_path}")
@@ -0,0 +1,377 @@
+import hashlib
+import io
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple, Union
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from utils import resource_path
+
+# Signatures and stamps are printed, so there is no point embedding more pixels than this.
+PRINT_DPI = 300
+PRESETS_FILE = "stamp_presets.json"
+# Written to the PDF keywords so a second run doesn't stamp a document twice.
+_STAMPED_MARK = "stamped:"
+
+
+def overlay_png(image: Image.Image, rotation: int, max_size: Tuple[int, int]) -> bytes:
+    """Rotates an overlay, downsamples it to fit max_size pixels (never upsamples) and encodes it as PNG."""
+    img = image.rotate(rotation, expand=True) if rotation else image.copy()
+    img.thumbnail(max_size, Image.LANCZOS)
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class OverlayEmbedder:
+    """
+    Places signature/stamp images on the pages of an open PyMuPDF document.
+    Images go in from memory, downsampled to the placed size at print DPI,
+    and each distinct image is embedded once: repeated placements reuse its
+    xref, so the same stamp on every page costs one copy in the file.
+    """
+    def __init__(self, doc: fitz.Document, dpi: int = PRINT_DPI):
+        self.doc = doc
+        self.dpi = dpi
+        self._by_key: Dict[Hashable, int] = {}
+        self._by_digest: Dict[bytes, int] = {}
+        self.embedded = 0
+        self.reused = 0
+
+    def _pixel_size(self, rect: fitz.Rect) -> Tuple[int, int]:
+        return (
+            max(1, round(rect.width / 72 * self.dpi)),
+            max(1, round(rect.height / 72 * self.dpi)),
+        )
+
+    def place(
+        self,
+        page: fitz.Page,
+        rect: fitz.Rect,
+        image: Image.Image,
+        rotation: int = 0,
+        image_key: Optional[Hashable] = None
+    ) -> int:
+        """
+        Draws image (rotated by rotation degrees) inside rect on page and
+        returns its xref. image_key identifies the source image; without it
+        the PIL object's identity is used.
+        """
+        size = self._pixel_size(rect)
+        key = (image_key if image_key is not None else id(image), rotation, size)
+        xref = self._by_key.get(key)
+        if xref is None:
+            png = overlay_png(image, rotation, size)
+            digest = hashlib.sha256(png).digest()
+            xref = self._by_digest.get(digest)
+            if xref is None:
+                xref = page.insert_image(rect, stream=png)
+                self._by_digest[digest] = xref
+                self._by_key[key] = xref
+                self.embedded += 1
+                return xref
+            self._by_key[key] = xref
+        page.insert_image(rect, xref=xref)
+        self.reused += 1
+        return xref
+
+
+def save_document(doc: fitz.Document, path: Optional[str] = None, incremental: bool = False) -> None:
+    """
+    Saves a stamped document. incremental appends the changes to the file
+    the document was opened from, so the cost is the size of the change;
+    otherwise the whole file is written to path, dropping unused objects.
+    """
+    if incremental:
+        # deflate compresses the new image streams; existing objects are left untouched.
+        doc.save(doc.name, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP, deflate=True)
+    else:
+        doc.save(path, garbage=3, deflate=True)
+
+
+# ---------- PRESETS ----------
+def normalize_preset(preset: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Checks a placement preset and fills in defaults. A preset has the overlay
+    image, the page (0-based, negative counts from the end, or "all"), the
+    top-left x/y and the width/height in PDF points, and a rotation. With an
+    "anchor" text, x/y are offsets from the top-left of the last match of that
+    text on the page, e.g. the "TOTAL" row.
+    """
+    try:
+        normalized = {
+            "image": str(preset["image"]),
+            "page": preset.get("page", 0),
+            "x": float(preset.get("x", 0)),
+            "y": float(preset.get("y", 0)),
+            "width": float(preset["width"]),
+            "height": float(preset["height"]),
+            "rotation": int(preset.get("rotation", 0)) % 360,
+            "anchor": preset.get("anchor") or None,
+        }
+    except KeyError as e:
+        raise ValueError(f"Preset is missing {e.args[0]!r}")
+    except (TypeError, ValueError):
+        raise ValueError("Preset position, size and rotation must be numbers")
+    if normalized["page"] != "all":
+        try:
+            normalized["page"] = int(normalized["page"])
+        except (TypeError, ValueError):
+            raise ValueError('Preset page must be a page number or "all"')
+    if normalized["width"] <= 0 or normalized["height"] <= 0:
+        raise ValueError("Preset width and height must be positive")
+    return normalized
+
+
+class PresetStore:
+    """
+    Named overlay placements per company, kept in stamp_presets.json next to
+    config.json as {company: {name: preset}}.
+    """
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.path = Path(path) if path else Path(resource_path(PRESETS_FILE))
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (json.JSONDecodeError, IOError):
+            raise ValueError(f"Error reading {self.path.name}")
+
+    def _write(self, presets: Dict[str, Dict[str, Dict[str, Any]]]) -> None:
+        temp_path = self.path.with_suffix(".tmp")
+        with open(temp_path, "w") as f:
+            json.dump(presets, f, indent=4)
+        os.replace(temp_path, self.path)
+
+    def presets(self, company: str) -> Dict[str, Dict[str, Any]]:
+        """Returns a company's presets by name."""
+        return self._read().get(company, {})
+
+    def get(self, company: str, name: str) -> Dict[str, Any]:
+        """Returns one preset, with its name, ready to pass to stamp_file()."""
+        preset = self.presets(company).get(name)
+        if preset is None:
+            raise ValueError(f"No stamp preset {name!r} for {company}")
+        return dict(normalize_preset(preset), name=name)
+
+    def save(self, company: str, name: str, preset: Dict[str, Any]) -> None:
+        """Adds or replaces a preset."""
+        preset = normalize_preset(preset)
+        with self._lock:
+            presets = self._read()
+            presets.setdefault(company, {})[name] = preset
+            self._write(presets)
+
+    def delete(self, company: str, name: str) -> bool:
+        """Removes a preset. Returns False if there was none."""
+        with self._lock:
+            presets = self._read()
+            if name not in presets.get(company, {}):
+                return False
+            del presets[company][name]
+            if not presets[company]:
+                del presets[company]
+            self._write(presets)
+            return True
+
+
+def preset_rects(doc: fitz.Document, preset: Dict[str, Any]) -> List[Tuple[int, fitz.Rect]]:
+    """Returns the (page index, rect) places a preset puts its image on in doc."""
+    if preset["page"] == "all":
+        pages = range(doc.page_count)
+    else:
+        if not -doc.page_count <= preset["page"] < doc.page_count:
+            raise ValueError(f"Preset page {preset['page']} is outside a {doc.page_count}-page document")
+        pages = [preset["page"] % doc.page_count]
+
+    places = []
+    for page_index in pages:
+        origin = fitz.Point(0, 0)
+        if preset["anchor"]:
+            matches = doc[page_index].search_for(preset["anchor"])
+            if not matches:
+                continue
+            origin = matches[-1].top_left
+        x, y = origin.x + preset["x"], origin.y + preset["y"]
+        places.append((page_index, fitz.Rect(x, y, x + preset["width"], y + preset["height"])))
+    if not places:
+        raise ValueError(f"Anchor text {preset['anchor']!r} not found")
+    return places
+
+
+@lru_cache(maxsize=16)
+def load_overlay(path: str) -> Image.Image:
+    """Opens a preset's image as RGBA; relative paths are from the project folder."""
+    if not os.path.isabs(path):
+        path = resource_path(path)
+    with Image.open(path) as img:
+        return img.convert("RGBA")
+
+
+def _stamped_presets(doc: fitz.Document) -> List[str]:
+    keywords = (doc.metadata or {}).get("keywords") or ""
+    return [word[len(_STAMPED_MARK):] for word in keywords.split(";") if word.startswith(_STAMPED_MARK)]
+
+
+def stamp_file(
+    path: Union[str, Path],
+    presets: List[Dict[str, Any]],
+    output_path: Optional[Union[str, Path]] = None,
+    force: bool = False
+) -> str:
+    """
+    Places the presets' images on a PDF, saving in place (incrementally) or to
+    output_path. Presets already recorded as stamped on the file are skipped
+    unless force is set. Returns "stamped" or "skipped"; a skipped file is
+    still copied, unchanged, to output_path.
+    """
+    doc = fitz.open(path)
+    try:
+        done = _stamped_presets(doc)
+        pending = [preset for preset in presets if force or preset.get("name") not in done]
+        if not pending:
+            if output_path and Path(output_path).resolve() != Path(path).resolve():
+                # The output folder should hold every document, not just the newly stamped ones.
+                shutil.copyfile(path, output_path)
+            return "skipped"
+
+        embedder = OverlayEmbedder(doc)
+        for preset in pending:
+            image = load_overlay(preset["image"])
+            for page_index, rect in preset_rects(doc, preset):
+                embedder.place(doc[page_index], rect, image, preset["rotation"], image_key=preset["image"])
+
+        names = [preset["name"] for preset in pending if preset.get("name") and preset["name"] not in done]
+        if names:
+            metadata = dict(doc.metadata)
+            keywords = [word for word in (metadata.get("keywords") or "").split(";") if word]
+            metadata["keywords"] = ";".join(keywords + [_STAMPED_MARK + name for name in names])
+            doc.set_metadata(metadata)
+
+        if output_path:
+            save_document(doc, str(output_path))
+        elif doc.is_repaired:
+            # A repaired file can't take an incremental update; rewrite it whole.
+            temp_path = f"{path}.tmp"
+            save_document(doc, temp_path)
+            doc.close()
+            os.replace(temp_path, path)
+        else:
+            save_document(doc, incremental=True)
+    finally:
+        if not doc.is_closed:
+            doc.close()
+    return "stamped"
+
+
+# ---------- BATCH STAMPING ----------
+def collect_pdfs(paths: Iterable[Union[str, Path]], company: Optional[str] = None) -> Tuple[List[Tuple[Path, Path]], int]:
+    """
+    Expands files and directories (recursively) into (pdf, path relative to
+    its argument) pairs. With company, PDFs whose sidecar names another company
+    are left out. Returns the pairs and the number left out.
+    """
+    found, ignored = [], 0
+    for root in map(Path, paths):
+        if root.is_dir():
+            candidates = sorted((pdf, pdf.relative_to(root)) for pdf in root.rglob("*.pdf"))
+        elif root.is_file():
+            candidates = [(root, Path(root.name))]
+        else:
+            raise FileNotFoundError(f"No such file or folder: {root}")
+        for pdf, relative in candidates:
+            if company and _sidecar_company(pdf) not in (None, company):
+                ignored += 1
+                continue
+            found.append((pdf, relative))
+    return found, ignored
+
+
+def _sidecar_company(pdf: Path) -> Optional[str]:
+    try:
+        with open(pdf.with_suffix(".json"), "r") as f:
+            payload = json.load(f)
+    except (IOError, json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    if not isinstance(payload, dict) or payload.get("bundle"):
+        return None
+    return payload.get("company")
+
+
+def stamp_files(
+    paths: Iterable[Union[str, Path]],
+    presets: List[Dict[str, Any]],
+    company: Optional[str] = None,
+    output_dir: Optional[Union[str, Path]] = None,
+    workers: Optional[int] = None,
+    force: bool = False,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Stamps every PDF under paths with presets, in a process pool when there is
+    more than one worker and file. Files are stamped in place unless output_dir
+    is given, where they keep their layout relative to the folder argument.
+    progress(report) is called after each file. Returns the report.
+    """
+    started = time.perf_counter()
+    files, ignored = collect_pdfs(paths, company)
+    report: Dict[str, Any] = {
+        "total": len(files), "processed": 0, "stamped": 0, "skipped": 0,
+        "ignored": ignored, "failed": 0, "errors": {},
+        "elapsed_seconds": 0.0, "docs_per_second": 0.0,
+    }
+
+    jobs = []
+    for pdf, relative in files:
+        output_path = None
+        if output_dir:
+            output_path = Path(output_dir) / relative
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+        jobs.append((str(pdf), str(output_path) if output_path else None))
+
+    def done(pdf: str, status: Optional[str], error: Optional[str] = None) -> None:
+        report["processed"] += 1
+        if error is None:
+            report[status] += 1
+        else:
+            report["failed"] += 1
+            report["errors"][pdf] = error
+        elapsed = time.perf_counter() - started
+        report["elapsed_seconds"] = round(elapsed, 3)
+        report["docs_per_second"] = round(report["processed"] / elapsed, 1) if elapsed else 0.0
+        if progress is not None:
+            progress(report)
+
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        for pdf, output_path in jobs:
+            try:
+                done(pdf, stamp_file(pdf, presets, output_path, force))
+            except Exception as e:
+                done(pdf, None, str(e) or type(e).__name__)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(stamp_file, pdf, presets, output_path, force): pdf
+                for pdf, output_path in jobs
+            }
+            for future in as_completed(futures):
+                try:
+                    done(futures[future], future.result())
+                except Exception as e:
+                    done(futures[future], None, str(e) or type(e).__name__)
+
+    report["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    return report
@@ -0,0 +1,45 @@
+import os
+import sys
+import time
+from collections import Counter
+from typing import List, Optional, Tuple
+
+
+class StartupProfile:
+    """
+    Records how long each startup phase takes and which packages it imported.
+    The report is printed when the app runs with --startup-report or with the
+    INVOICEGEN_STARTUP_REPORT environment variable set.
+    """
+    def __init__(self, started: Optional[float] = None, baseline_modules: Optional[set] = None):
+        self._last = started if started is not None else time.perf_counter()
+        self._started = self._last
+        self._seen_modules = set(baseline_modules) if baseline_modules is not None else set(sys.modules)
+        self.phases: List[Tuple[str, float, List[Tuple[str, int]]]] = []
+        self.enabled = "--startup-report" in sys.argv or bool(os.environ.get("INVOICEGEN_STARTUP_REPORT"))
+
+    def mark(self, phase: str) -> None:
+        """Closes the current phase under the given name."""
+        now = time.perf_counter()
+        new_modules = set(sys.modules) - self._seen_modules
+        self._seen_modules.update(new_modules)
+        packages = Counter(name.split(".")[0] for name in new_modules)
+        self.phases.append((phase, now - self._last, packages.most_common(4)))
+        self._last = now
+
+    def report(self) -> str:
+        """Formats the phases like `python -X importtime`: self and cumulative time per phase."""
+        lines = ["startup phase:   self [ms] | cumulative | phase (top new packages)"]
+        cumulative = 0.0
+        for phase, elapsed, packages in self.phases:
+            cumulative += elapsed
+            detail = ", ".join(f"{name}({count})" for name, count in packages)
+            lines.append(
+                f"startup phase: {elapsed * 1000:11.1f} | {cumulative * 1000:10.1f} | {phase}"
+                + (f" ({detail})" if detail else "")
+            )
+        return "\n".join(lines)
+
+    def print_report(self) -> None:
+        if self.enabled:
+            print(self.report(), file=sys.stderr)
@@ -0,0 +1,252 @@
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from line_items import LineItem
+
+if TYPE_CHECKING:
+    from fpdf import FPDF
+
+Font = Tuple[str, str, float]  # family, style, size
+
+
+class Column(NamedTuple):
+    header: str
+    width: float
+    align: str = "C"
+    font: Font = ("Arial", "", 11)
+
+
+class TableLayout:
+    """
+    Draws a table whose rows can run over several pages. Each cell is split
+    into lines once and drawn line by line, rows only break at row boundaries
+    (unless a row is taller than a whole page, when it is continued over as
+    many pages as it needs), the header is repeated on every page, and with
+    format_carry the running subtotal of the row amounts (in paisa) is
+    carried to the next page. Rows have no rules between them; the column
+    lines are drawn once per page.
+    """
+    def __init__(
+        self,
+        pdf: 'FPDF',
+        columns: Sequence[Column],
+        x: float = 10,
+        line_height: float = 5,
+        min_row_height: float = 15,
+        padding_top: float = 2,
+        header_height: float = 8,
+        header_font: Font = ("Arial", "B", 9),
+        carry_height: float = 8,
+        format_carry: Optional[Callable[[int], str]] = None
+    ):
+        self.pdf = pdf
+        self.columns = list(columns)
+        self.x = x
+        self.line_height = line_height
+        self.min_row_height = min_row_height
+        self.padding_top = padding_top
+        self.header_height = header_height
+        self.header_font = header_font
+        self.carry_height = carry_height if format_carry else 0
+        self.format_carry = format_carry
+        self.width = sum(column.width for column in self.columns)
+        self.subtotal = 0
+        self.pages = 0
+        self._segment_top = 0.0
+        self._page_top: Optional[float] = None  # Where rows start on a continuation page
+        self._auto_page_break: Optional[Tuple[bool, float]] = None
+
+    # ---------- DRAWING PRIMITIVES ----------
+    def _set_font(self, font: Font) -> None:
+        self.pdf.set_font(font[0], font[1], font[2])
+
+    def _rules(self, bottom: float) -> None:
+        """Draws the column lines of the current page's part of the table, and its bottom line."""
+        x = self.x
+        for column in self.columns:
+            self.pdf.line(x, self._segment_top, x, bottom)
+            x += column.width
+        self.pdf.line(x, self._segment_top, x, bottom)
+        self.pdf.line(self.x, bottom, self.x + self.width, bottom)
+
+    def _header(self) -> None:
+        self._set_font(self.header_font)
+        self.pdf.set_fill_color(240, 240, 240)
+        self.pdf.set_x(self.x)
+        for column in self.columns:
+            self.pdf.cell(column.width, self.header_height, column.header, 1, 0, align='C', fill=True)
+        self.pdf.ln()
+        self._segment_top = self.pdf.get_y()
+
+    def _carry_row(self, label: str) -> None:
+        label_width = self.width - self.columns[-1].width
+        self._set_font(("Arial", "B", 10))
+        self.pdf.set_x(self.x)
+        self.pdf.cell(label_width, self.carry_height, label, 1, 0, align='R')
+        self.pdf.cell(self.columns[-1].width, self.carry_height, self.format_carry(self.subtotal), 1, 1, align='C')
+
+    def _break_page(self) -> None:
+        self._rules(self.pdf.get_y())
+        if self.format_carry:
+            self._carry_row("Carried forward")
+        self.pdf.add_page()
+        self.pages += 1
+        self._header()
+        if self.format_carry:
+            self._carry_row("Brought forward")
+            self._segment_top = self.pdf.get_y()
+        self._page_top = self.pdf.get_y()
+
+    def _page_room(self) -> float:
+        """The height rows get on a page of their own, between the header and the carry row."""
+        page_top = self._page_top
+        if page_top is None:
+            page_top = self.pdf.t_margin + self.header_height + self.carry_height
+        return self.pdf.page_break_trigger - self.carry_height - page_top
+
+    def _ensure_room(self, height: float) -> None:
+        room_needed = height + self.carry_height
+        page_top = self.pdf.t_margin + self.header_height + self.carry_height
+        if self.pdf.get_y() + room_needed > self.pdf.page_break_trigger \
+                and self.pdf.get_y() > page_top + 0.01:
+            self._break_page()
+
+    # ---------- PUBLIC API ----------
+    def begin(self) -> None:
+        """Draws the header at the current position. Page breaks are the table's until end()."""
+        self._auto_page_break = (self.pdf.auto_page_break, self.pdf.b_margin)
+        self.pdf.set_auto_page_break(False, margin=self.pdf.b_margin)
+        self.pages = 1
+        self._ensure_room(self.header_height + self.min_row_height)
+        self._header()
+
+    def measure(
+        self,
+        cells: Sequence[str],
+        fonts: Optional[Sequence[Optional[Font]]] = None,
+        padding_top: Optional[float] = None,
+        min_height: Optional[float] = None
+    ) -> Tuple[List[List[str]], float]:
+        """Splits each cell into lines for its column. Returns the lines and the row height."""
+        padding_top = self.padding_top if padding_top is None else padding_top
+        min_height = self.min_row_height if min_height is None else min_height
+        lines = []
+        for index, (column, text) in enumerate(zip(self.columns, cells)):
+            self._set_font((fonts[index] if fonts and fonts[index] else None) or column.font)
+            lines.append(self._split(column.width, str(text or "")))
+        tallest = max((len(cell_lines) for cell_lines in lines), default=0)
+        return lines, max(padding_top + tallest * self.line_height, min_height)
+
+    def _split(self, width: float, text: str) -> List[str]:
+        """Breaks text into lines exactly as multi_cell would, in the current font."""
+        if not text:
+            return []
+        # Most cells are one short line; only hand the rest to fpdf's line breaker.
+        if "\n" not in text and self.pdf.get_string_width(text) <= width - 2 * self.pdf.c_margin:
+            return [text]
+        return self.pdf.multi_cell(width, self.line_height, text, dry_run=True, output="LINES")
+
+    def add_row(
+        self,
+        cells: Sequence[str],
+        amount: Optional[int] = None,
+        fonts: Optional[Sequence[Optional[Font]]] = None,
+        padding_top: Optional[float] = None,
+        min_height: Optional[float] = None
+    ) -> None:
+        """
+        Adds a row, moving it whole to the next page if it doesn't fit. fonts
+        overrides the column fonts per cell; amount, in paisa, adds to the subtotal.
+        """
+        lines, height = self.measure(cells, fonts, padding_top, min_height)
+        padding_top = self.padding_top if padding_top is None else padding_top
+        if height > self._page_room():
+            self._add_split_row(lines, fonts, padding_top)
+        else:
+            self._ensure_room(height)
+            y = self.pdf.get_y()
+            self._draw_lines(lines, fonts, 0, None, y + padding_top)
+            self.pdf.set_y(y + height)
+        if amount is not None:
+            self.subtotal += amount
+
+    def _draw_lines(
+        self,
+        lines: List[List[str]],
+        fonts: Optional[Sequence[Optional[Font]]],
+        start: int,
+        stop: Optional[int],
+        text_top: float
+    ) -> None:
+        """Draws lines start to stop of every cell of a row, the first of them at text_top."""
+        x = self.x
+        for index, (column, cell_lines) in enumerate(zip(self.columns, lines)):
+            part = cell_lines[start:stop]
+            if part:
+                self._set_font((fonts[index] if fonts and fonts[index] else None) or column.font)
+                for line_no, line in enumerate(part):
+                    self.pdf.set_xy(x, text_top + line_no * self.line_height)
+                    self.pdf.cell(column.width, self.line_height, line, 0, 0, align=column.align)
+            x += column.width
+
+    def _add_split_row(
+        self,
+        lines: List[List[str]],
+        fonts: Optional[Sequence[Optional[Font]]],
+        padding_top: float
+    ) -> None:
+        """Draws a row taller than a page as many lines at a time as fit, breaking pages in between."""
+        total = max(len(cell_lines) for cell_lines in lines)
+        start = 0
+        while start < total:
+            y = self.pdf.get_y()
+            fit = int((self.pdf.page_break_trigger - self.carry_height - y - padding_top) / self.line_height + 1e-6)
+            if fit <= 0:
+                if y > (self._page_top or 0) + 0.01:
+                    self._break_page()
+                    continue
+                fit = 1  # Not even one line fits an empty page; draw it anyway rather than loop
+            stop = min(start + fit, total)
+            self._draw_lines(lines, fonts, start, stop, y + padding_top)
+            self.pdf.set_y(y + padding_top + (stop - start) * self.line_height)
+            start = stop
+            if start < total:
+                self._break_page()
+
+    def add_blank_rows(self, count: int) -> None:
+        """Adds empty rows of the minimum height, so short tables keep their size."""
+        for _ in range(count):
+            self._ensure_room(self.min_row_height)
+            self.pdf.set_y(self.pdf.get_y() + self.min_row_height)
+
+    def end(self) -> None:
+        """Closes the table and hands page breaks back to fpdf."""
+        self._rules(self.pdf.get_y())
+        if self._auto_page_break is not None:
+            self.pdf.set_auto_page_break(*self._auto_page_break)
+            self._auto_page_break = None
+
+
+# ---------- MEDIA PLAN LINE ITEMS ----------
+# The line-item table shared by the invoice templates.
+LINE_ITEM_COLUMNS = [
+    Column("Sr.", 10),
+    Column("Description", 90, align="L"),
+    Column("Size", 20),
+    Column("Duration", 25),
+    Column("Amount", 35, font=("Arial", "B", 11)),
+]
+# Tables shorter than this are padded with empty rows.
+MIN_LINE_ITEM_ROWS = 6
+
+
+def line_item_row(index: int, item: LineItem) -> Tuple[List[str], int]:
+    """Returns a line item's cells and its amount in paisa (0 if it isn't a number)."""
+    full_desc = item.description
+    if item.start_text or item.end_text:
+        full_desc += "\n\n"
+    if item.start_text:
+        full_desc += f"Campaign Start: {item.start_text}"
+    if item.end_text:
+        full_desc += f"\nCampaign End: {item.end_text}"
+    cells = [str(index), full_desc, item.size, item.duration, f"Rs. {item.amount_text}/-"]
+    return cells, item.amount or 0
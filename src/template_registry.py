@@ -0,0 +1,142 @@
+import importlib
+import importlib.util
+import json
+import sys
+import threading
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, Any, List, Optional, Union
+
+from utils import resource_path
+from templates.base_template import BaseTemplate
+
+MANIFEST_NAME = "manifest.json"
+
+
+def write_manifest(directory: Union[str, Path]) -> List[str]:
+    """
+    Scans a templates directory once and writes its manifest.json, listing
+    the template modules to load. Returns the module names.
+    """
+    directory = Path(directory)
+    modules = _scan_modules(directory)
+    with open(directory / MANIFEST_NAME, "w") as f:
+        json.dump({"modules": modules}, f, indent=4)
+    return modules
+
+
+def _scan_modules(directory: Path) -> List[str]:
+    return sorted(
+        path.stem for path in directory.glob("*.py")
+        if path.name not in ("__init__.py", "base_template.py")
+    )
+
+
+def _read_manifest(directory: Path) -> List[str]:
+    manifest_path = directory / MANIFEST_NAME
+    if not manifest_path.exists():
+        # First use of a user directory: scan it once and remember the result.
+        try:
+            return write_manifest(directory)
+        except OSError as e:
+            print(f"Could not write the template manifest in {directory}: {e}")
+            return _scan_modules(directory)  # Read-only directory: scan it every time instead
+    with open(manifest_path, "r") as f:
+        return json.load(f).get("modules", [])
+
+
+class TemplateRegistry:
+    """
+    Single place where document templates are discovered and cached.
+    Built-in templates are listed in src/templates/manifest.json, which is
+    bundled with the PyInstaller build, so startup never scans a directory.
+    Each template is instantiated once and its get_template() schema is
+    cached alongside it.
+    """
+    def __init__(self):
+        self._templates: Dict[str, BaseTemplate] = {}
+        self._schemas: Dict[str, Dict[str, Any]] = {}
+        self._directories = set()
+        self._lock = threading.Lock()
+
+    def load_builtin(self) -> None:
+        """Loads the templates shipped with the app, as listed in their manifest."""
+        # Ensure the src directory is importable so `templates.*` resolves
+        src_dir = str(Path(__file__).parent)
+        if src_dir not in sys.path:
+            sys.path.insert(0, src_dir)
+
+        for module_name in _read_manifest(Path(resource_path("src/templates"))):
+            try:
+                self.register_module(importlib.import_module(f"templates.{module_name}"))
+            except (ImportError, AttributeError) as e:
+                print(f"Error loading template {module_name}: {e}")
+
+    def register_directory(self, directory: Union[str, Path]) -> None:
+        """
+        Registers extra templates from a user directory, using its manifest.json
+        (written on first use; rewrite it with `invoicegen templates --write-manifest`
+        after adding a module). Modules there should import the base class as
+        `from templates.base_template import BaseTemplate`.
+        """
+        directory = Path(directory).resolve()
+        if not directory.is_dir():
+            print(f"Skipping template directory {directory}: not a directory")
+            return
+        with self._lock:
+            if directory in self._directories:
+                return
+            self._directories.add(directory)
+
+        try:
+            module_names = _read_manifest(directory)
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"Skipping template directory {directory}: could not read its manifest: {e}")
+            return
+        for module_name in module_names:
+            try:
+                spec = importlib.util.spec_from_file_location(
+                    f"user_templates.{module_name}", directory / f"{module_name}.py"
+                )
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                self.register_module(module)
+            except (ImportError, AttributeError, OSError) as e:
+                print(f"Error loading template {module_name} from {directory}: {e}")
+
+    def register_module(self, module: ModuleType) -> BaseTemplate:
+        """Registers the template a module exposes through get_template_class()."""
+        template = module.get_template_class()
+        schema = template.get_template()
+        schema["template_class"] = template  # Attach the class instance
+        with self._lock:
+            self._templates[schema["type"]] = template
+            self._schemas[schema["type"]] = schema
+        return template
+
+    def get(self, doc_type: str) -> Optional[BaseTemplate]:
+        """Returns the shared template instance for a document type."""
+        return self._templates.get(doc_type)
+
+    def schema(self, doc_type: str) -> Optional[Dict[str, Any]]:
+        """Returns the cached get_template() dict for a document type."""
+        return self._schemas.get(doc_type)
+
+    def schemas(self) -> Dict[str, Dict[str, Any]]:
+        """Returns all cached schemas, keyed by document type."""
+        return dict(self._schemas)
+
+
+_registry: Optional[TemplateRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_template_registry() -> TemplateRegistry:
+    """Returns the process-wide registry, loading the built-in templates on first use."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            registry = TemplateRegistry()
+            registry.load_builtin()
+            _registry = registry
+        return _registry
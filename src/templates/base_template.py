@@ -1,10 +1,17 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
+
+from validation import SchemaValidator, ValidationResult
 
 
 class BaseTemplate(ABC):
     """Abstract base class for all document templates."""
-    
+
+    # Form fields that must be filled in; the rest of the rules come from get_template().
+    required_fields: Tuple[str, ...] = ()
+    # Whether generate_pdf_content() prints today's date, so renders from different days differ.
+    prints_render_date: bool = False
+
     @property
     @abstractmethod
     def template_type(self) -> str:
@@ -16,10 +23,17 @@ class BaseTemplate(ABC):
         """Return the template configuration dictionary."""
         pass
     
-    @abstractmethod
-    def validate_data(self, data: Dict[str, Any]) -> bool:
+    @property
+    def validator(self) -> SchemaValidator:
+        """The template's rules, compiled on first use and kept."""
+        validator = self.__dict__.get("_validator")
+        if validator is None:
+            validator = self._validator = SchemaValidator(self.get_template(), self.required_fields)
+        return validator
+
+    def validate_data(self, data: Dict[str, Any]) -> ValidationResult:
         """Validate the input data for this template."""
-        pass
+        return self.validator.validate(data)
     
     @abstractmethod
     def generate_pdf_content(self, pdf_generator: 'PDFGenerator', data: Dict[str, Any]) -> None:
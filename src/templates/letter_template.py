@@ -1,9 +1,13 @@
-from fpdf import FPDF
 from .base_template import BaseTemplate
-from typing import Dict, Any
+from typing import Dict, Any, TYPE_CHECKING
 from datetime import datetime
 
+if TYPE_CHECKING:
+    from fpdf import FPDF
+
 class LetterTemplate(BaseTemplate):
+    required_fields = ("Designation", "Company Name", "Subject", "content", "Signatories (comma separated)")
+
     @property
     def template_type(self) -> str:
         return "Request Letter"
@@ -27,12 +31,7 @@ class LetterTemplate(BaseTemplate):
         }
 
 
-    def validate_data(self, data: Dict[str, Any]) -> bool:
-        required = ["Designation", "Company Name", "Subject", "content", "Signatories (comma separated)"]
-        return all(data.get(field) for field in required)
-
-
-    def generate_pdf_content(self, pdf: FPDF, data: Dict[str, Any]) -> None:
+    def generate_pdf_content(self, pdf: 'FPDF', data: Dict[str, Any]) -> None:
         pdf.set_left_margin(15)
         pdf.set_right_margin(15)
         
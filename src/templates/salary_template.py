@@ -1,12 +1,16 @@
-from fpdf import FPDF
 from .base_template import BaseTemplate
-from typing import Dict, Any
-from num2words import num2words
-import locale
+from typing import Dict, Any, TYPE_CHECKING
+from formatting import format_amount, number_to_words, to_paisa
 from datetime import datetime
 
+if TYPE_CHECKING:
+    from fpdf import FPDF
+
 
 class SalaryTemplate(BaseTemplate):
+    required_fields = ("Employee Name", "Employee No", "Designation", "Department", "CNIC", "Month")
+    prints_render_date = True
+
     @property
     def template_type(self) -> str:
         return "Salary Slip"
@@ -30,19 +34,7 @@ class SalaryTemplate(BaseTemplate):
             ]
         }
 
-    def validate_data(self, data: Dict[str, Any]) -> bool:
-        required_fields = ["Employee Name", "Employee No", "Designation", "Department", "CNIC", "Month"]
-        for field in required_fields:
-            if not data.get(field):
-                return False
-        return True
-
-    def generate_pdf_content(self, pdf: FPDF, data: Dict[str, Any]) -> None:
-        try:
-            locale.setlocale(locale.LC_ALL, '')
-        except:
-            pass
-
+    def generate_pdf_content(self, pdf: 'FPDF', data: Dict[str, Any]) -> None:
         # Date (top right, no border)
         pdf.set_font("Arial", '', 10)
         current_date = datetime.now().strftime("%d %B %Y")
@@ -85,27 +77,18 @@ class SalaryTemplate(BaseTemplate):
         pdf.cell(60, 8, "", 1, 1, 'C')
         
         
-        # Earnings Rows
+        # Earnings Rows, in paisa; the slip shows whole rupees
         total_earnings = 0
         pdf.set_font("Arial", '', 10)
 
-        def add_row(name, value):
-            nonlocal total_earnings
+        for name in ("Basic Salary", "Mobile Allowance", "Fuel Allowance"):
+            value = to_paisa(data.get(name) or 0)
             if value > 0:
                 pdf.cell(60, 8, name, "L", 0, 'L')  # Label in first column (left border only)
-                pdf.cell(60, 8, f"{int(value):,}", "R", 0, 'L')  # Amount in second column (right border only)
+                pdf.cell(60, 8, format_amount(value // 100, 0), "R", 0, 'L')  # Amount in second column (right border only)
                 pdf.cell(60, 8, "", "R", 1, 'L')  # Empty third column (right border only)
                 total_earnings += value
 
-        basic_salary = float(data.get("Basic Salary", "0").replace(",", "") or 0)
-        add_row("Basic Salary", basic_salary)
-
-        mobile_allowance = float(data.get("Mobile Allowance", "0").replace(",", "") or 0)
-        add_row("Mobile Allowance", mobile_allowance)
-
-        fuel_allowance = float(data.get("Fuel Allowance", "0").replace(",", "") or 0)
-        add_row("Fuel Allowance", fuel_allowance)
-
         # Add empty row for spacing
         pdf.cell(60, 6, "", "L", 0)
         pdf.cell(60, 6, "", "R", 0)
@@ -114,26 +97,23 @@ class SalaryTemplate(BaseTemplate):
         # Gross Salary
         pdf.set_font("Arial", 'B', 10)
         pdf.cell(60, 10, "Gross Salary", "LB", 0, 'L')  # Left and bottom border
-        pdf.cell(60, 10, f"{int(total_earnings):,}", "RB", 0, 'L')  # Right and bottom border
+        pdf.cell(60, 10, format_amount(total_earnings // 100, 0), "RB", 0, 'L')  # Right and bottom border
         pdf.cell(60, 10, "", "RB", 1, 'L')  # Right and bottom border
 
         # ⚡ Removed padding rows before Net Pay
 
         # Net Pay (same as Gross since no deductions)
-        net_pay = total_earnings
+        net_pay = total_earnings // 100
         pdf.set_font("Arial", 'B', 12)
 
         # NET PAY row (center aligned text)
         pdf.cell(120, 10, "NET PAY", 1, 0, 'C')  # ← 'C' for center align
-        pdf.cell(60, 10, f"{int(net_pay):,}", 1, 1, 'C')
+        pdf.cell(60, 10, format_amount(net_pay, 0), 1, 1, 'C')
         pdf.ln(8)
 
 
         # Amount in Words
-        try:
-            words = num2words(net_pay, lang='en').replace('and', '').title()
-        except:
-            words = f"{int(net_pay):,}"
+        words = number_to_words(net_pay, "international", use_and=False).title()
 
         pdf.set_font("Arial", 'IU', 10)
         pdf.cell(0, 8, f"Amount In Words: {words} Only", 0, 1, 'L')  # ← "0" means no border
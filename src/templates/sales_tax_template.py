@@ -1,12 +1,17 @@
-from fpdf import FPDF
 from .base_template import BaseTemplate
-from typing import Dict, Any, List
-from num2words import num2words
+from typing import Dict, Any, List, TYPE_CHECKING
 from datetime import datetime
-import locale
+from formatting import format_amount, format_money, amount_in_words, paisa_to_decimal
+from line_items import LineItems, apply_rate, gst_rate
+from table_layout import LINE_ITEM_COLUMNS, MIN_LINE_ITEM_ROWS, TableLayout, line_item_row
+
+if TYPE_CHECKING:
+    from fpdf import FPDF
 
 
 class SalesTaxTemplate(BaseTemplate):
+    required_fields = ("M/s", "Campaign", "Date", "Invoice No", "Invoice Month")
+
     @property
     def template_type(self) -> str:
         return "Sales Tax Invoice"
@@ -36,7 +41,12 @@ class SalesTaxTemplate(BaseTemplate):
                     "Size",
                     "Duration",
                     "Amount"
-                ]
+                ],
+                "types": {
+                    "Campaign Start Date": "date",
+                    "Campaign End Date": "date",
+                    "Amount": "number"
+                }
             },
             "footer": {
                 "total": True,
@@ -44,19 +54,7 @@ class SalesTaxTemplate(BaseTemplate):
             }
         }
 
-    def validate_data(self, data: Dict[str, Any]) -> bool:
-        required = ["M/s", "Campaign", "Date", "Invoice No", "line_items", "Invoice Month"]
-        for field in required:
-            if field not in data or not data[field]:
-                return False
-        if "line_items" not in data or not isinstance(data["line_items"], list):
-            return False
-        for item in data["line_items"]:
-            if not all(k in item for k in self.get_template()["line_items"]["columns"]):
-                return False
-        return True
-
-    def generate_pdf_content(self, pdf: FPDF, data: Dict[str, Any]) -> None:
+    def generate_pdf_content(self, pdf: 'FPDF', data: Dict[str, Any]) -> None:
         pdf.set_font("Arial", 'B', 16)
         title = (data.get("Custom Title (Optional)") or self.template_type).upper()
         pdf.cell(0, 10, title, 0, 1, 'C')
@@ -66,10 +64,10 @@ class SalesTaxTemplate(BaseTemplate):
         pdf.ln(5)
 
         self._add_header_fields(pdf, data)
-        grand_total = self._add_line_items(pdf, data)
+        grand_total = self._add_line_items(pdf, data, LineItems.from_form_data(data))
         self._add_totals_and_footer(pdf, grand_total)
 
-    def _add_header_fields(self, pdf: FPDF, data: Dict[str, Any]) -> None:
+    def _add_header_fields(self, pdf: 'FPDF', data: Dict[str, Any]) -> None:
         left_x, right_x = 10, 145
         line_height = 7
         y = pdf.get_y()
@@ -164,120 +162,39 @@ class SalesTaxTemplate(BaseTemplate):
         pdf.set_y(new_y)
         pdf.ln(5)
 
-    def _add_line_items(self, pdf: FPDF, data: Dict[str, Any]) -> float:
-        items = data["line_items"]
-        headers = ["Sr.", "Description", "Size", "Duration", "Amount"]
-        col_widths = [10, 90, 20, 25, 35]
-        start_x = 10
-        row_min_height = 15
-        top_padding = 2
-        subtotal = 0.0
-
+    def _add_line_items(self, pdf: 'FPDF', data: Dict[str, Any], items: LineItems) -> int:
+        """
+        Draws the line items and the GST row over as many pages as it takes
+        and returns the grand total in paisa.
+        """
         pdf.ln(5)
-        pdf.set_font("Arial", 'B', 9)
-        pdf.set_fill_color(240, 240, 240)
-        pdf.set_x(start_x)
-        for i, header in enumerate(headers):
-            pdf.cell(col_widths[i], 8, header, 1, 0, align='C', fill=True)
-        pdf.ln()
-
-        pdf.set_font("Arial", '', 11)
+        table = TableLayout(
+            pdf, LINE_ITEM_COLUMNS,
+            format_carry=lambda paisa: f"Rs. {format_amount(paisa_to_decimal(paisa))}/-"
+        )
+        table.begin()
         for idx, item in enumerate(items, 1):
-            description = item.get("Description", "").strip()
-            start = item.get("Campaign Start Date", "").strip()
-            end = item.get("Campaign End Date", "").strip()
-            full_desc = description
-            if start or end:
-                full_desc += "\n\n"
-            if start:
-                full_desc += f"Campaign Start: {start}"
-            if end:
-                full_desc += f"\nCampaign End: {end}"
-            y_start = pdf.get_y()
-            max_y = y_start
-            
-            try:
-                subtotal += float(item.get("Amount", "0").replace(",", ""))
-            except (ValueError, TypeError):
-                pass
-            
-            pdf.set_xy(start_x, y_start + top_padding)
-            pdf.multi_cell(col_widths[0], 5, str(idx), border=0, align='C')
-            max_y = max(max_y, pdf.get_y())
-
-            pdf.set_xy(start_x + col_widths[0], y_start + top_padding)
-            pdf.multi_cell(col_widths[1], 5, full_desc, border=0, align='L')
-            max_y = max(max_y, pdf.get_y())
-
-            pdf.set_xy(start_x + col_widths[0] + col_widths[1], y_start + top_padding)
-            pdf.multi_cell(col_widths[2], 5, item.get("Size", ""), border=0, align='C')
-            max_y = max(max_y, pdf.get_y())
-
-            pdf.set_xy(start_x + col_widths[0] + col_widths[1] + col_widths[2], y_start + top_padding)
-            pdf.multi_cell(col_widths[3], 5, item.get("Duration", ""), border=0, align='C')
-            max_y = max(max_y, pdf.get_y())
-
-            amount_val = f"Rs. {item.get('Amount', '')}/-"
-            pdf.set_font("Arial", 'B', 11)
-            pdf.set_xy(start_x + col_widths[0] + col_widths[1] + col_widths[2] + col_widths[3], y_start + top_padding)
-            pdf.multi_cell(col_widths[4], 5, amount_val, border=0, align='C')
-            max_y = max(max_y, pdf.get_y())
-
-            pdf.set_font("Arial", '', 11)
-            final_y = max(max_y, y_start + row_min_height)
-            current_x = start_x
-            for w in col_widths:
-                pdf.line(current_x, y_start, current_x, final_y)
-                current_x += w
-            pdf.line(current_x, y_start, current_x, final_y)
-            pdf.set_y(final_y)
-        
-        # Add GST Row
-        padding_top = 8   # upar ka space row ke andar
-        gst_rate = float(data.get("GST Percentage", 15))
-        gst_total = round(subtotal * gst_rate / 100, 2)
-        grand_total = subtotal + gst_total
-
-        
-        y_start = pdf.get_y()
-        pdf.set_y(y_start + padding_top)
-
-        pdf.set_x(start_x)
-        pdf.set_font("Arial", '', 11)
-        pdf.cell(col_widths[0], row_min_height, "", border=0, align='C')
-        pdf.set_font("Arial", 'B', 10)
-        pdf.cell(col_widths[1], row_min_height, f"GST  {gst_rate:.0f}%", border=0, align='L')
-        pdf.set_font("Arial", '', 11)
-        pdf.cell(sum(col_widths[2:4]), row_min_height, "", border=0, align='C')
-        pdf.set_font("Arial", 'B', 11)
-        pdf.cell(col_widths[4], row_min_height, f"Rs. {gst_total:,.2f}/=", border=0, align='C')
-        pdf.ln()
-        
-        # Draw lines for the new row
-        y_end_gst = pdf.get_y()
-        current_x = start_x
-        for w in col_widths:
-            pdf.line(current_x, y_start, current_x, y_end_gst)
-            current_x += w
-        pdf.line(current_x, y_start, current_x, y_end_gst)
-        
-        remaining_rows = max(0, 6 - len(items) - 1) # Adjust for the new row
-        for _ in range(remaining_rows):
-            y_start = pdf.get_y()
-            y_end = y_start + row_min_height
-            current_x = start_x
-            for w in col_widths:
-                pdf.line(current_x, y_start, current_x, y_end)
-                current_x += w
-            pdf.line(current_x, y_start, current_x, y_end)
-            pdf.set_y(y_end)
-
-        table_bottom_y = pdf.get_y()
-        pdf.line(start_x, table_bottom_y, start_x + sum(col_widths), table_bottom_y)
-        
-        return grand_total
-
-    def _add_totals_and_footer(self, pdf: FPDF, grand_total: float) -> None:
+            cells, amount = line_item_row(idx, item)
+            table.add_row(cells, amount)
+        subtotal = table.subtotal
+
+        # GST row: a 15mm line below an 8mm gap, its text centred in the line
+        rate = gst_rate(data)
+        gst_total = apply_rate(subtotal, rate)
+        table.add_row(
+            ["", f"GST  {rate:.0f}%", "", "", f"Rs. {format_amount(paisa_to_decimal(gst_total))}/="],
+            gst_total,
+            fonts=[None, ("Arial", "B", 10), None, None, None],
+            padding_top=13,
+            min_height=23
+        )
+
+        table.add_blank_rows(max(0, MIN_LINE_ITEM_ROWS - len(items) - 1))  # The GST row counts as one
+        table.end()
+        return subtotal + gst_total
+
+    def _add_totals_and_footer(self, pdf: 'FPDF', grand_total_paisa: int) -> None:
+        grand_total = paisa_to_decimal(grand_total_paisa)
         table_x = 10
         widths = [10, 90, 20, 25, 35] 
         label_width = sum(widths[:-1]) 
@@ -287,16 +204,12 @@ class SalesTaxTemplate(BaseTemplate):
         pdf.set_font("Arial", 'B', 12)
         pdf.cell(label_width, 10, "TOTAL", border=1, align='C', fill=True)
         pdf.set_font("Arial", 'B', 12)
-        pdf.cell(amount_width, 10, f"Rs. {grand_total:,.2f}/-", border=1, align='R', fill=True)
+        pdf.cell(amount_width, 10, format_money(grand_total, "Rs."), border=1, align='R', fill=True)
         pdf.ln(15)
         
         # Amount in Words
         pdf.set_font("Arial", 'IU', 12)
-        try:
-            amount_words = num2words(int(round(grand_total)), lang='en_IN').capitalize()
-            words = f"Amount in words: {amount_words} rupees only"
-        except (ValueError, TypeError):
-            words = f"Amount in words: {grand_total} rupees only"
+        words = f"Amount in words: {amount_in_words(grand_total).capitalize()} only"
         pdf.set_x(10)
         pdf.multi_cell(0, 6, words, 0, 'L')
         
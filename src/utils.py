@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 import sys
 
@@ -38,10 +39,24 @@ def get_output_dir() -> Path:
     output_dir.mkdir(parents=True, exist_ok=True)
     return output_dir
 
-from PIL import Image
+def get_cache_dir() -> Path:
+    """
+    Gets the directory for caches that can be deleted at any time.
+    For an installed app, uses the user's local app data folder.
+    For development, uses a .cache folder in the project root.
+    """
+    if hasattr(sys, '_MEIPASS'):
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home() / ".cache")
+        cache_dir = base / "Invoice Genius" / "cache"
+    else:
+        cache_dir = Path(__file__).parent.parent / ".cache"
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
 
 def convert_png_to_ico(png_path: str, ico_path: str):
     """Converts a PNG image to an ICO file with multiple sizes."""
+    from PIL import Image
     try:
         img = Image.open(png_path)
         icon_sizes = [(16, 16), (32, 32), (48, 48), (64, 64), (128, 128), (256, 256)]
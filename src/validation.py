@@ -0,0 +1,150 @@
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from formatting import to_decimal
+from line_items import LineItems
+
+# Dates as the form writes them, and ISO dates from batch files.
+DATE_FORMATS = ("%d-%m-%Y", "%Y-%m-%d")
+
+
+class FieldError(NamedTuple):
+    """One problem with the form data. path is the field, e.g. 'line_items[2].Amount'."""
+    path: str
+    message: str
+
+
+class ValidationResult(NamedTuple):
+    """What every template's validate_data() returns. message is the first error's, for dialogs."""
+    valid: bool
+    message: str = ""
+    errors: Tuple[FieldError, ...] = ()
+
+    @classmethod
+    def from_errors(cls, errors: Sequence[FieldError]) -> 'ValidationResult':
+        if not errors:
+            return cls(True)
+        return cls(False, errors[0].message, tuple(errors))
+
+
+VALID = ValidationResult(True)
+
+
+def as_result(value: Any) -> ValidationResult:
+    """
+    Normalizes what a template's validate_data() returned: a ValidationResult,
+    or the bool or (bool, message) of templates written before it existed.
+    """
+    if isinstance(value, ValidationResult):
+        return value
+    if isinstance(value, tuple):
+        valid, message = value
+        return ValidationResult(bool(valid), message or "", () if valid else (FieldError("", message or ""),))
+    if value:
+        return VALID
+    message = "Please fill in all required fields."
+    return ValidationResult(False, message, (FieldError("", message),))
+
+
+# ---------- FIELD TYPES ----------
+# A checker returns an error message for a non-empty value, or None if it's fine.
+Checker = Callable[[Any], Optional[str]]
+
+
+def _check_date(value: Any) -> Optional[str]:
+    text = str(value).strip()
+    for pattern in DATE_FORMATS:
+        try:
+            datetime.strptime(text, pattern)
+            return None
+        except ValueError:
+            continue
+    return "is not a date (dd-mm-yyyy)"
+
+
+def _check_number(value: Any) -> Optional[str]:
+    try:
+        number = to_decimal(value)
+    except (ValueError, TypeError):
+        return "is not a number"
+    if not number.is_finite():  # 'nan' and 'inf' can't be totalled or taxed
+        return "is not a number"
+    return None
+
+
+FIELD_CHECKERS: Dict[str, Checker] = {
+    "date": _check_date,
+    "number": _check_number,
+}
+
+
+class SchemaValidator:
+    """
+    A template's rules, compiled once from its get_template() schema: which
+    fields must be filled in, which header fields, earnings and line-item
+    columns must parse as dates or numbers, and whether line items are
+    needed. validate() then walks the data once and reports every error.
+    """
+    def __init__(self, schema: Dict[str, Any], required_fields: Sequence[str] = ()):
+        self.doc_type = schema.get("type", "")
+        self.required = list(required_fields)
+        typed = [(field, f_type) for field, f_type in schema.get("header_fields", [])]
+        typed += [(item["name"], item.get("type", "text")) for item in schema.get("earnings_inputs", [])]
+        self.checks: List[Tuple[str, Checker]] = [
+            (field, FIELD_CHECKERS[f_type]) for field, f_type in typed if f_type in FIELD_CHECKERS
+        ]
+
+        line_items = schema.get("line_items")
+        self.has_line_items = line_items is not None
+        self.columns: List[str] = list(line_items.get("columns", [])) if line_items else []
+        column_types = line_items.get("types", {}) if line_items else {}
+        # Amounts are checked by parsing the items into LineItems, as rendering does.
+        self.column_checks: List[Tuple[str, Checker]] = [
+            (column, FIELD_CHECKERS[column_types[column]]) for column in self.columns
+            if column != "Amount" and column_types.get(column) in FIELD_CHECKERS
+        ]
+
+    def validate(self, data: Dict[str, Any], skip: Sequence[str] = ()) -> ValidationResult:
+        """Checks form data. Fields in skip aren't required, e.g. an Invoice No still to be assigned."""
+        if not isinstance(data, dict):
+            return ValidationResult.from_errors([FieldError("", "Form data must be an object.")])
+        errors: List[FieldError] = []
+        for field in self.required:
+            if field not in skip and not data.get(field):
+                errors.append(FieldError(field, f"'{field}' is a required field."))
+        for field, check in self.checks:
+            value = data.get(field)
+            if value not in (None, ""):
+                problem = check(value)
+                if problem:
+                    errors.append(FieldError(field, f"'{field}' {problem}."))
+        if self.has_line_items:
+            errors.extend(self._validate_line_items(data.get("line_items")))
+        return ValidationResult.from_errors(errors)
+
+    def _validate_line_items(self, rows: Any) -> List[FieldError]:
+        if not rows:
+            return [FieldError("line_items", f"Please add at least one line item to the {self.doc_type.lower()}.")]
+        if not isinstance(rows, list):
+            return [FieldError("line_items", "Line items data is corrupted.")]
+        errors = []
+        items = LineItems(rows)
+        invalid = set(items.invalid)
+        for index, row in enumerate(items.rows):
+            path = f"line_items[{index}]"
+            if row is None:
+                errors.append(FieldError(path, f"Line item #{index + 1} is corrupted."))
+                continue
+            for column in self.columns:
+                if not row.get(column):
+                    errors.append(FieldError(f"{path}.{column}", f"Missing value for '{column}' in line item #{index + 1}."))
+            for column, check in self.column_checks:
+                value = row.get(column)
+                problem = check(value) if value else None
+                if problem:
+                    errors.append(FieldError(f"{path}.{column}", f"'{column}' {problem} in line item #{index + 1}."))
+            if index in invalid:
+                errors.append(FieldError(
+                    f"{path}.Amount", f"'{row.get('Amount')}' is not a valid amount in line item #{index + 1}."
+                ))
+        return errors
@@ -0,0 +1,70 @@
+import pytest
+
+import asset_pipeline
+import document_index
+import document_manager
+import invoice_logic
+from document_manager import DocumentManager
+
+INVOICE = {
+    "company": "GoFar Media",
+    "doc_type": "Invoice",
+    "form_data": {
+        "M/s": "Test Client",
+        "Campaign": "Launch",
+        "Date": "17-10-2026",
+        "Invoice Month": "October 2026",
+        "line_items": [{
+            "Description": "Radio spot",
+            "Campaign Start Date": "01-10-2026",
+            "Campaign End Date": "15-10-2026",
+            "Size": "30s",
+            "Duration": "2 weeks",
+            "Amount": "25,000",
+        }],
+    },
+}
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    """A DocumentManager whose counters, output and caches live under tmp_path."""
+    real_resource_path = invoice_logic.resource_path
+
+    def resource_path(relative_path):
+        if relative_path.startswith("invoice_counter"):
+            return str(tmp_path / relative_path)
+        return real_resource_path(relative_path)
+
+    monkeypatch.setattr(invoice_logic, "resource_path", resource_path)
+    for module in (document_manager, document_index):
+        monkeypatch.setattr(module, "get_output_dir", lambda: tmp_path / "out")
+    for module in (document_manager, asset_pipeline):
+        monkeypatch.setattr(module, "get_cache_dir", lambda: tmp_path / "cache")
+    return DocumentManager()
+
+
+def test_records_that_are_not_objects_fail_alone(manager):
+    first_number = manager.invoice_generator.peek_next("GoFar Media")
+    report = manager.generate_many([[1, 2], "text", INVOICE], workers=1, executor="thread")
+
+    statuses = [(entry["status"], entry["error"]) for entry in report["records"]]
+    assert statuses[:2] == [("error", "Invalid record: Record must be an object.")] * 2
+    assert statuses[2] == ("ok", None)
+    assert report["succeeded"] == 1 and report["failed"] == 2
+    assert report["records"][2]["invoice_no"] == first_number
+
+
+def test_unknown_company_fails_alone_and_keeps_numbers_gapless(manager):
+    first_number = manager.invoice_generator.peek_number("GoFar Media")
+    bad = dict(INVOICE, company="Nobody Ltd")
+    report = manager.generate_many([INVOICE, bad, INVOICE], workers=1, executor="thread")
+
+    assert [entry["status"] for entry in report["records"]] == ["ok", "error", "ok"]
+    assert "Unknown company" in report["records"][1]["error"]
+    assert manager.invoice_generator.peek_number("GoFar Media") == first_number + 2
+
+
+def test_bundle_rejects_records_that_are_not_objects(manager):
+    with pytest.raises(ValueError, match="Record 0: Record must be an object"):
+        manager.generate_bundle([[1, 2], INVOICE])
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from invoice_logic import CounterStore, InvoiceNumberConflict
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CounterStore(tmp_path / "counters.db")
+    store.set_last("GFM", 100)
+    return store
+
+
+def test_commit_hands_out_consecutive_numbers(store):
+    assert store.peek("GFM") == 101
+    assert store.commit("GFM", 101) == 101
+    assert store.commit("GFM") == 102
+    assert store.snapshot() == {"GFM": 102}
+
+
+def test_commit_of_a_taken_number_conflicts(store):
+    store.commit("GFM")
+    with pytest.raises(InvoiceNumberConflict):
+        store.commit("GFM", 101)
+
+
+def test_unused_numbers_at_the_end_roll_the_counter_back(store):
+    lease = store.lease("GFM", 5)
+    assert lease.numbers == [101, 102, 103, 104, 105]
+    store.release(lease, [104, 105])
+    assert store.snapshot() == {"GFM": 103}
+    assert store.peek("GFM") == 104
+
+
+def test_unused_numbers_in_the_middle_are_handed_out_first(store):
+    lease = store.lease("GFM", 5)
+    store.release(lease, [101, 103])
+    assert [store.peek("GFM", offset) for offset in range(3)] == [101, 103, 106]
+    assert store.lease("GFM", 3).numbers == [101, 103, 106]
+
+
+def test_releasing_everything_restores_the_counter(store):
+    store.release(store.lease("GFM", 5), [101, 102, 103, 104, 105])
+    assert store.snapshot() == {"GFM": 100}
+    assert store.peek("GFM") == 101
+
+
+def test_set_last_forgets_released_numbers(store):
+    store.release(store.lease("GFM", 5), [101, 103])
+    store.set_last("GFM", 200)
+    assert store.peek("GFM") == 201
+
+
+def test_failed_transaction_is_rolled_back(store):
+    with pytest.raises(RuntimeError):
+        with store._transaction() as conn:
+            store._set_last(conn, "GFM", 500)
+            raise RuntimeError("crash mid-transaction")
+    assert store.snapshot() == {"GFM": 100}
+
+
+def test_stale_leases_are_recovered(store):
+    store.lease("GFM", 3)
+    assert store.recover_leases(older_than=3600) == 0
+    assert store.recover_leases(older_than=-1) == 1
+    assert store.peek("GFM") == 101
+
+
+def test_legacy_json_is_imported_once(tmp_path):
+    legacy = tmp_path / "invoice_counter.json"
+    legacy.write_text(json.dumps({"GFM": 41}))
+    store = CounterStore(tmp_path / "counters.db", legacy_json=legacy)
+    assert store.peek("GFM") == 42
+    legacy.write_text(json.dumps({"GFM": 7}))
+    assert CounterStore(tmp_path / "counters.db", legacy_json=legacy).peek("GFM") == 42
@@ -0,0 +1,80 @@
+import random
+from decimal import Decimal, ROUND_HALF_UP
+
+import pytest
+
+from formatting import MAX_PAISA, to_paisa
+from line_items import LineItems, apply_rate, document_totals, grand_totals
+
+
+def _reference(subtotal, rate):
+    """GST the slow, obvious way: Decimal, rounded half up to whole paisa."""
+    tax = (Decimal(subtotal) * Decimal(str(rate)) / 100).quantize(Decimal(1), rounding=ROUND_HALF_UP)
+    return subtotal + int(tax)
+
+
+@pytest.mark.parametrize("subtotal, rate, expected", [
+    (10000, 15, 11500),
+    (1, 50, 2),        # Half a paisa of tax rounds up
+    (3, 50, 5),        # 1.5 -> 2
+    (-1, 50, -2),      # Half up is away from zero for credit notes
+    (10, 17.5, 12),    # 1.75 -> 2
+    (10, "17.5", 12),
+    (12345, 0, 12345),
+])
+def test_grand_totals_round_half_up(subtotal, rate, expected):
+    assert grand_totals([subtotal], [rate]) == [expected]
+
+
+def test_grand_totals_match_decimal_arithmetic():
+    rng = random.Random(1234)
+    rates = [0, 5, 13, 15, 16, 17.5, "18.25", 99.99]
+    subtotals = [rng.randint(-10 ** 9, 10 ** 12) for _ in range(5000)]
+    chosen = [rng.choice(rates) for _ in subtotals]
+    assert grand_totals(subtotals, chosen) == [_reference(s, r) for s, r in zip(subtotals, chosen)]
+
+
+def test_grand_totals_do_not_overflow():
+    assert grand_totals([MAX_PAISA], [100]) == [2 * MAX_PAISA]
+
+
+def test_apply_rate_is_the_tax_alone():
+    assert apply_rate(10050, 15) == 1508  # 1507.5 rounds up
+
+
+@pytest.mark.parametrize("text, paisa", [
+    ("1,25,000.50", 12500050),
+    ("100", 10000),
+    ("0.005", 1),
+    ("-0.005", -1),
+    ("1e3", 100000),
+    (12, 1200),
+])
+def test_to_paisa(text, paisa):
+    assert to_paisa(text) == paisa
+
+
+@pytest.mark.parametrize("text", ["abc", "nan", "inf", "-Infinity", "1e30", "12345678901234567890"])
+def test_to_paisa_rejects_what_it_cannot_represent(text):
+    with pytest.raises(ValueError):
+        to_paisa(text)
+
+
+def test_invalid_amounts_are_marked_and_count_as_zero():
+    items = LineItems([{"Amount": "100"}, {"Amount": "inf"}, "not a row", {"Amount": "12345678901234567890"}])
+    assert items.invalid == [1, 3]
+    assert not items.amounts_valid
+    assert items.total == 10000
+    assert [item.amount for item in items] == [10000, None, 0, None]
+
+
+def test_document_totals():
+    documents = [
+        ("Invoice", {"line_items": [{"Amount": "100"}, {"Amount": "50.25"}]}),
+        ("Sales Tax Invoice", {"line_items": [{"Amount": "100"}], "GST Percentage": "16"}),
+        ("Sales Tax Invoice", {"line_items": [{"Amount": "100"}]}),  # Default 15%
+        ("Sales Tax Invoice", {"line_items": [{"Amount": "100"}], "GST Percentage": "nan"}),
+        ("Invoice", {"line_items": [{"Amount": "1e30"}]}),
+        ("Salary Slip", {"Basic Salary": "100"}),
+    ]
+    assert document_totals(documents) == [15025, 11600, 11500, None, None, None]
@@ -0,0 +1,100 @@
+import datetime
+import os
+
+import pytest
+
+import render_cache
+from render_cache import RenderCache, render_key
+
+
+class _Template:
+    version = "1"
+
+
+class _DatedTemplate(_Template):
+    prints_render_date = True
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / "stamp.png"
+    path.write_bytes(b"first")
+    return path
+
+
+def _key(image, template=None, form_data=None, company=None):
+    return render_key(
+        "Invoice", form_data or {"M/s": "Client"}, template or _Template(),
+        company or {"name": "GFM"}, [str(image), None],
+    )
+
+
+def test_same_inputs_give_the_same_key(image):
+    assert _key(image) == _key(image)
+
+
+@pytest.mark.parametrize("change", [
+    {"form_data": {"M/s": "Other client"}},
+    {"company": {"name": "GFM", "output_profile": "print"}},
+])
+def test_changed_inputs_change_the_key(image, change):
+    assert _key(image, **change) != _key(image)
+
+
+def test_template_version_is_part_of_the_key(image):
+    class Newer(_Template):
+        version = "2"
+    assert _key(image, Newer()) != _key(image)
+
+
+def test_edited_image_changes_the_key(image):
+    before = _key(image)
+    image.write_bytes(b"second, longer")
+    os.utime(image, ns=(1, 1))  # A different mtime as well, as a real edit would have
+    assert _key(image) != before
+
+
+def test_renderer_modules_are_part_of_the_key(image, monkeypatch):
+    before = _key(image)
+    assert len(render_cache.renderer_version()) == len(render_cache.RENDERER_MODULES) + 1
+    assert None not in render_cache.renderer_version()
+    monkeypatch.setattr(render_cache, "RENDERER_MODULES", render_cache.RENDERER_MODULES[:-1])
+    assert _key(image) != before
+
+
+def test_render_date_is_in_the_key_only_for_dated_templates(image, monkeypatch):
+    today = (_key(image), _key(image, _DatedTemplate()))
+
+    class Later(datetime.date):
+        @classmethod
+        def today(cls):
+            return datetime.date(2030, 5, 5)
+    monkeypatch.setattr(render_cache, "date", Later)
+
+    assert _key(image) == today[0]
+    assert _key(image, _DatedTemplate()) != today[1]
+
+
+def test_store_and_fetch(tmp_path):
+    cache = RenderCache(tmp_path / "cache")
+    rendered = tmp_path / "rendered.pdf"
+    rendered.write_bytes(b"%PDF-1.4 test")
+    target = tmp_path / "out.pdf"
+
+    assert not cache.fetch("ab" * 32, target)
+    cache.store("ab" * 32, rendered)
+    assert cache.fetch("ab" * 32, target)
+    assert target.read_bytes() == rendered.read_bytes()
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    cache = RenderCache(tmp_path / "cache", max_bytes=250)
+    rendered = tmp_path / "rendered.pdf"
+    rendered.write_bytes(b"x" * 100)
+    for index, key in enumerate(["aa" * 32, "bb" * 32, "cc" * 32]):
+        cache.store(key, rendered)
+        os.utime(cache._path(key), (index, index))
+    assert cache.stats()["evictions"] >= 1
+    assert not cache._path("aa" * 32).exists()
+    assert cache._path("cc" * 32).exists()
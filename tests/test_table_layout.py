@@ -0,0 +1,76 @@
+import fitz
+import pytest
+from fpdf import FPDF
+
+from table_layout import Column, TableLayout
+
+COLUMNS = [Column("Sr.", 10), Column("Description", 120, align="L"), Column("Amount", 40)]
+
+
+def _pdf():
+    pdf = FPDF()
+    pdf.set_auto_page_break(True, margin=20)
+    pdf.add_page()
+    return pdf
+
+
+def _table(pdf):
+    return TableLayout(pdf, COLUMNS, format_carry=lambda paisa: f"Rs. {paisa // 100}")
+
+
+def _pages(pdf):
+    with fitz.open(stream=bytes(pdf.output()), filetype="pdf") as doc:
+        return [(page.get_text(), page.get_text("words"), page.rect.height) for page in doc]
+
+
+def test_rows_move_whole_and_subtotal_is_carried():
+    pdf = _pdf()
+    table = _table(pdf)
+    table.begin()
+    for index in range(40):
+        table.add_row([str(index + 1), f"Spot {index + 1}", "Rs. 100"], amount=10000)
+    table.end()
+
+    pages = _pages(pdf)
+    assert table.pages == len(pages) > 1
+    assert table.subtotal == 400000
+    for text, _, _ in pages:
+        assert "Description" in text  # Header repeated on every page
+    for text, _, _ in pages[:-1]:
+        assert "Carried forward" in text
+    assert all("Brought forward" in text for text, _, _ in pages[1:])
+    # No row is split: every description appears exactly once.
+    text = "".join(text for text, _, _ in pages)
+    assert all(text.count(f"Spot {index + 1}\n") == 1 for index in range(40))
+
+
+def test_row_taller_than_a_page_is_continued_on_the_next_pages():
+    pdf = _pdf()
+    table = _table(pdf)
+    description = "\n".join(f"Line {index:03d}" for index in range(150))
+    table.begin()
+    table.add_row(["1", "Short row", "Rs. 5"], amount=500)
+    table.add_row(["2", description, "Rs. 7"], amount=700)
+    table.add_row(["3", "After the long row", "Rs. 9"], amount=900)
+    table.end()
+
+    pages = _pages(pdf)
+    assert len(pages) >= 3
+    text = "".join(text for text, _, _ in pages)
+    for index in range(150):
+        assert f"Line {index:03d}" in text
+    assert "After the long row" in text
+    assert table.subtotal == 2100
+    # Nothing is drawn into the bottom margin.
+    for _, words, height in pages:
+        assert max(word[3] for word in words) <= height - 20 * 72 / 25.4 + 0.5
+
+
+def test_end_restores_auto_page_break():
+    pdf = _pdf()
+    table = _table(pdf)
+    table.begin()
+    assert not pdf.auto_page_break
+    table.end()
+    assert pdf.auto_page_break
+    assert pdf.b_margin == pytest.approx(20)
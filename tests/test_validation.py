@@ -0,0 +1,107 @@
+import json
+
+import pytest
+
+from document_manager import load_batch_records
+from template_registry import get_template_registry
+from validation import FieldError, SchemaValidator, ValidationResult, as_result
+
+SCHEMA = {
+    "type": "Invoice",
+    "header_fields": [("M/s", "text"), ("Date", "date"), ("GST Percentage", "number")],
+    "line_items": {
+        "columns": ["Description", "Campaign Start Date", "Amount"],
+        "types": {"Campaign Start Date": "date", "Amount": "number"},
+    },
+}
+
+
+@pytest.fixture
+def validator():
+    return SchemaValidator(SCHEMA, required_fields=("M/s", "Date"))
+
+
+def _valid_data(**changes):
+    data = {
+        "M/s": "Client",
+        "Date": "17-10-2026",
+        "line_items": [{"Description": "Spot", "Campaign Start Date": "01-10-2026", "Amount": "1,000"}],
+    }
+    data.update(changes)
+    return data
+
+
+def _paths(result):
+    return [error.path for error in result.errors]
+
+
+def test_valid_data_passes(validator):
+    assert validator.validate(_valid_data()) == ValidationResult(True)
+
+
+def test_required_fields_and_skip(validator):
+    result = validator.validate(_valid_data(**{"M/s": ""}))
+    assert not result.valid
+    assert _paths(result) == ["M/s"]
+    assert result.message == "'M/s' is a required field."
+    assert validator.validate(_valid_data(**{"M/s": ""}), skip=("M/s",)).valid
+
+
+@pytest.mark.parametrize("value", ["nan", "NaN", "inf", "-Infinity", "abc"])
+def test_non_finite_numbers_are_rejected(validator, value):
+    assert _paths(validator.validate(_valid_data(**{"GST Percentage": value}))) == ["GST Percentage"]
+
+
+@pytest.mark.parametrize("amount", ["nan", "inf", "1e30", "12345678901234567890", "abc"])
+def test_unusable_amounts_are_rejected(validator, amount):
+    data = _valid_data()
+    data["line_items"][0]["Amount"] = amount
+    assert _paths(validator.validate(data)) == ["line_items[0].Amount"]
+
+
+def test_bad_dates_are_reported_with_their_path(validator):
+    data = _valid_data(Date="2026/10/17")
+    data["line_items"][0]["Campaign Start Date"] = "tomorrow"
+    assert _paths(validator.validate(data)) == ["Date", "line_items[0].Campaign Start Date"]
+
+
+@pytest.mark.parametrize("data", [None, [], "text", 42])
+def test_form_data_that_is_not_an_object_is_rejected(validator, data):
+    result = validator.validate(data)
+    assert not result.valid
+    assert result.errors == (FieldError("", "Form data must be an object."),)
+
+
+def test_line_items_that_are_not_objects_are_rejected(validator):
+    data = _valid_data(line_items=["row", _valid_data()["line_items"][0], 7])
+    assert _paths(validator.validate(data)) == ["line_items[0]", "line_items[2]"]
+    assert _paths(validator.validate(_valid_data(line_items={"a": 1}))) == ["line_items"]
+    assert _paths(validator.validate(_valid_data(line_items=[]))) == ["line_items"]
+
+
+def test_templates_reject_nan_gst():
+    template = get_template_registry().get("Sales Tax Invoice")
+    result = template.validate_data({"GST Percentage": "nan", "line_items": [{"Amount": "5"}]})
+    assert "GST Percentage" in _paths(result)
+
+
+@pytest.mark.parametrize("value, expected", [
+    (True, ValidationResult(True)),
+    ((True, ""), ValidationResult(True)),
+    ((False, "Bad"), ValidationResult(False, "Bad", (FieldError("", "Bad"),))),
+])
+def test_as_result_accepts_old_style_results(value, expected):
+    assert as_result(value) == expected
+
+
+def test_batch_records_that_do_not_parse_are_collected(tmp_path):
+    path = tmp_path / "records.jsonl"
+    record = {"company": "GoFar Media", "doc_type": "Invoice", "form_data": {}}
+    path.write_text("\n".join([json.dumps(record), "{not json", json.dumps([1, 2])]) + "\n")
+    errors = []
+    records = load_batch_records(path, errors)
+    assert records[0] == record
+    assert records[1] is None
+    assert [index for index, _ in errors] == [1]
+    with pytest.raises(ValueError):
+        load_batch_records(path)